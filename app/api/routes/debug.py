@@ -0,0 +1,77 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from fastapi.responses import PlainTextResponse
+from app.core.config import settings
+from app.core.tracing import traceStore
+from app.core.profiling import profileStore
+
+
+async def requireDebugToken(x_debug_token: Optional[str] = Header(None)) -> None:
+    """Les traces et profils exposent le détail des requêtes : jeton DEBUG_TOKEN obligatoire"""
+    if not settings.DEBUG_TOKEN or not x_debug_token \
+            or not hmac.compare_digest(x_debug_token.encode(), settings.DEBUG_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail="Jeton de diagnostic invalide"
+        )
+
+
+# Router de diagnostic : traces et profils des dernières requêtes (monté si DEBUG_TOKEN est défini)
+router = APIRouter(
+    prefix="/debug",
+    tags=["Debug"],
+    dependencies=[Depends(requireDebugToken)]
+)
+
+
+@router.get("/traces")
+async def list_traces(limit: int = 50):
+    """Liste les dernières traces (span racine uniquement)"""
+    traces = []
+    for trace in traceStore.recent(limit):
+        data = trace.toDict()
+        root = data["spans"][0] if data["spans"] else None
+        traces.append({
+            "trace_id": trace.traceId,
+            "name": root["name"] if root else None,
+            "duration_ms": root["duration_ms"] if root else None,
+            "spans": len(data["spans"]),
+        })
+    return {"success": True, "message": "Traces récupérées", "data": traces}
+
+
+@router.get("/traces/{trace_id}")
+async def get_trace(trace_id: str):
+    """Récupère tous les spans d'une trace au format JSON"""
+    trace = traceStore.get(trace_id)
+    if not trace:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Trace non trouvée"
+        )
+    return {"success": True, "message": "Trace récupérée", "data": trace.toDict()}
+
+
+@router.get("/profiles")
+async def list_profiles():
+    """
+    Liste les profils capturés via le header X-Profile
+
+    Le profil échantillonne aussi le thread de la boucle d'événements, partagé
+    par toutes les requêtes : sous concurrence, il mélange les piles des
+    requêtes servies en même temps. À capturer sur une instance peu chargée.
+    """
+    return {"success": True, "message": "Profils récupérés", "data": profileStore.summaries()}
+
+
+@router.get("/profiles/{profile_id}", response_class=PlainTextResponse)
+async def get_profile(profile_id: str):
+    """Profil au format folded (flamegraph.pl, speedscope)"""
+    profiler = profileStore.get(profile_id)
+    if not profiler:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Profil non trouvé"
+        )
+    return PlainTextResponse(profiler.folded())
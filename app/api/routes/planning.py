@@ -1,8 +1,26 @@
-from fastapi import APIRouter, HTTPException, status
+import asyncio
+import threading
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, Iterator, Literal, Optional
+import orjson
+from fastapi import APIRouter, HTTPException, Query, Request, Response, status
+from fastapi.responses import JSONResponse, StreamingResponse
+from starlette.concurrency import run_in_threadpool
 from app.services.ai_planning_service import aiPlanningService
-from app.schemas.requete import GeneratePlanningRequest
-from app.schemas.response import PlanningResponse, StatusResponse
-from app.services.database_service import databaseService
+from app.schemas.requete import GeneratePlanningRequest, DelayMatchRequest, WithdrawTeamRequest, MatchResultRequest, BulkResultsRequest, SimulatePlanningRequest
+from app.schemas.response import PlanningResponse, StatusResponse, MatchesPageResponse, StandingsResponse, QualityResponse, SimulationResponse
+from app.services.database_service import databaseService, decodeMatchCursor
+from app.services.schedule_index_service import ScheduleIndex, scheduleIndexService
+from app.services.reschedule_service import rescheduleService
+from app.services.placeholder_service import MatchNotFoundError, TeamsNotDeterminedError, placeholderService
+from app.services.standings_service import standingsService
+from app.services.diff_service import planningDiffService
+from app.services.quality_service import qualityService
+from app.services.feasibility_service import InfeasibleTournamentError
+from app.services.simulation_service import simulationService
+from app.services.idempotency_service import COMPLETED, IdempotencyKeyMismatchError, idempotencyService
+from app.models.models import AIGeneratedMatch, AITournamentPlanning
+from app.core.responses import envelope, planningResponse
 
 # Router avec préfixe et tags
 router = APIRouter(
@@ -10,24 +28,153 @@ router = APIRouter(
     tags=["AI Planning"]
 )
 
+# Code non standard (nginx) : le client a fermé la connexion avant la réponse
+CLIENT_CLOSED_REQUEST = 499
+IDEMPOTENCY_HEADER = "Idempotency-Key"
+MAX_IDEMPOTENCY_KEY_LENGTH = 255
 
-@router.post("/generate", response_model=PlanningResponse, status_code=status.HTTP_201_CREATED)
-async def generate_planning(request: GeneratePlanningRequest):
-    """Génère un planning IA pour un tournoi"""
+
+# Générations avec Idempotency-Key en cours (référence forte jusqu'à leur fin)
+_detachedTasks: "set[asyncio.Task]" = set()
+
+
+def _forgetTask(task: "asyncio.Task") -> None:
+    """Fin d'une génération détachée ; son erreur a déjà été renvoyée au client s'il attendait encore"""
+    _detachedTasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"Generation detachee terminee en erreur: {task.exception()!r}")
+
+
+async def _waitForDisconnect(httpRequest: Request) -> None:
+    """Rend la main quand le client ferme la connexion (message http.disconnect)"""
+    while (await httpRequest.receive())["type"] != "http.disconnect":
+        pass
+
+
+async def _runUntilDisconnect(httpRequest: Request, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+    """
+    Exécute une génération bloquante dans un thread en surveillant le client
+
+    Si le client se déconnecte, le cancelEvent passé au service est positionné :
+    les runs OpenAI en cours sont annulés et rien n'est écrit en base. Avec un
+    en-tête Idempotency-Key, la génération n'est pas liée à la connexion : elle
+    va à son terme et la répétition de la requête en reçoit le résultat.
+
+    Raises:
+        HTTPException: 499 si le client s'est déconnecté
+    """
+    cancel = threading.Event()
+    task = asyncio.ensure_future(run_in_threadpool(func, *args, cancelEvent=cancel, **kwargs))
+    if httpRequest.headers.get(IDEMPOTENCY_HEADER):
+        return await task
+    watcher = asyncio.ensure_future(_waitForDisconnect(httpRequest))
     try:
+        await asyncio.wait({task, watcher}, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        watcher.cancel()
+    if not task.done():
+        print("Client deconnecte : annulation de la generation")
+        cancel.set()
+    result = await task
+    if cancel.is_set():
+        raise HTTPException(status_code=CLIENT_CLOSED_REQUEST, detail="Requête abandonnée par le client")
+    return result
+
+
+async def _idempotentPlanning(httpRequest: Request,
+                              fingerprint: str,
+                              message: str,
+                              statusCode: int,
+                              produce: Callable[[], Awaitable[AITournamentPlanning]]) -> Response:
+    """
+    Exécute `produce` une seule fois par en-tête Idempotency-Key
+
+    Une répétition reçoit le planning de la première requête, ou 202 tant
+    qu'elle est en cours (y compris sur un autre worker). La génération
+    continue si le client se déconnecte ; la clé n'est libérée que si elle échoue.
+
+    Raises:
+        HTTPException: 400 clé trop longue, 422 clé déjà utilisée pour une autre requête
+    """
+    key = httpRequest.headers.get(IDEMPOTENCY_HEADER)
+    if not key:
+        return planningResponse(httpRequest, await produce(), message, statusCode)
+    if len(key) > MAX_IDEMPOTENCY_KEY_LENGTH:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Idempotency-Key trop longue")
+
+    try:
+        record = idempotencyService.begin(key, fingerprint)
+    except IdempotencyKeyMismatchError as e:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=str(e))
+
+    if record.status == COMPLETED:
+        planning = databaseService.getPlanningWithDetailsByPlanningId(record.planningId)
+        if not planning:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Planning de la requête d'origine non trouvé")
+        response = planningResponse(httpRequest, planning, message, statusCode)
+        response.headers["Idempotent-Replayed"] = "true"
+        return response
+    if not record.owner:
+        return JSONResponse(
+            status_code=status.HTTP_202_ACCEPTED,
+            content=StatusResponse(
+                success=True,
+                message="Génération déjà en cours pour cette Idempotency-Key",
+                data={"status": record.status, "idempotency_key": key}
+            ).model_dump(),
+            headers={"Retry-After": "5"}
+        )
+
+    async def owned() -> AITournamentPlanning:
+        try:
+            planning = await produce()
+        except BaseException:
+            idempotencyService.release(record)
+            raise
+        idempotencyService.complete(record, planning.id)
+        return planning
+
+    # tâche détachée de la requête : une déconnexion n'interrompt ni la génération ni l'enregistrement de la clé
+    task = asyncio.ensure_future(owned())
+    _detachedTasks.add(task)
+    task.add_done_callback(_forgetTask)
+    planning = await asyncio.shield(task)
+    return planningResponse(httpRequest, planning, message, statusCode)
+
+@router.post("/generate", response_model=PlanningResponse, status_code=status.HTTP_201_CREATED)
+async def generate_planning(request: GeneratePlanningRequest, httpRequest: Request):
+    """Génère un planning IA pour un tournoi (en-tête Idempotency-Key optionnel)"""
+    async def produce() -> AITournamentPlanning:
         # Appel du service AI Planning
-        planning = aiPlanningService.generatePlanning(request.tournament_id)
+        try:
+            planning = await _runUntilDisconnect(
+                httpRequest,
+                aiPlanningService.generatePlanning,
+                request.tournament_id,
+                aiCandidates=request.ai_candidates,
+                localCandidates=request.local_candidates,
+                deadlineSeconds=request.deadline_seconds
+            )
+        except InfeasibleTournamentError as e:
+            raise HTTPException(
+                status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                detail={"message": str(e), **e.report}
+            )
         
         if not planning:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail="Impossible de générer le planning. Vérifiez les données du tournoi."
             )
-        
-        return PlanningResponse(
-            success=True,
-            message="Planning généré avec succès",
-            data=planning
+        return planning
+
+    try:
+        return await _idempotentPlanning(
+            httpRequest,
+            f"generate:{request.model_dump_json()}",
+            "Planning généré avec succès",
+            status.HTTP_201_CREATED,
+            produce
         )
         
     except HTTPException:
@@ -39,6 +186,35 @@ async def generate_planning(request: GeneratePlanningRequest):
             detail="Erreur interne lors de la génération du planning"
         )
 
+@router.post("/simulate", response_model=SimulationResponse)
+async def simulate_planning(request: SimulatePlanningRequest):
+    """Simule une configuration et ses variantes (terrains, durées, pauses, formats) avec le moteur local"""
+    try:
+        try:
+            rows = await simulationService.simulate(
+                request.config.model_dump(),
+                request.grid.model_dump()
+            )
+        except ValueError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+        except TimeoutError as e:
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+
+        return SimulationResponse(
+            success=True,
+            message=f"{len(rows)} scénario(s) simulé(s)",
+            data={"scenarios": rows}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur simulation: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors de la simulation"
+        )
+
 @router.get("/{planning_id}/status", response_model=StatusResponse)
 async def get_planning_status(planning_id: str):
     """Récupère le statut d'un planning"""
@@ -67,23 +243,402 @@ async def get_planning_status(planning_id: str):
             detail="Erreur interne lors de la récupération du statut"
         )
 
-@router.post("/{planning_id}/regenerate", response_model=PlanningResponse)
-async def regenerate_planning(planning_id: str):
-    """Régénère un planning existant"""
+@router.get("/{planning_id}/matches", response_model=MatchesPageResponse)
+def get_planning_matches(
+    planning_id: str,
+    terrain: Optional[int] = None,
+    phase: Optional[str] = None,
+    poule_id: Optional[str] = None,
+    start_from: Optional[datetime] = Query(None, alias="from", description="debut_horaire >= from"),
+    start_before: Optional[datetime] = Query(None, alias="to", description="debut_horaire < to"),
+    cursor: Optional[str] = Query(None, description="next_cursor de la page précédente"),
+    limit: int = Query(50, ge=1, le=500),
+    fields: Optional[str] = Query(None, description="colonnes séparées par des virgules")
+):
+    """Liste paginée (keyset sur debut_horaire, id) et filtrable des matchs d'un planning"""
     try:
+        columns = [field.strip() for field in fields.split(",") if field.strip()] if fields else None
+        unknown = [column for column in columns or [] if column not in AIGeneratedMatch.model_fields]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Colonnes inconnues: {', '.join(unknown)}"
+            )
+
+        try:
+            after = decodeMatchCursor(cursor) if cursor else None
+        except ValueError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Curseur de pagination invalide"
+            )
+
+        page = databaseService.getMatches(
+            planning_id,
+            terrain=terrain,
+            phase=phase,
+            pouleId=poule_id,
+            startFrom=start_from,
+            startBefore=start_before,
+            after=after,
+            limit=limit,
+            columns=columns
+        )
+        if page is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erreur interne lors de la récupération des matchs"
+            )
+
+        return MatchesPageResponse(
+            success=True,
+            message="Matchs récupérés avec succès",
+            data=page
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur récupération matchs: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors de la récupération des matchs"
+        )
+
+def _scheduleIndex(planningId: str) -> ScheduleIndex:
+    """
+    Index équipe/terrain d'un planning
+
+    Raises:
+        HTTPException: 404 si le planning n'existe pas, 500 si les matchs n'ont pas pu être chargés
+    """
+    index = scheduleIndexService.getIndex(planningId)
+    if index is None:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors de la récupération des matchs"
+        )
+    # un index vide est aussi celui d'un planning inconnu : vérifié seulement dans ce cas
+    if not index.matches and not databaseService.getPlanningWithDetailsByPlanningId(planningId):
+        scheduleIndexService.invalidate(planningId)
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Planning non trouvé"
+        )
+    return index
+
+@router.get("/{planning_id}/team/{team}", response_model=MatchesPageResponse)
+def get_team_schedule(
+    planning_id: str,
+    team: str,
+    after: Optional[datetime] = Query(None, description="debut_horaire >= after"),
+    limit: int = Query(5, ge=1, le=100)
+):
+    """Prochains matchs d'une équipe (index en mémoire, O(log n))"""
+    try:
+        matches = _scheduleIndex(planning_id).nextForTeam(team, after, limit)
+        return MatchesPageResponse(
+            success=True,
+            message="Matchs de l'équipe récupérés avec succès",
+            data={"matches": [match.model_dump() for match in matches]}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur récupération matchs équipe: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors de la récupération des matchs"
+        )
+
+@router.get("/{planning_id}/court/{terrain}", response_model=MatchesPageResponse)
+def get_court_schedule(
+    planning_id: str,
+    terrain: int,
+    after: Optional[datetime] = Query(None, description="debut_horaire >= after"),
+    limit: int = Query(5, ge=1, le=100)
+):
+    """Prochains matchs d'un terrain (index en mémoire, O(log n))"""
+    try:
+        matches = _scheduleIndex(planning_id).nextForCourt(terrain, after, limit)
+        return MatchesPageResponse(
+            success=True,
+            message="Matchs du terrain récupérés avec succès",
+            data={"matches": [match.model_dump() for match in matches]}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur récupération matchs terrain: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors de la récupération des matchs"
+        )
+
+@router.get("/{planning_id}/diff/{other_id}")
+def diff_plannings(planning_id: str, other_id: str):
+    """
+    Différences entre deux versions (planning_id = avant, other_id = après)
+
+    Réponse NDJSON en flux : une ligne par match moved/retimed/recourted/added/removed,
+    puis une ligne summary.
+    """
+    for planningId in (planning_id, other_id):
+        if not aiPlanningService.getPlanningStatus(planningId):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Planning {planningId} non trouvé"
+            )
+
+    def lines(changes: Iterator[Dict[str, Any]]) -> Iterator[bytes]:
+        try:
+            for change in changes:
+                yield orjson.dumps(change) + b"\n"
+        except Exception as e:
+            # Le statut HTTP est déjà parti : l'erreur est signalée dans le flux
+            print(f"❌ Erreur diff plannings: {e}")
+            yield orjson.dumps({"type": "error", "detail": "Erreur interne lors du calcul du diff"}) + b"\n"
+
+    return StreamingResponse(
+        lines(planningDiffService.iterDiff(planning_id, other_id)),
+        media_type="application/x-ndjson"
+    )
+
+@router.get("/{planning_id}/poules/{poule_id}/standings", response_model=StandingsResponse)
+def get_poule_standings(planning_id: str, poule_id: str):
+    """Classement en direct d'une poule (mis à jour à chaque résultat, lectures en cache)"""
+    try:
+        standings = standingsService.getStandingsJson(planning_id, poule_id)
+        if standings is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Poule non trouvée"
+            )
+
+        return Response(content=envelope("Classement récupéré avec succès", standings), media_type="application/json")
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur récupération classement: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors de la récupération du classement"
+        )
+
+@router.get("/{planning_id}/quality", response_model=QualityResponse)
+async def get_planning_quality(planning_id: str):
+    """Indicateurs de qualité : conflits, occupation des terrains, attentes des équipes, pause déjeuner"""
+    try:
+        try:
+            quality = await qualityService.getQuality(planning_id)
+        except TimeoutError as e:
+            raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+        if quality is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Planning non trouvé"
+            )
+
+        return QualityResponse(
+            success=True,
+            message="Qualité du planning calculée avec succès",
+            data=quality
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur calcul qualité: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors du calcul de la qualité"
+        )
+
+@router.post("/{planning_id}/matches/{match_id}/result", response_model=MatchesPageResponse)
+def record_match_result(planning_id: str, match_id: str, request: MatchResultRequest):
+    """Enregistre le score d'un match et résout les placeholders qui en dépendent"""
+    try:
+        try:
+            changed = placeholderService.recordResults(
+                planning_id,
+                {match_id: {"score_a": request.score_a, "score_b": request.score_b, "status": "completed"}}
+            )
+        except MatchNotFoundError as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        except TeamsNotDeterminedError as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        if changed is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erreur interne lors de l'enregistrement du résultat"
+            )
+        propagated = sum(1 for match in changed if match.id != match_id)
+
+        return MatchesPageResponse(
+            success=True,
+            message=f"Résultat enregistré, {propagated} match(s) mis à jour",
+            data={"matches": [match.model_dump() for match in changed]}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur enregistrement résultat: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors de l'enregistrement du résultat"
+        )
+
+@router.post("/{planning_id}/results", response_model=MatchesPageResponse)
+def record_results(planning_id: str, request: BulkResultsRequest):
+    """Enregistre un lot de scores/statuts en une écriture, propagation unique pour le lot"""
+    try:
+        updates = {}
+        for result in request.results:
+            updates.setdefault(result.match_id, {}).update(result.model_dump(exclude={"match_id"}, exclude_none=True))
+
+        try:
+            changed = placeholderService.recordResults(planning_id, updates)
+        except MatchNotFoundError as e:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+        except TeamsNotDeterminedError as e:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=str(e))
+        if changed is None:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Erreur interne lors de l'enregistrement des résultats"
+            )
+        propagated = sum(1 for match in changed if match.id not in updates)
+
+        return MatchesPageResponse(
+            success=True,
+            message=f"{len(updates)} résultat(s) enregistré(s), {propagated} match(s) mis à jour",
+            data={"matches": [match.model_dump() for match in changed]}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur enregistrement résultats: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors de l'enregistrement des résultats"
+        )
+
+@router.post("/{planning_id}/matches/{match_id}/delay", response_model=MatchesPageResponse)
+def delay_match(planning_id: str, match_id: str, request: DelayMatchRequest):
+    """Retarde un match et replanifie uniquement les matchs impactés (sans IA)"""
+    try:
+        changed = rescheduleService.delayMatch(planning_id, match_id, request.delay_minutes)
+        if changed is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Match non trouvé ou déjà terminé"
+            )
+
+        return MatchesPageResponse(
+            success=True,
+            message=f"{len(changed)} match(s) replanifié(s)",
+            data={"matches": [match.model_dump() for match in changed]}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur replanification: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors de la replanification"
+        )
+
+@router.post("/{planning_id}/team/{team}/withdraw", response_model=MatchesPageResponse)
+def withdraw_team(planning_id: str, team: str, request: WithdrawTeamRequest):
+    """Retire une équipe : ses matchs passent en forfait, les matchs impactés sont replanifiés"""
+    try:
+        changed = rescheduleService.withdrawTeam(planning_id, team, compact=request.compact)
+        if changed is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="Aucun match à venir pour cette équipe"
+            )
+
+        return MatchesPageResponse(
+            success=True,
+            message=f"{len(changed)} match(s) modifié(s)",
+            data={"matches": [match.model_dump() for match in changed]}
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"❌ Erreur retrait équipe: {e}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Erreur interne lors du retrait de l'équipe"
+        )
+
+@router.post("/{planning_id}/regenerate", response_model=PlanningResponse)
+async def regenerate_planning(
+    planning_id: str,
+    request: Request,
+    scope: Optional[str] = Query(None, pattern=r"^(elimination|poule:.+)$",
+                                 description="elimination ou poule:<poule_id> pour une régénération partielle"),
+    engine: Literal["ai", "local"] = Query("ai", description="moteur de la régénération partielle"),
+    ai_candidates: int = Query(1, ge=0, le=4, description="runs IA lancés en parallèle (régénération complète)"),
+    local_candidates: int = Query(0, ge=0, le=16, description="graines du moteur local (régénération complète)"),
+    deadline_seconds: Optional[float] = Query(None, gt=0, le=600, description="échéance de sélection du meilleur candidat"),
+    strategy: Literal["delta", "full"] = Query("delta", description="delta : l'IA corrige le planning précédent (un seul run IA)"),
+    feedback: Optional[str] = Query(None, max_length=2000, description="remarque de l'organisateur pour la régénération")
+):
+    """Régénère un planning existant, en entier ou seulement une poule / la phase finale (en-tête Idempotency-Key optionnel)"""
+    async def produce() -> AITournamentPlanning:
         # Appel du service
-        new_planning = aiPlanningService.regeneratePlanning(planning_id)
+        if scope:
+            try:
+                new_planning = await _runUntilDisconnect(
+                    request, aiPlanningService.regenerateScope, planning_id, scope, engine
+                )
+            except ValueError as e:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+            except TimeoutError as e:
+                raise HTTPException(status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=str(e))
+        else:
+            if ai_candidates + local_candidates == 0:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Au moins un candidat requis")
+            try:
+                new_planning = await _runUntilDisconnect(
+                    request, aiPlanningService.regeneratePlanning,
+                    planning_id, ai_candidates, local_candidates, deadline_seconds,
+                    feedback=feedback, strategy=strategy
+                )
+            except InfeasibleTournamentError as e:
+                raise HTTPException(
+                    status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+                    detail={"message": str(e), **e.report}
+                )
         
         if not new_planning:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Planning original non trouvé ou erreur lors de la régénération"
             )
-        
-        return PlanningResponse(
-            success=True,
-            message="Planning régénéré avec succès",
-            data=new_planning
+        return new_planning
+
+    try:
+        fingerprint = orjson.dumps({
+            "planning_id": planning_id, "scope": scope, "engine": engine, "ai_candidates": ai_candidates,
+            "local_candidates": local_candidates, "deadline_seconds": deadline_seconds,
+            "strategy": strategy, "feedback": feedback
+        }).decode()
+        return await _idempotentPlanning(
+            request,
+            f"regenerate:{fingerprint}",
+            "Planning régénéré avec succès",
+            status.HTTP_200_OK,
+            produce
         )
         
     except HTTPException:
@@ -96,8 +651,8 @@ async def regenerate_planning(planning_id: str):
         )
 
 @router.get("/{planning_id}", response_model=PlanningResponse)
-async def get_planning_by_id(planning_id: str):
-    """Récupère un planning complet par son ID"""
+async def get_planning_by_id(planning_id: str, request: Request, include_planning_data: bool = True):
+    """Récupère un planning complet par son ID (include_planning_data=false omet le JSON brut)"""
     try:        
         planning_details = databaseService.getPlanningWithDetailsByPlanningId(planning_id)
         
@@ -107,10 +662,11 @@ async def get_planning_by_id(planning_id: str):
                 detail="Planning non trouvé"
             )
         
-        return PlanningResponse(
-            success= True,
-            message= "Planning récupéré avec succès",
-            data= planning_details
+        return planningResponse(
+            request,
+            planning_details,
+            "Planning récupéré avec succès",
+            includePlanningData=include_planning_data
         )
         
     except HTTPException:
@@ -123,8 +679,8 @@ async def get_planning_by_id(planning_id: str):
         )
     
 @router.get("/tournament/{tournament_id}", response_model=PlanningResponse)
-async def get_planning_by_tournament_id(tournament_id: str):
-    """Récupère un planning complet par l'ID du tournoi"""
+async def get_planning_by_tournament_id(tournament_id: str, request: Request, include_planning_data: bool = True):
+    """Récupère un planning complet par l'ID du tournoi (include_planning_data=false omet le JSON brut)"""
     try:
         # Appel du service
         planning_details = databaseService.getPlanningWithDetailsByTournamentId(tournament_id)
@@ -135,10 +691,11 @@ async def get_planning_by_tournament_id(tournament_id: str):
                 detail="Planning non trouvé"
             )
         
-        return PlanningResponse(
-            success=True,
-            message="Planning récupéré avec succès",
-            data=planning_details
+        return planningResponse(
+            request,
+            planning_details,
+            "Planning récupéré avec succès",
+            includePlanningData=include_planning_data
         )
     except Exception as e:
         print(f"❌ Erreur récupération planning: {e}")
@@ -0,0 +1,104 @@
+import threading
+import time
+from collections import deque
+from typing import Deque
+from app.core.metrics import circuitBreakerState, circuitBreakerTransitionsTotal
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitBreaker:
+    """
+    Disjoncteur autour d'un service externe
+
+    Fermé : les appels passent et leur issue est gardée sur une fenêtre
+    glissante ; un appel en échec ou plus lent que `slowSeconds` est un
+    mauvais appel. Au-delà de `failureRate` mauvais appels (sur au moins
+    `minCalls`), le circuit s'ouvre : plus aucun appel pendant `openSeconds`.
+    Ensuite, un seul appel d'essai passe (demi-ouvert) : s'il réussit le
+    circuit se referme, sinon il se rouvre.
+    """
+
+    def __init__(self,
+                 name: str,
+                 window: int,
+                 minCalls: int,
+                 failureRate: float,
+                 slowSeconds: float,
+                 openSeconds: float):
+        self.name = name
+        self.minCalls = minCalls
+        self.failureRate = failureRate
+        self.slowSeconds = slowSeconds
+        self.openSeconds = openSeconds
+        self._outcomes: Deque[bool] = deque(maxlen=window)
+        self._state = CLOSED
+        self._openedAt = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        circuitBreakerState.set(STATE_VALUES[CLOSED], breaker=name)
+
+    @property
+    def state(self) -> str:
+        return self._state
+
+    def available(self) -> bool:
+        """Un appel serait-il accepté maintenant (sans réserver l'essai du demi-ouvert)"""
+        with self._lock:
+            if self._state == CLOSED:
+                return True
+            if self._state == OPEN:
+                return time.monotonic() - self._openedAt >= self.openSeconds
+            return not self._probing
+
+    def allowRequest(self) -> bool:
+        """Réserve un appel ; en demi-ouvert, seul le premier appelant passe"""
+        with self._lock:
+            if self._state == OPEN and time.monotonic() - self._openedAt >= self.openSeconds:
+                self._transition(HALF_OPEN)
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return True
+            return False
+
+    def recordSuccess(self, seconds: float) -> None:
+        """Appel abouti ; trop lent, il compte comme un échec"""
+        if seconds > self.slowSeconds:
+            self.recordFailure(seconds)
+            return
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._outcomes.clear()
+                self._transition(CLOSED)
+            else:
+                self._outcomes.append(False)
+
+    def recordFailure(self, seconds: float) -> None:
+        with self._lock:
+            if self._state == HALF_OPEN:
+                self._transition(OPEN)
+                return
+            self._outcomes.append(True)
+            bad = sum(self._outcomes)
+            if self._state == CLOSED and len(self._outcomes) >= self.minCalls \
+                    and bad / len(self._outcomes) >= self.failureRate:
+                print(f"Circuit {self.name} ouvert : {bad}/{len(self._outcomes)} appel(s) en echec ou trop lents")
+                self._transition(OPEN)
+
+    def release(self) -> None:
+        """Appel abandonné sans issue (annulation) : libère l'essai du demi-ouvert"""
+        with self._lock:
+            self._probing = False
+
+    def _transition(self, state: str) -> None:
+        self._state = state
+        self._probing = False
+        if state == OPEN:
+            self._openedAt = time.monotonic()
+        circuitBreakerState.set(STATE_VALUES[state], breaker=self.name)
+        circuitBreakerTransitionsTotal.inc(breaker=self.name, state=state)
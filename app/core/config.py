@@ -1,6 +1,8 @@
 from pydantic_settings import BaseSettings
 from pydantic import ConfigDict
 from functools import lru_cache
+from datetime import time
+from typing import Optional
 
 class Settings(BaseSettings):
     """Classe pour récupérer les variables d'environnement"""
@@ -12,6 +14,49 @@ class Settings(BaseSettings):
     # OPENAI
     OPENAI_API_KEY: str
     OPENAI_ASSISTANT_ID: str
+    OPENAI_POLL_INTERVAL_SECONDS: float = 3
+    OPENAI_MAX_WAIT_SECONDS: float = 120  # au-delà, le run est annulé côté OpenAI
+    PLANNING_CANCEL_POLL_SECONDS: float = 0.5  # délai de prise en compte d'une génération abandonnée
+    OPENAI_HEDGE_PERCENTILE: Optional[float] = None  # ex. 0.9 : second run si le premier dépasse ce percentile
+    OPENAI_HEDGE_MIN_SAMPLES: int = 20  # runs mesurés avant d'activer la relance
+    OPENAI_HEDGE_WINDOW: int = 200  # derniers runs aboutis pris en compte
+    OPENAI_HEDGE_MAX_RUNS: int = 8  # seconds runs simultanés au plus (au-delà, pas de relance)
+
+    # DISJONCTEUR OPENAI (bascule vers le moteur local)
+    OPENAI_BREAKER_WINDOW: int = 20  # derniers appels pris en compte
+    OPENAI_BREAKER_MIN_CALLS: int = 5
+    OPENAI_BREAKER_FAILURE_RATE: float = 0.5  # part d'échecs ou d'appels lents qui ouvre le circuit
+    OPENAI_BREAKER_SLOW_SECONDS: float = 90
+    OPENAI_BREAKER_OPEN_SECONDS: float = 30  # avant l'appel d'essai
+
+    # FAISABILITE
+    PLANNING_DAY_END: time = time(22, 0)  # fin de journée par défaut, surchargée par constraints["end_time"]
+
+    # CANDIDATS DE GENERATION
+    PLANNING_CANDIDATES_DEADLINE_SECONDS: float = 60  # au-delà, le meilleur candidat déjà évalué est retenu
+
+    # POOL DE CALCUL (moteur local, scores, simulations)
+    PROCESS_POOL_WORKERS: Optional[int] = None  # nombre de cœurs par défaut
+    PROCESS_POOL_JOB_TIMEOUT_SECONDS: float = 10
+
+    # SIMULATION
+    SIMULATION_MAX_MATCHES: int = 2000  # par scénario : le moteur local est ~quadratique (2 016 matchs ≈ 4 s)
+
+    # IDEMPOTENCE (en-tête Idempotency-Key sur /generate et /regenerate)
+    IDEMPOTENCY_TTL_SECONDS: float = 24 * 3600
+    IDEMPOTENCY_IN_PROGRESS_SECONDS: float = 600  # au-delà, une génération non terminée est considérée orpheline
+
+    # VERSIONS DE PLANNING
+    PLANNING_VERSIONS_KEPT: int = 3  # versions conservées par tournoi (active comprise)
+
+    # CACHES
+    SCHEDULE_INDEX_TTL_SECONDS: float = 30  # filet de sécurité multi-workers
+
+    # OBSERVABILITE
+    OTLP_TRACES_ENDPOINT: Optional[str] = None  # ex: http://localhost:4318/v1/traces
+    PROFILING_ENABLED: bool = False  # autorise le header X-Profile
+    PROFILING_INTERVAL_MS: int = 5
+    DEBUG_TOKEN: Optional[str] = None  # monte /debug/* (traces, profils), en-tête X-Debug-Token requis
 
     model_config = ConfigDict(
         env_file=".env",
@@ -0,0 +1,315 @@
+import threading
+import time
+from contextlib import contextmanager
+from functools import wraps
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+# Buckets en secondes : de quelques ms (Supabase) jusqu'au timeout de l'assistant (120 s)
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
+
+
+def _escapeLabelValue(value: str) -> str:
+    """Echappe une valeur de label selon le format texte Prometheus"""
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _formatLabels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    """Construit la partie {label="valeur",...} d'un échantillon"""
+    pairs = [f'{name}="{_escapeLabelValue(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{extra[1]}"')
+    if not pairs:
+        return ""
+    return "{" + ",".join(pairs) + "}"
+
+
+def _formatValue(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    """Base commune : nom, aide et labels d'une métrique"""
+
+    metricType = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelNames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelNames = tuple(labelNames)
+        self._lock = threading.Lock()
+
+    def _labelValues(self, labels: Dict[str, str]) -> Tuple[str, ...]:
+        if set(labels) != set(self.labelNames):
+            raise ValueError(f"Labels attendus pour {self.name}: {self.labelNames}, reçus: {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelNames)
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metricType}",
+        ]
+        lines.extend(self._samples())
+        return lines
+
+    def _samples(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Compteur monotone"""
+
+    metricType = "counter"
+
+    def __init__(self, name: str, documentation: str, labelNames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelNames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._labelValues(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._labelValues(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_formatLabels(self.labelNames, key)} {_formatValue(value)}"
+            for key, value in items
+        ]
+
+
+class Gauge(_Metric):
+    """Valeur instantanée (peut monter et descendre)"""
+
+    metricType = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelNames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelNames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def set(self, value: float, **labels: str) -> None:
+        key = self._labelValues(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def inc(self, amount: float = 1.0, **labels: str) -> None:
+        key = self._labelValues(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def dec(self, amount: float = 1.0, **labels: str) -> None:
+        self.inc(-amount, **labels)
+
+    def value(self, **labels: str) -> float:
+        with self._lock:
+            return self._values.get(self._labelValues(labels), 0.0)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted(self._values.items())
+        return [
+            f"{self.name}{_formatLabels(self.labelNames, key)} {_formatValue(value)}"
+            for key, value in items
+        ]
+
+
+class Histogram(_Metric):
+    """Histogramme à buckets cumulés"""
+
+    metricType = "histogram"
+
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 labelNames: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelNames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [compteurs par bucket..., somme, total]
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = self._labelValues(labels)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                state = [0.0] * (len(self.buckets) + 2)
+                self._values[key] = state
+            for index, bound in enumerate(self.buckets):
+                if value <= bound:
+                    state[index] += 1
+            state[-2] += value
+            state[-1] += 1
+
+    @contextmanager
+    def time(self, **labels: str) -> Iterator[None]:
+        """Mesure la durée du bloc, y compris quand il lève une exception"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def _samples(self) -> List[str]:
+        with self._lock:
+            items = sorted((key, list(state)) for key, state in self._values.items())
+        lines = []
+        for key, state in items:
+            for index, bound in enumerate(self.buckets):
+                labels = _formatLabels(self.labelNames, key, ("le", _formatValue(bound)))
+                lines.append(f"{self.name}_bucket{labels} {_formatValue(state[index])}")
+            labels = _formatLabels(self.labelNames, key, ("le", "+Inf"))
+            lines.append(f"{self.name}_bucket{labels} {_formatValue(state[-1])}")
+            lines.append(f"{self.name}_sum{_formatLabels(self.labelNames, key)} {_formatValue(state[-2])}")
+            lines.append(f"{self.name}_count{_formatLabels(self.labelNames, key)} {_formatValue(state[-1])}")
+        return lines
+
+
+class MetricsRegistry:
+    """Registre en mémoire, exposé au format texte Prometheus sur /metrics"""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            if metric.name in self._metrics:
+                raise ValueError(f"Métrique déjà enregistrée: {metric.name}")
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelNames: Sequence[str] = ()) -> Counter:
+        return self.register(Counter(name, documentation, labelNames))
+
+    def gauge(self, name: str, documentation: str, labelNames: Sequence[str] = ()) -> Gauge:
+        return self.register(Gauge(name, documentation, labelNames))
+
+    def histogram(self,
+                  name: str,
+                  documentation: str,
+                  labelNames: Sequence[str] = (),
+                  buckets: Sequence[float] = DEFAULT_BUCKETS) -> Histogram:
+        return self.register(Histogram(name, documentation, labelNames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+def timeCalls(histogram: Histogram, labelName: str = "method") -> Callable:
+    """Décorateur : observe la durée de chaque appel avec le nom de la fonction en label"""
+    def decorator(func: Callable) -> Callable:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with histogram.time(**{labelName: func.__name__}):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+# Instance globale
+registry = MetricsRegistry()
+
+planningStageSeconds = registry.histogram(
+    "planning_generation_stage_seconds",
+    "Durée de chaque étape de AIPlanningService.generatePlanning",
+    ["stage"]
+)
+databaseCallSeconds = registry.histogram(
+    "database_service_call_seconds",
+    "Durée de chaque appel DatabaseService",
+    ["method"]
+)
+openaiRunStatusTotal = registry.counter(
+    "openai_run_status_total",
+    "Statuts finaux des runs Assistants OpenAI",
+    ["status"]
+)
+openaiHedgesTotal = registry.counter(
+    "openai_hedged_runs_total",
+    "Runs Assistants doublés (started, skipped si OPENAI_HEDGE_MAX_RUNS atteint) et run gagnant (primary_won, hedge_won)",
+    ["outcome"]
+)
+openaiParseFailuresTotal = registry.counter(
+    "openai_parse_failures_total",
+    "Réponses de l'assistant impossibles à parser en JSON"
+)
+cacheHitsTotal = registry.counter(
+    "cache_hits_total",
+    "Lectures servies depuis un cache en mémoire",
+    ["cache"]
+)
+cacheMissesTotal = registry.counter(
+    "cache_misses_total",
+    "Lectures non servies par un cache en mémoire",
+    ["cache"]
+)
+planningCandidatesTotal = registry.counter(
+    "planning_candidates_total",
+    "Candidats de génération de planning par moteur et issue",
+    ["engine", "outcome"]
+)
+planningCancellationsTotal = registry.counter(
+    "planning_generation_cancelled_total",
+    "Générations abandonnées (client déconnecté) par étape atteinte",
+    ["stage"]
+)
+idempotentRequestsTotal = registry.counter(
+    "idempotent_requests_total",
+    "Requêtes avec Idempotency-Key (new, completed, in_progress, mismatch)",
+    ["outcome"]
+)
+planningDeltaRegenerationsTotal = registry.counter(
+    "planning_delta_regenerations_total",
+    "Régénérations par patch (applied, empty, rejected, skipped)",
+    ["outcome"]
+)
+circuitBreakerState = registry.gauge(
+    "circuit_breaker_state",
+    "État des disjoncteurs (0 fermé, 1 demi-ouvert, 2 ouvert)",
+    ["breaker"]
+)
+circuitBreakerTransitionsTotal = registry.counter(
+    "circuit_breaker_transitions_total",
+    "Changements d'état des disjoncteurs",
+    ["breaker", "state"]
+)
+planningLocalFallbacksTotal = registry.counter(
+    "planning_local_fallback_total",
+    "Générations confiées au moteur local car le circuit OpenAI est ouvert"
+)
+processPoolWorkers = registry.gauge(
+    "process_pool_workers",
+    "Processus du pool de calcul (0 si arrêté)"
+)
+processPoolBusyJobs = registry.gauge(
+    "process_pool_busy_jobs",
+    "Jobs soumis au pool de calcul et pas encore terminés"
+)
+processPoolJobSeconds = registry.histogram(
+    "process_pool_job_seconds",
+    "Durée des jobs du pool de calcul (attente comprise)",
+    ["job"]
+)
+processPoolJobsTotal = registry.counter(
+    "process_pool_jobs_total",
+    "Jobs du pool de calcul par issue (ok, error, timeout, recycled, inline)",
+    ["job", "outcome"]
+)
+processPoolRecyclesTotal = registry.counter(
+    "process_pool_recycles_total",
+    "Pools de calcul remplacés après un job démarré qui a dépassé son délai"
+)
@@ -0,0 +1,164 @@
+import asyncio
+import os
+import threading
+import time
+from concurrent.futures import CancelledError, Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Optional, TypeVar
+from app.core.config import settings
+from app.core.metrics import (
+    processPoolBusyJobs, processPoolJobSeconds, processPoolJobsTotal, processPoolRecyclesTotal, processPoolWorkers
+)
+
+ResultT = TypeVar("ResultT")
+
+
+class ProcessPool:
+    """
+    Pool de processus partagé pour le calcul CPU (moteur local, scores, simulations)
+
+    Démarré et arrêté par le lifespan de l'application. Les jobs sont des
+    fonctions de module aux entrées compactes (bytes JSON, tuples) pour limiter
+    le coût du pickling. Sans pool démarré (scripts, benchmarks), un job
+    s'exécute dans le thread appelant.
+
+    Un job démarré qui dépasse son délai ne peut pas être interrompu : le pool
+    est alors recyclé (nouveaux processus, anciens processus tués). Les autres
+    jobs perdus avec l'ancien pool (BrokenProcessPool ou annulés en file) sont
+    relancés une fois sur le nouveau.
+    """
+
+    def __init__(self, workers: Optional[int] = None, timeout: Optional[float] = None):
+        self.workers = workers or settings.PROCESS_POOL_WORKERS or os.cpu_count() or 1
+        self.timeout = timeout or settings.PROCESS_POOL_JOB_TIMEOUT_SECONDS
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+    @property
+    def started(self) -> bool:
+        return self._executor is not None
+
+    def start(self) -> None:
+        """Crée les processus (une fois), au démarrage de l'application"""
+        with self._lock:
+            if self._executor is not None:
+                return
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        # Premier job : les processus sont créés maintenant et non à la première requête
+        self._executor.submit(int).result()
+        processPoolWorkers.set(self.workers)
+        print(f"Pool de calcul demarre ({self.workers} processus)")
+
+    def shutdown(self) -> None:
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True, cancel_futures=True)
+            processPoolWorkers.set(0)
+            print("Pool de calcul arrete")
+
+    def submit(self, job: str, func: Callable[..., ResultT], *args: Any) -> "Future[ResultT]":
+        """Soumet un job ; `job` nomme le job dans les métriques"""
+        executor = self._executor
+        if executor is None:
+            future: Future = Future()
+            started = time.perf_counter()
+            try:
+                future.set_result(func(*args))
+            except Exception as e:
+                future.set_exception(e)
+            processPoolJobSeconds.observe(time.perf_counter() - started, job=job)
+            processPoolJobsTotal.inc(job=job, outcome="inline")
+            return future
+
+        processPoolBusyJobs.inc()
+        started = time.perf_counter()
+
+        def done(finished: Future) -> None:
+            processPoolBusyJobs.dec()
+            processPoolJobSeconds.observe(time.perf_counter() - started, job=job)
+            if not finished.cancelled():
+                error = finished.exception()
+                outcome = "recycled" if isinstance(error, BrokenProcessPool) else "error" if error else "ok"
+                processPoolJobsTotal.inc(job=job, outcome=outcome)
+
+        future = executor.submit(func, *args)
+        future.add_done_callback(done)
+        return future
+
+    def run(self, job: str, func: Callable[..., ResultT], *args: Any, timeout: Optional[float] = None) -> ResultT:
+        """
+        Exécute un job et attend son résultat
+
+        Raises:
+            TimeoutError: délai dépassé (le job est annulé s'il n'a pas démarré)
+        """
+        for attempt in range(2):
+            executor = self._executor
+            future = self.submit(job, func, *args)
+            try:
+                future.exception(timeout=timeout or self.timeout)
+            except TimeoutError:
+                self._timedOut(job, future, executor)
+                raise TimeoutError(f"Job {job} : délai de {timeout or self.timeout}s dépassé")
+            except CancelledError:
+                pass
+            if attempt or not self._lostInRecycle(job, future, executor):
+                break
+        return future.result()
+
+    async def runAsync(self, job: str, func: Callable[..., ResultT], *args: Any,
+                       timeout: Optional[float] = None) -> ResultT:
+        """Comme run, sans bloquer la boucle d'événements"""
+        for attempt in range(2):
+            executor = self._executor
+            future = self.submit(job, func, *args)
+            waiter = asyncio.wrap_future(future)
+            try:
+                # asyncio.wait ne propage pas l'annulation du job : elle est distinguée de celle de la requête
+                done, _ = await asyncio.wait({waiter}, timeout=timeout or self.timeout)
+            except asyncio.CancelledError:
+                waiter.cancel()
+                raise
+            if not done:
+                self._timedOut(job, future, executor)
+                waiter.cancel()
+                raise TimeoutError(f"Job {job} : délai de {timeout or self.timeout}s dépassé")
+            if not waiter.cancelled():
+                waiter.exception()  # lue ici, le résultat est relu sur `future`
+            if attempt or not self._lostInRecycle(job, future, executor):
+                break
+        return future.result()
+
+    def _lostInRecycle(self, job: str, future: Future, executor: Optional[ProcessPoolExecutor]) -> bool:
+        """Vrai si le job a échoué seulement parce qu'un autre job a fait recycler son pool"""
+        if executor is None or self._executor in (executor, None):
+            return False
+        if not future.cancelled() and not isinstance(future.exception(), BrokenProcessPool):
+            return False
+        print(f"Job {job} : pool recycle pendant le job, relance")
+        return True
+
+    def _timedOut(self, job: str, future: Future, executor: Optional[ProcessPoolExecutor]) -> None:
+        processPoolJobsTotal.inc(job=job, outcome="timeout")
+        print(f"Job {job} : delai depasse")
+        # Un job encore en file est simplement annulé ; démarré, il occupe son processus jusqu'au bout
+        if not future.cancel() and executor is not None:
+            self._recycle(executor)
+
+    def _recycle(self, executor: ProcessPoolExecutor) -> None:
+        """Remplace `executor` par un pool neuf et tue ses processus (une seule fois par pool)"""
+        with self._lock:
+            if self._executor is not executor:
+                return
+            self._executor = ProcessPoolExecutor(max_workers=self.workers)
+        # ProcessPoolExecutor n'expose pas ses processus avant Python 3.14 (terminate_workers)
+        for process in list((getattr(executor, "_processes", None) or {}).values()):
+            process.terminate()
+        executor.shutdown(wait=False, cancel_futures=True)
+        processPoolRecyclesTotal.inc()
+        print("Pool de calcul recycle : processus bloques arretes")
+
+
+# Instance globale
+processPool = ProcessPool()
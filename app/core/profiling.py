@@ -0,0 +1,132 @@
+import os
+import sys
+import threading
+import time
+from collections import Counter, OrderedDict
+from contextvars import ContextVar
+from typing import Dict, List, Optional, Set
+
+MAX_STORED_PROFILES = 50
+
+
+class SamplingProfiler:
+    """
+    Profileur par échantillonnage des threads d'une requête
+
+    Un thread de fond relève périodiquement la pile Python des threads suivis
+    et agrège les piles au format "folded" (une ligne "f1;f2;f3 N" par pile),
+    lisible directement par flamegraph.pl ou speedscope.
+
+    Limite : les threads suivis sont le thread de la boucle d'événements et
+    les threads du pool qui ont exécuté un span de la requête, jusqu'à la fin
+    du profil. Ils servent aussi les autres requêtes en cours : sous
+    concurrence, leurs piles se mélangent à celles de la requête profilée.
+    """
+
+    def __init__(self, intervalSeconds: float = 0.005):
+        self.profileId = os.urandom(8).hex()
+        self.intervalSeconds = intervalSeconds
+        self.samples: Counter = Counter()
+        self.sampleCount = 0
+        self._threadIds: Set[int] = set()
+        self._threadIdsLock = threading.Lock()
+        self._stopEvent = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.startedAt = time.time()
+        self.duration = 0.0
+
+    def attachThread(self, threadId: int) -> None:
+        with self._threadIdsLock:
+            self._threadIds.add(threadId)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._run, name=f"profiler-{self.profileId}", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stopEvent.set()
+        if self._thread:
+            self._thread.join()
+        self.duration = time.time() - self.startedAt
+
+    def _run(self) -> None:
+        ownId = threading.get_ident()
+        while not self._stopEvent.wait(self.intervalSeconds):
+            frames = sys._current_frames()
+            with self._threadIdsLock:
+                threadIds = tuple(self._threadIds)
+            for threadId in threadIds:
+                if threadId == ownId:
+                    continue
+                frame = frames.get(threadId)
+                if frame is not None:
+                    self.samples[self._foldStack(frame)] += 1
+                    self.sampleCount += 1
+
+    @staticmethod
+    def _foldStack(frame) -> str:
+        stack: List[str] = []
+        while frame is not None:
+            code = frame.f_code
+            stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{frame.f_lineno})")
+            frame = frame.f_back
+        return ";".join(reversed(stack))
+
+    def folded(self) -> str:
+        """Piles agrégées au format folded, la plus fréquente en premier"""
+        return "\n".join(f"{stack} {count}" for stack, count in self.samples.most_common()) + "\n"
+
+
+_activeProfiler: ContextVar[Optional[SamplingProfiler]] = ContextVar("active_profiler", default=None)
+
+
+def startProfiler(intervalSeconds: float) -> SamplingProfiler:
+    """Démarre un profileur pour la requête courante, sur le thread courant"""
+    profiler = SamplingProfiler(intervalSeconds)
+    profiler.attachThread(threading.get_ident())
+    _activeProfiler.set(profiler)
+    profiler.start()
+    return profiler
+
+
+def attachCurrentThread() -> None:
+    """Ajoute le thread courant au profileur de la requête, s'il y en a un"""
+    profiler = _activeProfiler.get()
+    if profiler is not None:
+        profiler.attachThread(threading.get_ident())
+
+
+class ProfileStore:
+    """Tampon circulaire des derniers profils, consultable via /debug/profiles"""
+
+    def __init__(self, maxSize: int = MAX_STORED_PROFILES):
+        self.maxSize = maxSize
+        self._profiles: "OrderedDict[str, SamplingProfiler]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, profiler: SamplingProfiler) -> None:
+        with self._lock:
+            self._profiles[profiler.profileId] = profiler
+            while len(self._profiles) > self.maxSize:
+                self._profiles.popitem(last=False)
+
+    def get(self, profileId: str) -> Optional[SamplingProfiler]:
+        with self._lock:
+            return self._profiles.get(profileId)
+
+    def summaries(self) -> List[Dict[str, object]]:
+        with self._lock:
+            profilers = list(self._profiles.values())
+        return [
+            {
+                "profile_id": profiler.profileId,
+                "started_at": profiler.startedAt,
+                "duration_s": round(profiler.duration, 3),
+                "samples": profiler.sampleCount,
+            }
+            for profiler in reversed(profilers)
+        ]
+
+
+# Instance globale
+profileStore = ProfileStore()
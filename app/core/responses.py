@@ -0,0 +1,136 @@
+import gzip
+import threading
+from collections import OrderedDict
+from typing import Dict, Hashable, Optional, Tuple
+
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+
+from app.core.metrics import cacheHitsTotal, cacheMissesTotal
+from app.models.models import AITournamentPlanning
+
+try:
+    import brotli
+except ImportError:  # brotli est optionnel : on retombe sur gzip
+    brotli = None
+
+MIN_COMPRESS_BYTES = 1024
+MAX_CACHED_RESPONSES = 256
+GZIP_LEVEL = 6
+BROTLI_QUALITY = 5
+
+
+def negotiateEncoding(acceptEncoding: str) -> Optional[str]:
+    """Choisit br ou gzip selon l'en-tête Accept-Encoding (q=0 exclut l'encodage)"""
+    accepted: Dict[str, float] = {}
+    for part in acceptEncoding.split(","):
+        token, _, params = part.strip().partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if token:
+            accepted[token.lower()] = quality
+
+    def allowed(encoding: str) -> bool:
+        return accepted.get(encoding, accepted.get("*", 0.0)) > 0
+
+    if brotli is not None and allowed("br"):
+        return "br"
+    if allowed("gzip"):
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class PlanningResponseCache:
+    """
+    Cache LRU des plannings déjà sérialisés (et de leurs réponses compressées)
+
+    La clé inclut updated_at et status : toute modification du planning en DB
+    change la clé, l'ancienne entrée sort naturellement par LRU.
+    """
+
+    def __init__(self, maxEntries: int = MAX_CACHED_RESPONSES):
+        self.maxEntries = maxEntries
+        self._entries: "OrderedDict[Tuple, Dict[Hashable, bytes]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Tuple, variant: Hashable) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            return entry.get(variant)
+
+    def put(self, key: Tuple, variant: Hashable, body: bytes) -> None:
+        with self._lock:
+            entry = self._entries.setdefault(key, {})
+            entry[variant] = body
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxEntries:
+                self._entries.popitem(last=False)
+
+
+def envelope(message: str, data: bytes) -> bytes:
+    """Enveloppe StandardResponse assemblée autour d'octets déjà sérialisés"""
+    return b'{"success":true,"message":' + orjson.dumps(message) + b',"data":' + data + b"}"
+
+
+def planningResponse(request: Request,
+                     planning: AITournamentPlanning,
+                     message: str,
+                     statusCode: int = 200,
+                     includePlanningData: bool = True) -> Response:
+    """
+    Réponse PlanningResponse pré-sérialisée, compressée si le client l'accepte
+
+    Args:
+        request: requête entrante (pour Accept-Encoding)
+        planning: planning à renvoyer
+        message: message de l'enveloppe StandardResponse
+        statusCode: code HTTP
+        includePlanningData: False pour omettre le JSON brut planning_data
+    """
+    key = None
+    if planning.id and planning.updated_at:
+        key = (planning.id, str(planning.updated_at), planning.status, includePlanningData)
+
+    data = planningResponseCache.get(key, "data") if key else None
+    if data is None:
+        cacheMissesTotal.inc(cache="planning_response")
+        exclude = None if includePlanningData else {"planning_data"}
+        data = orjson.dumps(planning.model_dump(exclude=exclude), option=orjson.OPT_NON_STR_KEYS)
+        if key:
+            planningResponseCache.put(key, "data", data)
+    else:
+        cacheHitsTotal.inc(cache="planning_response")
+
+    body = envelope(message, data)
+
+    headers = {"Vary": "Accept-Encoding"}
+    encoding = negotiateEncoding(request.headers.get("accept-encoding", "")) if len(body) >= MIN_COMPRESS_BYTES else None
+    if encoding:
+        compressed = planningResponseCache.get(key, (message, encoding)) if key else None
+        if compressed is None:
+            compressed = compress(body, encoding)
+            if key:
+                planningResponseCache.put(key, (message, encoding), compressed)
+        body = compressed
+        headers["Content-Encoding"] = encoding
+
+    return Response(content=body, status_code=statusCode, media_type="application/json", headers=headers)
+
+
+# Instance globale
+planningResponseCache = PlanningResponseCache()
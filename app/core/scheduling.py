@@ -0,0 +1,70 @@
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, Optional
+
+from app.models.models import Tournament
+
+# Mêmes valeurs que la contrainte imposée à l'IA ("Pas de match entre 12h et 13h30")
+DEFAULT_LUNCH_START = time(12, 0)
+DEFAULT_LUNCH_END = time(13, 30)
+
+
+def _parseTime(value: Any, default: time) -> time:
+    if isinstance(value, time):
+        return value
+    if isinstance(value, str):
+        try:
+            return time.fromisoformat(value)
+        except ValueError:
+            pass
+    return default
+
+
+class SchedulingRules:
+    """
+    Règles horaires d'un tournoi : durée des matchs, pause entre deux matchs
+    d'un même terrain ou d'une même équipe, pause déjeuner sans match
+    """
+
+    def __init__(self,
+                 matchDuration: timedelta,
+                 breakDuration: timedelta,
+                 lunchStart: Optional[time] = DEFAULT_LUNCH_START,
+                 lunchEnd: Optional[time] = DEFAULT_LUNCH_END):
+        self.matchDuration = matchDuration
+        self.breakDuration = breakDuration
+        self.lunchStart = lunchStart
+        self.lunchEnd = lunchEnd
+
+    @classmethod
+    def fromTournament(cls, tournament: Tournament) -> "SchedulingRules":
+        """
+        Règles d'un tournoi, la pause déjeuner peut être surchargée dans
+        tournament.constraints ("lunch_start"/"lunch_end" au format HH:MM,
+        "lunch_break": false pour la désactiver)
+        """
+        constraints: Dict[str, Any] = tournament.constraints or {}
+        lunchStart, lunchEnd = None, None
+        if constraints.get("lunch_break", True):
+            lunchStart = _parseTime(constraints.get("lunch_start"), DEFAULT_LUNCH_START)
+            lunchEnd = _parseTime(constraints.get("lunch_end"), DEFAULT_LUNCH_END)
+        return cls(
+            matchDuration=timedelta(minutes=tournament.match_duration_minutes),
+            breakDuration=timedelta(minutes=tournament.break_duration_minutes),
+            lunchStart=lunchStart,
+            lunchEnd=lunchEnd
+        )
+
+    def nextAvailable(self, end: datetime) -> datetime:
+        """Premier horaire possible après un match terminé à `end`"""
+        return end + self.breakDuration
+
+    def earliestStart(self, start: datetime, duration: Optional[timedelta] = None) -> datetime:
+        """Décale `start` après la pause déjeuner si le match la chevauche"""
+        if self.lunchStart is None or self.lunchEnd is None:
+            return start
+        duration = duration if duration is not None else self.matchDuration
+        lunchStart = start.replace(hour=self.lunchStart.hour, minute=self.lunchStart.minute, second=0, microsecond=0)
+        lunchEnd = start.replace(hour=self.lunchEnd.hour, minute=self.lunchEnd.minute, second=0, microsecond=0)
+        if start < lunchEnd and start + duration > lunchStart:
+            return lunchEnd
+        return start
@@ -0,0 +1,249 @@
+import inspect
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+import httpx
+
+from app.core.config import settings
+from app.core.profiling import attachCurrentThread
+
+SERVICE_NAME = "service-ia"
+MAX_STORED_TRACES = 200
+
+
+class Span:
+    """Un intervalle de temps nommé à l'intérieur d'une trace"""
+
+    __slots__ = ("name", "traceId", "spanId", "parentId", "kind", "start", "end", "attributes", "error")
+
+    def __init__(self, name: str, traceId: str, parentId: Optional[str], kind: str = "internal"):
+        self.name = name
+        self.traceId = traceId
+        self.spanId = os.urandom(8).hex()
+        self.parentId = parentId
+        self.kind = kind
+        self.start = time.time_ns()
+        self.end: Optional[int] = None
+        self.attributes: Dict[str, Any] = {}
+        self.error: Optional[str] = None
+
+    def setAttribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def toDict(self) -> Dict[str, Any]:
+        end = self.end or time.time_ns()
+        return {
+            "name": self.name,
+            "span_id": self.spanId,
+            "parent_id": self.parentId,
+            "kind": self.kind,
+            "start_unix_nano": self.start,
+            "end_unix_nano": end,
+            "duration_ms": round((end - self.start) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _NoopSpan:
+    """Span renvoyé hors requête tracée : ne coûte rien"""
+
+    def setAttribute(self, key: str, value: Any) -> None:
+        pass
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class Trace:
+    """Ensemble des spans d'une requête"""
+
+    def __init__(self, traceId: Optional[str] = None):
+        self.traceId = traceId or os.urandom(16).hex()
+        self.spans: List[Span] = []
+        self._lock = threading.Lock()
+
+    def addSpan(self, span: Span) -> None:
+        with self._lock:
+            self.spans.append(span)
+
+    def toDict(self) -> Dict[str, Any]:
+        with self._lock:
+            spans = [span.toDict() for span in self.spans]
+        return {"trace_id": self.traceId, "spans": spans}
+
+
+_currentTrace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_currentSpan: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes: Any) -> Iterator[Any]:
+    """
+    Ouvre un span enfant du span courant
+
+    Hors d'une trace (script, benchmark, tâche de fond) c'est un no-op.
+    """
+    trace = _currentTrace.get()
+    if trace is None:
+        yield _NOOP_SPAN
+        return
+
+    # Le thread qui exécute ce span est échantillonné si la requête est profilée
+    attachCurrentThread()
+
+    parent = _currentSpan.get()
+    current = Span(name, trace.traceId, parent.spanId if parent else None, kind)
+    current.attributes.update(attributes)
+    trace.addSpan(current)
+    token = _currentSpan.set(current)
+    try:
+        yield current
+    except Exception as e:
+        current.error = str(e)
+        raise
+    finally:
+        current.end = time.time_ns()
+        _currentSpan.reset(token)
+
+
+def traced(name: Optional[str] = None) -> Callable:
+    """Décorateur : enveloppe chaque appel de la fonction dans un span"""
+    def decorator(func: Callable) -> Callable:
+        spanName = name or func.__qualname__
+
+        if inspect.iscoroutinefunction(func):
+            @wraps(func)
+            async def asyncWrapper(*args, **kwargs):
+                with span(spanName):
+                    return await func(*args, **kwargs)
+            return asyncWrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            with span(spanName):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def startTrace(rootName: str, **attributes: Any) -> Iterator[Trace]:
+    """Démarre une trace (une par requête HTTP) et l'archive à la fin"""
+    trace = Trace()
+    traceToken = _currentTrace.set(trace)
+    try:
+        with span(rootName, kind="server", **attributes):
+            yield trace
+    finally:
+        _currentTrace.reset(traceToken)
+        traceStore.add(trace)
+        otlpExporter.export(trace)
+
+
+class TraceStore:
+    """Tampon circulaire des dernières traces, consultable via /debug/traces"""
+
+    def __init__(self, maxSize: int = MAX_STORED_TRACES):
+        self.maxSize = maxSize
+        self._traces: "OrderedDict[str, Trace]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, trace: Trace) -> None:
+        with self._lock:
+            self._traces[trace.traceId] = trace
+            while len(self._traces) > self.maxSize:
+                self._traces.popitem(last=False)
+
+    def get(self, traceId: str) -> Optional[Trace]:
+        with self._lock:
+            return self._traces.get(traceId)
+
+    def recent(self, limit: int = 50) -> List[Trace]:
+        with self._lock:
+            traces = list(self._traces.values())
+        return traces[-limit:][::-1]
+
+
+def _otlpValue(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+def toOtlp(trace: Trace) -> Dict[str, Any]:
+    """Convertit une trace au format OTLP/HTTP JSON"""
+    kinds = {"internal": 1, "server": 2, "client": 3}
+    with trace._lock:
+        spans = list(trace.spans)
+    otlpSpans = []
+    for item in spans:
+        otlpSpan = {
+            "traceId": item.traceId,
+            "spanId": item.spanId,
+            "name": item.name,
+            "kind": kinds.get(item.kind, 1),
+            "startTimeUnixNano": str(item.start),
+            "endTimeUnixNano": str(item.end or time.time_ns()),
+            "attributes": [{"key": key, "value": _otlpValue(value)} for key, value in item.attributes.items()],
+            "status": {"code": 2, "message": item.error} if item.error else {"code": 1},
+        }
+        if item.parentId:
+            otlpSpan["parentSpanId"] = item.parentId
+        otlpSpans.append(otlpSpan)
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": SERVICE_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "app.core.tracing"}, "spans": otlpSpans}],
+        }]
+    }
+
+
+class OTLPExporter:
+    """Envoie les traces à un collecteur OTLP local, depuis un thread dédié"""
+
+    def __init__(self, endpoint: Optional[str]):
+        self.endpoint = endpoint
+        self._queue: "queue.Queue[Trace]" = queue.Queue(maxsize=1000)
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def export(self, trace: Trace) -> None:
+        if not self.endpoint:
+            return
+        self._ensureThread()
+        try:
+            self._queue.put_nowait(trace)
+        except queue.Full:
+            print("⚠️ File d'export OTLP pleine, trace ignorée")
+
+    def _ensureThread(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="otlp-exporter", daemon=True)
+                self._thread.start()
+
+    def _run(self) -> None:
+        with httpx.Client(timeout=5.0) as client:
+            while True:
+                trace = self._queue.get()
+                try:
+                    client.post(self.endpoint, json=toOtlp(trace))
+                except Exception as e:
+                    print(f"⚠️ Export OTLP échoué: {e}")
+
+
+# Instances globales
+traceStore = TraceStore()
+otlpExporter = OTLPExporter(settings.OTLP_TRACES_ENDPOINT)
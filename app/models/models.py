@@ -1,7 +1,9 @@
-from pydantic import BaseModel
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, PrivateAttr, TypeAdapter, ValidationError
+from typing import List, Optional, Dict, Any, Tuple, Type, TypeVar
 from datetime import datetime, date, time 
 
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
 class Tournament(BaseModel):
     """Représente un tournoi"""
     
@@ -76,6 +78,9 @@ class EliminationMatch(Match):
     """Match d'élimination"""
     pass
 
+# Validation en lot (côté Rust) des listes de matchs non typées renvoyées par l'IA
+_eliminationMatchesAdapter = TypeAdapter(List[EliminationMatch])
+
 class Poule(BaseModel):
     """Représente une poule"""
     
@@ -120,6 +125,28 @@ class AIPlanningData(BaseModel):
     # Commun
     final_ranking: List[FinalRanking] = []
     commentaires: Optional[str] = None
+
+    _elimination_rounds: Optional[Dict[str, List[EliminationMatch]]] = PrivateAttr(default=None)
+
+    def elimination_rounds(self) -> Dict[str, List[EliminationMatch]]:
+        """Valide (une seule fois) les tours de rounds_elimination, ignore les matchs invalides"""
+        if self._elimination_rounds is None:
+            rounds = {}
+            for name, matches in self.rounds_elimination.items():
+                if not isinstance(matches, list):
+                    continue
+                try:
+                    rounds[name] = _eliminationMatchesAdapter.validate_python(matches)
+                except ValidationError:
+                    # Chemin lent : on garde les matchs valides du tour
+                    rounds[name] = []
+                    for match in matches:
+                        try:
+                            rounds[name].append(EliminationMatch.model_validate(match))
+                        except ValidationError as e:
+                            print(f"Match élimination directe invalide ignore: {e}")
+            self._elimination_rounds = rounds
+        return self._elimination_rounds
     
     def calculate_total_matches(self) -> int:
         """Calcule le nombre total de matchs"""
@@ -140,6 +167,10 @@ class AIPlanningData(BaseModel):
                 total += 1
             if self.phase_elimination_apres_poules.match_troisieme_place:
                 total += 1
+
+        # Élimination directe
+        for matches in self.elimination_rounds().values():
+            total += len(matches)
         
         return total
 
@@ -164,6 +195,42 @@ class AITournamentPlanning(BaseModel):
             return AIPlanningData(**self.planning_data)
         return None
 
+# Statuts d'un match : scheduled, in_progress, completed, cancelled, forfeit
+# Un match annulé ou forfait n'occupe plus ni terrain ni équipes
+INACTIVE_STATUSES = frozenset({"cancelled", "forfeit"})
+
+# Placeholders : winner_/loser_ + match_id_ai, 1er_/2e_... + poule_id
+# Les ids générés par l'IA portent un préfixe que leurs placeholders omettent
+# ('elim_quart_1' est désigné par 'winner_quart_1')
+MATCH_PREFIXES = ("winner_", "loser_")
+RANK_LABELS = ("1er", "2e", "3e", "4e", "5e", "6e", "7e", "8e")
+ELIMINATION_ID_PREFIX = "elim_"
+
+
+def teamKey(team: str) -> str:
+    """Nom d'équipe normalisé pour les comparaisons (casse et espaces ignorés)"""
+    return team.strip().casefold()
+
+
+def isPlaceholder(team: str) -> bool:
+    return team.startswith(MATCH_PREFIXES) or team.split("_", 1)[0] in RANK_LABELS
+
+
+def placeholderMatchIds(matchIdAi: str) -> List[str]:
+    """Ids sous lesquels les placeholders winner_/loser_ désignent un match"""
+    if matchIdAi.startswith(ELIMINATION_ID_PREFIX):
+        return [matchIdAi, matchIdAi[len(ELIMINATION_ID_PREFIX):]]
+    return [matchIdAi]
+
+
+def placeholderKeys(matchIdAi: str, pouleId: Optional[str] = None) -> List[str]:
+    """Placeholders déterminés par un match : winner_/loser_ du match, classement de sa poule"""
+    keys = [f"{prefix}{matchId}" for matchId in placeholderMatchIds(matchIdAi) for prefix in MATCH_PREFIXES]
+    if pouleId:
+        keys.extend(f"{label}_{pouleId}" for label in RANK_LABELS)
+    return keys
+
+
 class AIGeneratedMatch(BaseModel):
     """Match généré par l'IA"""
     
@@ -178,15 +245,17 @@ class AIGeneratedMatch(BaseModel):
     phase: str  # 'poules', 'elimination', 'finale'
     poule_id: Optional[str] = None  # Si c'est un match de poule
     journee: Optional[int] = None  # Si c'est du round robin
-    status: str = 'scheduled'
+    status: str = 'scheduled'  # voir INACTIVE_STATUSES
+    # Nom de l'équipe qui remplace le placeholder (même forme que equipe_a/equipe_b, pas un id de team)
     resolved_equipe_a_id: Optional[str] = None
     resolved_equipe_b_id: Optional[str] = None
+    score_a: Optional[int] = None
+    score_b: Optional[int] = None
     created_at: Optional[datetime] = None
     
     def is_placeholder(self) -> bool:
         """Vérifie si le match contient des placeholders"""
-        placeholders = ['winner_', 'loser_', '1er_', '2e_']
-        return any(ph in self.equipe_a for ph in placeholders) or any(ph in self.equipe_b for ph in placeholders)
+        return isPlaceholder(self.equipe_a) or isPlaceholder(self.equipe_b)
 
 class AIGeneratedPoule(BaseModel):
     """Poule générée par l'IA"""
@@ -223,4 +292,32 @@ class Profile(BaseModel):
     updated_at: datetime
     last_login: Optional[datetime] = None
 
-User = Profile
\ No newline at end of file
+User = Profile
+
+_TIMESTAMP_FIELDS: Dict[type, Tuple[str, ...]] = {}
+
+def _timestampFields(model: Type[BaseModel]) -> Tuple[str, ...]:
+    """Champs datetime (ou Optional[datetime]) d'un modèle, calculés une fois par classe"""
+    fields = _TIMESTAMP_FIELDS.get(model)
+    if fields is None:
+        fields = tuple(
+            name for name, info in model.model_fields.items()
+            if info.annotation in (datetime, Optional[datetime])
+        )
+        _TIMESTAMP_FIELDS[model] = fields
+    return fields
+
+def construct_from_row(model: Type[ModelT], row: Dict[str, Any]) -> ModelT:
+    """
+    Construit un modèle depuis une ligne DB de confiance, sans validation Pydantic
+
+    Seuls les timestamps ISO sont convertis en datetime ; les autres valeurs
+    sont reprises telles quelles (la DB a déjà garanti leur type).
+    """
+    values = dict(row)
+    for name in _timestampFields(model):
+        value = values.get(name)
+        if isinstance(value, str):
+            values[name] = datetime.fromisoformat(value)
+    return model.model_construct(**values)
+
@@ -1,6 +1,76 @@
-from pydantic import BaseModel, Field
+from datetime import date, time
+from pydantic import BaseModel, Field, model_validator
+from typing import Annotated, Any, Dict, List, Literal, Optional
+
+TournamentType = Literal["round_robin", "poules_elimination", "elimination_directe"]
 
 class GeneratePlanningRequest(BaseModel):
     """Requête pour générer un planning"""
     tournament_id: str = Field(..., description="ID du tournoi (UUID)")
+    ai_candidates: int = Field(1, ge=0, le=4, description="Runs IA lancés en parallèle")
+    local_candidates: int = Field(0, ge=0, le=16, description="Graines du moteur local lancées en parallèle")
+    deadline_seconds: Optional[float] = Field(None, gt=0, le=600, description="Échéance de sélection du meilleur candidat")
+
+    @model_validator(mode="after")
+    def check_candidates(self):
+        if self.ai_candidates + self.local_candidates == 0:
+            raise ValueError("Au moins un candidat requis")
+        return self
+
+
+class DelayMatchRequest(BaseModel):
+    """Requête pour retarder un match"""
+    delay_minutes: int = Field(..., gt=0, le=720, description="Retard en minutes")
+
+class WithdrawTeamRequest(BaseModel):
+    """Requête pour retirer une équipe du tournoi"""
+    compact: bool = Field(False, description="Avancer les matchs touchés dans les créneaux libérés")
+
+class MatchResultRequest(BaseModel):
+    """Requête pour enregistrer le score d'un match"""
+    score_a: int = Field(..., ge=0, description="Score de l'équipe A")
+    score_b: int = Field(..., ge=0, description="Score de l'équipe B")
+
+class MatchResultItem(BaseModel):
+    """Score et/ou statut d'un match dans un lot de résultats"""
+    match_id: str = Field(..., description="ID du match (ai_generated_match.id)")
+    score_a: Optional[int] = Field(None, ge=0)
+    score_b: Optional[int] = Field(None, ge=0)
+    status: Optional[Literal["scheduled", "in_progress", "completed", "cancelled"]] = Field(
+        None, description="completed par défaut quand un score est fourni"
+    )
+
+    @model_validator(mode="after")
+    def check_scores(self):
+        if (self.score_a is None) != (self.score_b is None):
+            raise ValueError("score_a et score_b vont ensemble")
+        if self.score_a is None and self.status is None:
+            raise ValueError("score ou status requis")
+        return self
+
+class BulkResultsRequest(BaseModel):
+    """Requête pour enregistrer un lot de résultats"""
+    results: List[MatchResultItem] = Field(..., min_length=1, max_length=500)
+
+class SimulationConfig(BaseModel):
+    """Configuration de tournoi simulée (mêmes champs que Tournament, équipes en nombre)"""
+    tournament_type: TournamentType
+    teams: int = Field(..., ge=2, le=256, description="Nombre d'équipes")
+    courts_available: int = Field(..., ge=1, le=64)
+    start_date: Optional[date] = None
+    start_time: Optional[time] = None
+    match_duration_minutes: int = Field(15, ge=1, le=240)
+    break_duration_minutes: int = Field(5, ge=0, le=120)
+    constraints: Dict[str, Any] = {}
+
+class SimulationGrid(BaseModel):
+    """Valeurs alternatives à croiser (liste vide : valeur de la configuration)"""
+    courts_available: List[Annotated[int, Field(ge=1, le=64)]] = Field([], max_length=32)
+    match_duration_minutes: List[Annotated[int, Field(ge=1, le=240)]] = Field([], max_length=32)
+    break_duration_minutes: List[Annotated[int, Field(ge=0, le=120)]] = Field([], max_length=32)
+    tournament_type: List[TournamentType] = Field([], max_length=3)
 
+class SimulatePlanningRequest(BaseModel):
+    """Requête de simulation : une configuration et une grille de variantes"""
+    config: SimulationConfig
+    grid: SimulationGrid = SimulationGrid()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, List
 from app.models.models import AITournamentPlanning
 
 class StandardResponse(BaseModel):
@@ -14,4 +14,45 @@ class PlanningResponse(StandardResponse):
 
 class StatusResponse(StandardResponse):
     """Réponse avec statut de planning"""
-    data: Optional[Dict[str, str]] = None
\ No newline at end of file
+    data: Optional[Dict[str, str]] = None
+
+class MatchesPage(BaseModel):
+    """Page de matchs (lignes ai_generated_match, éventuellement projetées)"""
+    matches: List[Dict[str, Any]] = []
+    next_cursor: Optional[str] = None
+
+class MatchesPageResponse(StandardResponse):
+    """Réponse paginée de matchs"""
+    data: Optional[MatchesPage] = None
+
+class StandingRow(BaseModel):
+    """Ligne du classement d'une poule"""
+    position: int
+    equipe: str
+    matchs_joues: int = 0
+    victoires: int = 0
+    nuls: int = 0
+    defaites: int = 0
+    points: int = 0
+    sets_pour: int = 0
+    sets_contre: int = 0
+    ratio_sets: Optional[float] = None
+
+class PouleStandingsData(BaseModel):
+    """Classement d'une poule"""
+    poule_id: str
+    nom_poule: str
+    complete: bool = False
+    classement: List[StandingRow] = []
+
+class StandingsResponse(StandardResponse):
+    """Réponse avec le classement d'une poule"""
+    data: Optional[PouleStandingsData] = None
+
+class QualityResponse(StandardResponse):
+    """Réponse avec les indicateurs de qualité d'un planning"""
+    data: Optional[Dict[str, Any]] = None
+
+class SimulationResponse(StandardResponse):
+    """Réponse avec le tableau des scénarios simulés"""
+    data: Optional[Dict[str, Any]] = None
@@ -1,9 +1,34 @@
-from typing import Optional, Dict, Any
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, time
+from typing import Optional, Dict, Any, List
+import orjson
+from app.core.config import settings
 from app.core.database import getSupabase
-from app.models.models import AITournamentPlanning
+from app.core.scheduling import SchedulingRules
+from app.models.models import (
+    INACTIVE_STATUSES, RANK_LABELS, AITournamentPlanning, AIPlanningData, AIGeneratedMatch, EliminationPhase,
+    PouleMatch, Tournament, construct_from_row
+)
 from app.services.tournament_service import tournamentService
 from app.services.openai_service import openai_service
 from app.services.database_service import databaseService
+from app.services.schedule_index_service import scheduleIndexService
+from app.services.placeholder_service import placeholderService
+from app.services.standings_service import standingsService
+from app.services.local_scheduler_service import localSchedulerService
+from app.services.reschedule_service import producedKeys, propagateSchedule, teamKeys
+from app.services.candidate_service import candidateService
+from app.services.feasibility_service import InfeasibleTournamentError, feasibilityService
+from app.services.idempotency_service import idempotencyService
+from app.services.quality_service import ScheduleArrays, listViolations, matchTuples, planningTuples, scoreSchedule
+from app.services.planning_patch import applyPlanningPatch, compactPlanning, syncPlanningData
+from app.services.planning_jobs import scheduleEliminationJob, schedulePouleJob
+from app.core.process_pool import processPool
+from app.core.metrics import (
+    planningCancellationsTotal, planningDeltaRegenerationsTotal, planningLocalFallbacksTotal, planningStageSeconds
+)
+from app.core.tracing import traced
 
 
 class AIPlanningService():
@@ -13,72 +38,193 @@ class AIPlanningService():
         self.openAIService = openai_service
         self.databaseService = databaseService
         self.tournamentService = tournamentService
+        self.scheduleIndexService = scheduleIndexService
+        self.placeholderService = placeholderService
+        self.standingsService = standingsService
+        self.localSchedulerService = localSchedulerService
+        self.processPool = processPool
+        self.candidateService = candidateService
+        self.feasibilityService = feasibilityService
+        self.idempotencyService = idempotencyService
+        self.versionsKept = settings.PLANNING_VERSIONS_KEPT
+        self._pruneExecutor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="planning-prune")
 
-    def generatePlanning(self, tournamentId: str) -> Optional[AITournamentPlanning]:
+    def generatePlanning(self,
+                         tournamentId: str,
+                         aiCandidates: int = 1,
+                         localCandidates: int = 0,
+                         deadlineSeconds: Optional[float] = None,
+                         cancelEvent: Optional[threading.Event] = None) -> Optional[AITournamentPlanning]:
         """
         Génère un planning complet pour un tournoi
         
         Args:
             tournament_id: ID du tournoi
+            aiCandidates: runs IA lancés en parallèle
+            localCandidates: graines du moteur local lancées en parallèle
+            deadlineSeconds: échéance de sélection du meilleur candidat
+            cancelEvent: positionné si le client abandonne : runs OpenAI annulés, rien n'est écrit
             
         Returns:
-            AITournamentPlanning si succès, None sinon
+            AITournamentPlanning si succès, None sinon (ou génération abandonnée)
+
+        Raises:
+            InfeasibleTournamentError: le tournoi ne peut pas tenir dans la journée
         """
         try: 
+            with planningStageSeconds.time(stage="total"):
+                return self._runGeneration(tournamentId, aiCandidates, localCandidates, deadlineSeconds, cancelEvent)
+        except InfeasibleTournamentError:
+            raise
+        except Exception as e:
+            print(f"Erreur generation planning: {e}")
+            return None
+
+    def _runGeneration(self,
+                       tournamentId: str,
+                       aiCandidates: int = 1,
+                       localCandidates: int = 0,
+                       deadlineSeconds: Optional[float] = None,
+                       cancelEvent: Optional[threading.Event] = None) -> Optional[AITournamentPlanning]:
+        """Enchaîne les étapes de génération en mesurant la durée de chacune"""
 
-            # Récupération des données tournoi avec équipes
+        # Récupération des données tournoi avec équipes
+        with planningStageSeconds.time(stage="fetch_tournament"):
             tournamentData = self.tournamentService.getTournamentWithTeams(tournamentId)
-            if not tournamentData:
-                print("Impossible de récupérer les données du tournoi")
-                return None
+        if not tournamentData:
+            print("Impossible de récupérer les données du tournoi")
+            return None
 
-            # valide les donnees
+        # valide les donnees
+        with planningStageSeconds.time(stage="validate"):
             isValidTournamentData = self.tournamentService._validateTournamentData(tournamentData)
-            if not isValidTournamentData:
-                print("Tournament data non valide")
-                return None
-            
-            # construction prompt
+        if not isValidTournamentData:
+            print("Tournament data non valide")
+            return None
+
+        # capacité : rejet immédiat si le tournoi ne peut pas tenir dans la journée
+        with planningStageSeconds.time(stage="feasibility"):
+            self.feasibilityService.check(tournamentData["tournament"], len(tournamentData["teams"]))
+        
+        # construction prompt
+        with planningStageSeconds.time(stage="build_prompt"):
             prompt = self._buildStaticPrompt(tournamentData)
 
-            # appel OpenAI
-            aiResponse = self.openAIService.generate_planning(prompt)
+        tournament = tournamentData["tournament"]
+        # OpenAI dégradé : pas d'attente inutile, le moteur local planifie seul
+        fallback = aiCandidates > 0 and not self.openAIService.breaker.available()
+        if fallback:
+            print("Circuit OpenAI ouvert : planning confie au moteur local")
+            planningLocalFallbacksTotal.inc()
+            aiCandidates, localCandidates = 0, max(1, localCandidates)
+
+        if aiCandidates == 1 and localCandidates == 0:
+            # appel OpenAI (file d'attente Assistants + parsing JSON)
+            with planningStageSeconds.time(stage="openai"):
+                aiResponse = self.openAIService.generate_planning(prompt, cancel_event=cancelEvent)
+            if self._cancelled(cancelEvent, "openai"):
+                return None
             if not aiResponse:
                 print("Echec OpenAI")
                 return None
 
-            # sauvegarde via database service
-            tournament = tournamentData["tournament"]
+            # validation unique de la réponse, partagée par les trois sauvegardes
+            with planningStageSeconds.time(stage="validate_response"):
+                aiPlanningData = AIPlanningData.model_validate(aiResponse)
+        else:
+            # candidats IA et moteur local en parallèle, le mieux noté à l'échéance
+            with planningStageSeconds.time(stage="candidates"):
+                candidate = self.candidateService.bestCandidate(
+                    tournament,
+                    [team.name for team in tournamentData["teams"]],
+                    prompt,
+                    aiRuns=aiCandidates,
+                    localSeeds=localCandidates,
+                    deadlineSeconds=deadlineSeconds,
+                    cancelEvent=cancelEvent
+                )
+            if self._cancelled(cancelEvent, "candidates"):
+                return None
+            if candidate is None:
+                print("Aucun candidat n'a abouti")
+                return None
+            aiResponse, aiPlanningData = candidate.planningData, candidate.aiPlanningData
+
+        if fallback:
+            comment = f"{aiPlanningData.commentaires} - service IA indisponible, planning de secours"
+            aiResponse = {**aiResponse, "commentaires": comment}
+            aiPlanningData = aiPlanningData.model_copy(update={"commentaires": comment})
+
+        # dernier point d'abandon : au-delà, le planning est écrit puis activé
+        if self._cancelled(cancelEvent, "before_save"):
+            return None
+
+        return self._saveVersion(tournamentId, tournament.tournament_type, aiResponse, aiPlanningData)
+
+    def _saveVersion(self,
+                     tournamentId: str,
+                     tournamentType: str,
+                     aiResponse: Dict[str, Any],
+                     aiPlanningData: AIPlanningData,
+                     previousPlanningId: Optional[str] = None) -> Optional[AITournamentPlanning]:
+        """
+        Écrit une nouvelle version (planning, matchs, poules) puis l'active
+
+        Avec previousPlanningId, les résultats déjà saisis sur cette version
+        (statuts, scores, équipes résolues) sont relus juste avant l'écriture
+        et reportés sur les nouveaux matchs.
+        """
+        previousMatches = None
+        if previousPlanningId:
+            previousMatches = self.databaseService.getAllMatches(previousPlanningId)
+            if previousMatches is None:
+                print("Echec lecture version precedente")
+                return None
+
+        # sauvegarde via database service
+        with planningStageSeconds.time(stage="save_planning"):
             planning = self.databaseService.savePlanning(
                 tournamentId,
                 aiResponse, 
-                tournament.tournament_type
+                tournamentType,
+                aiPlanningData
             )
 
-            if not planning:
-                print("Echec sauvegarde planning")
-                return None
-            
-            # sauvegarde les matchs
-            matches = self.databaseService.saveMatches(planning.id, aiResponse)
-            if matches is None:
-                print("Echec sauvegarde matchs - suppression planning")
-                self._deletePlanning(planning.id)
-                return None
-            
-            # sauvegarde les poules
-            poules = self.databaseService.savePoules(planning.id, aiResponse)
-            if poules is None:
-                print("Echec sauvegarde poules - suppression planning")
-                self._deletePlanning(planning.id)
-                return None
-
-            print(f"Planning genere : {planning.id}")
+        if not planning:
+            print("Echec sauvegarde planning")
+            return None
+        
+        # sauvegarde les matchs
+        with planningStageSeconds.time(stage="save_matches"):
+            matches = self.databaseService.saveMatches(planning.id, aiResponse, aiPlanningData, previousMatches)
+        if matches is None:
+            print("Echec sauvegarde matchs - suppression planning")
+            self._deletePlanning(planning.id)
+            return None
+        
+        # sauvegarde les poules
+        with planningStageSeconds.time(stage="save_poules"):
+            poules = self.databaseService.savePoules(planning.id, aiResponse, aiPlanningData)
+        if poules is None:
+            print("Echec sauvegarde poules - suppression planning")
+            self._deletePlanning(planning.id)
+            return None
 
-            return planning
-        except Exception as e:
-            print(f"Erreur generation planning: {e}")
+        # bascule atomique : la nouvelle version devient celle servie aux lectures
+        if not self.databaseService.setActivePlanning(tournamentId, planning.id):
+            print("Echec activation planning - suppression planning")
+            self._deletePlanning(planning.id)
             return None
+
+        # index équipe/terrain construits à partir des matchs déjà en mémoire
+        self.scheduleIndexService.buildIndex(planning.id, matches)
+
+        print(f"Planning genere : {planning.id}")
+
+        # les anciennes versions sont supprimées hors du chemin de la requête
+        self._pruneExecutor.submit(self._pruneVersions, tournamentId)
+
+        return planning
     
     def getPlanningStatus(self, planningId: str) -> Optional[str]:
         """
@@ -110,12 +256,29 @@ class AIPlanningService():
             print(f"❌ Erreur récupération statut: {e}")
             return None
 
-    def regeneratePlanning(self, planningId: str) -> Optional[AITournamentPlanning]:
+    def regeneratePlanning(self,
+                           planningId: str,
+                           aiCandidates: int = 1,
+                           localCandidates: int = 0,
+                           deadlineSeconds: Optional[float] = None,
+                           cancelEvent: Optional[threading.Event] = None,
+                           feedback: Optional[str] = None,
+                           strategy: str = "delta") -> Optional[AITournamentPlanning]:
         """
         Régénère un planning existant
         
+        Avec un seul run IA et la stratégie "delta", l'IA reçoit le planning
+        précédent (forme compacte), les violations détectées et la remarque de
+        l'organisateur, et ne renvoie que les matchs à modifier. Sans remarque
+        ni violation, ou si le patch est inapplicable, le planning est
+        régénéré en entier. Une ancienne version est régénérée depuis la
+        version active du tournoi.
+
         Args:
             planning_id: ID du planning à régénérer
+            aiCandidates, localCandidates, deadlineSeconds, cancelEvent: voir generatePlanning
+            feedback: remarque de l'organisateur
+            strategy: "delta" ou "full"
             
         Returns:
             Nouveau planning généré ou None si erreur
@@ -129,21 +292,408 @@ class AIPlanningService():
                 print("❌ Planning original non trouvé")
                 return None
             
-            # Supprimer l'ancien planning
-            self._deletePlanning(planningId)
-            
-            # Générer un nouveau planning
-            new_planning = self.generatePlanning(old_planning.tournament_id)
+            old_planning = self._activeVersion(old_planning)
+            if not old_planning:
+                return None
+
+            if strategy == "delta" and aiCandidates == 1 and localCandidates == 0:
+                new_planning = self._regenerateDelta(old_planning, feedback, cancelEvent)
+                if new_planning or (cancelEvent is not None and cancelEvent.is_set()):
+                    return new_planning
+
+            # Générer une nouvelle version, l'ancienne reste active jusqu'à la bascule
+            new_planning = self.generatePlanning(
+                old_planning.tournament_id, aiCandidates, localCandidates, deadlineSeconds, cancelEvent
+            )
             
             if new_planning:
                 print(f"✅ Planning régénéré: {new_planning.id}")
             
             return new_planning
             
+        except InfeasibleTournamentError:
+            raise
         except Exception as e:
             print(f"❌ Erreur régénération planning: {e}")
             return None
 
+    @traced("aiPlanningService._regenerateDelta")
+    def _regenerateDelta(self,
+                         planning: AITournamentPlanning,
+                         feedback: Optional[str],
+                         cancelEvent: Optional[threading.Event] = None) -> Optional[AITournamentPlanning]:
+        """
+        Régénération par patch : seuls les matchs modifiés transitent par l'IA
+
+        Le patch part des matchs en base ; les matchs commencés, joués ou
+        annulés ne peuvent pas être modifiés et leurs résultats sont reportés
+        sur la nouvelle version.
+
+        Returns:
+            Nouvelle version, le planning inchangé si l'IA ne propose aucune
+            modification, ou None pour basculer sur une régénération complète
+        """
+        tournament = self.tournamentService.getTournamentById(planning.tournament_id)
+        if not tournament or not planning.planning_data:
+            return None
+        rules = SchedulingRules.fromTournament(tournament)
+
+        # base du patch : lignes de match en base (retards, retraits, résultats), pas le JSON d'origine
+        rows = self.databaseService.getAllMatches(planning.id)
+        if not rows:
+            return None
+        self.scheduleIndexService.buildIndex(planning.id, rows)
+        matches = matchTuples(rows)
+        if not matches:
+            return None
+        base = syncPlanningData(planning.planning_data, rows)
+        locked = {row.match_id_ai for row in rows if row.status != "scheduled"}
+        inactive = {row.match_id_ai for row in rows if row.status in INACTIVE_STATUSES}
+
+        violations = listViolations(ScheduleArrays(matches), rules)
+        if not feedback and not violations:
+            print("Ni remarque ni violation : regeneration complete")
+            planningDeltaRegenerationsTotal.inc(outcome="skipped")
+            return None
+
+        with planningStageSeconds.time(stage="build_prompt"):
+            prompt = self._buildDeltaPrompt(tournament, compactPlanning(matches, tournament.start_date),
+                                            violations, feedback)
+        with planningStageSeconds.time(stage="openai"):
+            aiResponse = self.openAIService.generate_planning(prompt, cancel_event=cancelEvent)
+        if self._cancelled(cancelEvent, "openai") or not aiResponse:
+            return None
+
+        modifications = aiResponse.get("modifications")
+        if not isinstance(modifications, list):
+            print("Reponse sans liste de modifications : regeneration complete")
+            planningDeltaRegenerationsTotal.inc(outcome="rejected")
+            return None
+        if not modifications:
+            print("Aucune modification proposee : planning conserve")
+            planningDeltaRegenerationsTotal.inc(outcome="empty")
+            return planning
+
+        with planningStageSeconds.time(stage="apply_patch"):
+            try:
+                planningData, changed = applyPlanningPatch(base, modifications, locked)
+                planningData["commentaires"] = aiResponse.get("commentaires") or planningData.get("commentaires")
+                aiPlanningData = AIPlanningData.model_validate(planningData)
+            except ValueError as e:
+                print(f"Patch inapplicable ({e}) : regeneration complete")
+                planningDeltaRegenerationsTotal.inc(outcome="rejected")
+                return None
+
+            # le patch ne doit pas ajouter de conflits au planning précédent (matchs actifs seulement)
+            def active(data: AIPlanningData) -> ScheduleArrays:
+                return ScheduleArrays([match for match in planningTuples(data) if match[0] not in inactive])
+
+            before = scoreSchedule(active(AIPlanningData.model_validate(base)), rules)
+            after = scoreSchedule(active(aiPlanningData), rules)
+            if after["conflicts"] + after["lunch_violations"] > before["conflicts"] + before["lunch_violations"]:
+                print(f"Patch rejete : {after['conflicts']} conflit(s) au lieu de {before['conflicts']}")
+                planningDeltaRegenerationsTotal.inc(outcome="rejected")
+                return None
+
+        if self._cancelled(cancelEvent, "before_save"):
+            return None
+        planningDeltaRegenerationsTotal.inc(outcome="applied")
+        print(f"Patch applique : {changed} match(s) modifie(s) sur {len(matches)}")
+        return self._saveVersion(planning.tournament_id, tournament.tournament_type, planningData, aiPlanningData,
+                                 previousPlanningId=planning.id)
+
+    def _activeVersion(self, planning: AITournamentPlanning) -> Optional[AITournamentPlanning]:
+        """
+        Version active du tournoi d'un planning
+
+        Une régénération demandée sur une ancienne version repart de la
+        version active : les résultats et retards saisis depuis ne sont pas perdus.
+        """
+        activeId = self.databaseService.getActivePlanningId(planning.tournament_id)
+        if not activeId or activeId == planning.id:
+            return planning
+        print(f"Planning {planning.id} n'est plus la version active : regeneration depuis {activeId}")
+        return self._getPlanningById(activeId)
+
+    def _buildDeltaPrompt(self,
+                          tournament: Tournament,
+                          compact: str,
+                          violations: List[str],
+                          feedback: Optional[str]) -> str:
+        """Prompt de patch : planning actuel compact, problèmes à corriger, format de réponse"""
+        problems = "\n".join(f"- {violation}" for violation in violations) or "- aucune"
+        return f"""
+            Tu es un expert en organisation de tournois de volley-ball.
+            Voici le planning actuel d'un tournoi, à corriger avec le MINIMUM de changements.
+
+            - Type: {tournament.tournament_type}
+            - Date de début: {tournament.start_date}
+            - Terrains disponibles: {tournament.courts_available}
+            - Durée match: {tournament.match_duration_minutes} minutes
+            - Pause entre matchs: {tournament.break_duration_minutes} minutes
+            - Pas de match entre 12h et 13h30.
+
+            PLANNING ACTUEL (match_id|poule|equipe_a|equipe_b|terrain|debut|fin):
+            {compact}
+
+            VIOLATIONS DÉTECTÉES:
+            {problems}
+
+            DEMANDE DE L'ORGANISATEUR:
+            {feedback or 'aucune'}
+
+            Réponds UNIQUEMENT avec du JSON valide, en ne listant que les matchs modifiés:
+            {{"type_tournoi": "{tournament.tournament_type}", "modifications": [{{"match_id": "...", "terrain": 1, "debut_horaire": "HH:MM", "fin_horaire": "HH:MM"}}], "commentaires": "..."}}
+            Champs modifiables: terrain, debut_horaire, fin_horaire, equipe_a, equipe_b. Liste vide si rien à changer.
+            """
+
+    @traced("aiPlanningService.regenerateScope")
+    def regenerateScope(self,
+                        planningId: str,
+                        scope: str,
+                        engine: str = "ai",
+                        cancelEvent: Optional[threading.Event] = None) -> Optional[AITournamentPlanning]:
+        """
+        Régénère une seule partie d'un planning, le reste du planning est conservé
+
+        Seul le sous-problème (une poule ou la phase finale) est envoyé à l'IA
+        ou au moteur local, avec les créneaux déjà occupés. Les rencontres
+        proposées par l'IA sont replacées par le moteur local pour garantir
+        l'absence de conflit. Le résultat est écrit comme une nouvelle version
+        (matchs hors de la partie et matchs joués recopiés avec leurs
+        résultats), activée d'un seul changement de pointeur.
+
+        Args:
+            planningId: ID du planning
+            scope: "elimination" ou "poule:<poule_id>"
+            engine: "ai" ou "local"
+            cancelEvent: voir generatePlanning
+
+        Returns:
+            Nouvelle version du planning ou None si erreur ou abandon
+
+        Raises:
+            ValueError: portée invalide ou phase finale déjà commencée
+            TimeoutError: placement local au-delà de PROCESS_POOL_JOB_TIMEOUT_SECONDS
+        """
+        planning = self.databaseService.getPlanningWithDetailsByPlanningId(planningId)
+        if planning:
+            planning = self._activeVersion(planning)
+        if not planning:
+            return None
+        tournament = self.tournamentService.getTournamentById(planning.tournament_id)
+        matches = self.databaseService.getAllMatches(planning.id)
+        if not tournament or matches is None:
+            return None
+
+        # horaires et terrains des matchs conservés tels qu'en base (retards, retraits)
+        planningData = syncPlanningData(planning.planning_data, matches)
+        aiPlanningData = AIPlanningData.model_validate(planningData)
+        if not aiPlanningData.poules:
+            raise ValueError("Régénération partielle disponible uniquement pour les tournois en poules")
+
+        pouleId = scope.split(":", 1)[1] if scope.startswith("poule:") else None
+        poule = next((p for p in aiPlanningData.poules if p.poule_id == pouleId), None)
+        if scope != "elimination" and poule is None:
+            raise ValueError(f"Portée inconnue: {scope}")
+
+        inScope = [m for m in matches if (m.poule_id == pouleId if pouleId else m.poule_id is None)]
+        played = [m for m in inScope if m.status != "scheduled"]
+        if played and not pouleId:
+            raise ValueError("Phase d'élimination déjà commencée")
+        playedIds = {m.id for m in played}
+        scopeIds = {m.id for m in inScope}
+        kept = [m for m in matches if m.id not in scopeIds or m.id in playedIds]
+        removed = [m for m in inScope if m.id not in playedIds]
+
+        # Créneaux déjà occupés par le reste du planning (et les matchs joués de la poule)
+        rules = SchedulingRules.fromTournament(tournament)
+        tournamentJson = tournament.model_dump_json().encode()
+        bookings = [
+            (match.terrain, sorted(teamKeys(match)), match.debut_horaire, match.fin_horaire, sorted(producedKeys(match)))
+            for match in kept if match.status not in INACTIVE_STATUSES
+        ]
+        timezone = matches[0].debut_horaire.tzinfo if matches else None
+        dayStart = datetime.combine(tournament.start_date, tournament.start_time or time(9, 0), tzinfo=timezone)
+        notBefore = min((m.debut_horaire for m in removed), default=dayStart)
+
+        if engine == "ai" and not self.openAIService.breaker.available():
+            print("Circuit OpenAI ouvert : regeneration confiee au moteur local")
+            planningLocalFallbacksTotal.inc()
+            engine = "local"
+
+        subset = AIPlanningData(type_tournoi=aiPlanningData.type_tournoi)
+        if pouleId:
+            order = None
+            if engine == "ai":
+                aiResponse = self.openAIService.generate_planning(
+                    self._buildScopePrompt(tournament, scope, kept, poule.equipes, played),
+                    cancel_event=cancelEvent
+                )
+                if self._cancelled(cancelEvent, "openai") or not aiResponse:
+                    return None
+                proposal = AIPlanningData.model_validate(aiResponse)
+                proposed = next((p for p in proposal.poules if p.poule_id == pouleId), None) \
+                    or (proposal.poules[0] if proposal.poules else None)
+                order = [(m.equipe_a, m.equipe_b) for m in sorted(proposed.matchs, key=lambda m: m.debut_horaire)] \
+                    if proposed else None
+
+            # placement dans le pool de processus : le thread de la requête ne fait qu'attendre
+            newMatches = [PouleMatch.model_validate(match) for match in orjson.loads(self.processPool.run(
+                "scope_poule", schedulePouleJob, tournamentJson, bookings, pouleId, poule.equipes, notBefore,
+                [(m.equipe_a, m.equipe_b) for m in played], order, [m.match_id_ai for m in played]
+            ))]
+            playedMatches = [
+                PouleMatch(match_id=m.match_id_ai, equipe_a=m.equipe_a, equipe_b=m.equipe_b,
+                           debut_horaire=m.debut_horaire, fin_horaire=m.fin_horaire, terrain=m.terrain)
+                for m in played
+            ]
+            subset.poules = [poule.model_copy(update={"matchs": newMatches})]
+            planningData["poules"] = [
+                (p.model_copy(update={"matchs": playedMatches + newMatches}) if p.poule_id == pouleId else p)
+                .model_dump(mode="json")
+                for p in aiPlanningData.poules
+            ]
+        else:
+            qualifiers = self.localSchedulerService.eliminationQualifiers([p.poule_id for p in aiPlanningData.poules])
+            proposalJson = None
+            if engine == "ai":
+                aiResponse = self.openAIService.generate_planning(
+                    self._buildScopePrompt(tournament, scope, kept, qualifiers, []),
+                    cancel_event=cancelEvent
+                )
+                if self._cancelled(cancelEvent, "openai") or not aiResponse:
+                    return None
+                proposal = AIPlanningData.model_validate(aiResponse).phase_elimination_apres_poules
+                if proposal is None:
+                    print("Phase d'elimination absente de la reponse")
+                    return None
+                proposalJson = proposal.model_dump_json().encode()
+            phase = EliminationPhase.model_validate_json(self.processPool.run(
+                "scope_elimination", scheduleEliminationJob, tournamentJson, bookings, qualifiers, dayStart, proposalJson
+            ))
+            subset.phase_elimination_apres_poules = phase
+            planningData["phase_elimination_apres_poules"] = phase.model_dump(mode="json")
+
+        rows = self.databaseService._buildMatchRows(planning.id, subset)
+        newRows = [construct_from_row(AIGeneratedMatch, dict(row)) for row in rows]
+
+        # Les matchs qui attendent le classement de la poule sont décalés si besoin
+        touched = {f"{label}_{pouleId}" for label in RANK_LABELS} if pouleId else set()
+        shifted = propagateSchedule(kept + newRows, rules, touchedTeams=touched) if touched else []
+        shifted = [m for m in shifted if m.id not in {row.id for row in newRows}]
+        planningData = syncPlanningData(planningData, shifted)
+
+        if self._cancelled(cancelEvent, "before_save"):
+            return None
+        updated = self._saveVersion(
+            planning.tournament_id,
+            tournament.tournament_type,
+            planningData,
+            AIPlanningData.model_validate(planningData),
+            previousPlanningId=planning.id
+        )
+        if updated:
+            print(f"Planning {planning.id} regenere ({scope}) : {len(rows)} match(s) remplace(s), "
+                  f"{len(shifted)} decale(s), nouvelle version {updated.id}")
+        return updated
+
+    def _buildScopePrompt(self,
+                          tournament: Tournament,
+                          scope: str,
+                          occupied: List[AIGeneratedMatch],
+                          teams: List[str],
+                          played: List[AIGeneratedMatch]) -> str:
+        """Prompt réduit au sous-problème : équipes concernées et créneaux déjà pris"""
+        slots: Dict[int, List[str]] = {}
+        for match in sorted(occupied, key=lambda m: m.debut_horaire):
+            if match.status not in INACTIVE_STATUSES:
+                slots.setdefault(match.terrain, []).append(
+                    f"{match.debut_horaire:%H:%M}-{match.fin_horaire:%H:%M}"
+                )
+        occupiedText = "\n".join(f"- Terrain {court}: {', '.join(ranges)}" for court, ranges in sorted(slots.items()))
+
+        if scope == "elimination":
+            task = f"""Génère UNIQUEMENT la phase d'élimination après poules pour ces qualifiés (têtes de série dans l'ordre):
+            {', '.join(teams)}
+            Utilise les placeholders tels quels et winner_<match_id>/loser_<match_id> pour les tours suivants.
+            Structure: {{"type_tournoi": "{tournament.tournament_type}", "phase_elimination_apres_poules": {{...}}}}"""
+        else:
+            pouleId = scope.split(":", 1)[1]
+            alreadyPlayed = ", ".join(f"{m.equipe_a} - {m.equipe_b}" for m in played) or "aucun"
+            task = f"""Génère UNIQUEMENT les matchs de la poule {pouleId} entre ces équipes: {', '.join(teams)}
+            Matchs déjà joués (ne pas reprogrammer): {alreadyPlayed}
+            Structure: {{"type_tournoi": "{tournament.tournament_type}", "poules": [{{"poule_id": "{pouleId}", ...}}]}}"""
+
+        return f"""
+            Tu es un expert en organisation de tournois de volley-ball.
+            {task}
+
+            - Type: {tournament.tournament_type}
+            - Équipes: {', '.join(teams)}
+            - Date de début: {tournament.start_date}
+            - Heure de début: {tournament.start_time or '09:00'}
+            - Terrains disponibles: {tournament.courts_available}
+            - Durée match: {tournament.match_duration_minutes} minutes
+            - Pause entre matchs: {tournament.break_duration_minutes} minutes
+            - Pas de match entre 12h et 13h30.
+
+            CRÉNEAUX DÉJÀ OCCUPÉS (ne pas les utiliser):
+            {occupiedText or '- aucun'}
+
+            IMPORTANT: Réponds UNIQUEMENT avec du JSON valide.
+            """
+
+    def _pruneVersions(self, tournamentId: str) -> int:
+        """
+        Supprime les anciennes versions d'un tournoi (tâche de fond)
+
+        Garde la version active et les versions les plus récentes
+        (PLANNING_VERSIONS_KEPT au total) ; une version plus récente que
+        l'active est une génération en cours et n'est jamais supprimée, pas
+        plus qu'une version encore renvoyée par une Idempotency-Key.
+
+        Returns:
+            int: nombre de versions supprimées
+        """
+        try:
+            activeId = self.databaseService.getActivePlanningId(tournamentId)
+            versions = self.databaseService.listPlanningVersions(tournamentId)
+            if not activeId or not versions:
+                return 0
+
+            # versions de la plus récente à la plus ancienne
+            ids = [version.id for version in versions]
+            if activeId not in ids:
+                return 0
+            older = ids[ids.index(activeId) + 1:]
+            doomed = older[max(0, self.versionsKept - 1):]
+            referenced = self.idempotencyService.referencedPlannings(doomed)
+            doomed = [planningId for planningId in doomed if planningId not in referenced]
+
+            for planningId in doomed:
+                self._deletePlanning(planningId)
+            return len(doomed)
+
+        except Exception as e:
+            print(f"❌ Erreur suppression anciennes versions: {e}")
+            return 0
+
+    def _cancelled(self, cancelEvent: Optional[threading.Event], stage: str) -> bool:
+        """Vrai si la génération a été abandonnée ; comptabilise l'étape atteinte"""
+        if cancelEvent is None or not cancelEvent.is_set():
+            return False
+        planningCancellationsTotal.inc(stage=stage)
+        print(f"Generation abandonnee ({stage}) : aucune ecriture")
+        return True
+
+    def _invalidateCaches(self, planningId: str) -> None:
+        """Oublie les index, graphes et classements en mémoire d'un planning"""
+        self.scheduleIndexService.invalidate(planningId)
+        self.placeholderService.invalidate(planningId)
+        self.standingsService.invalidate(planningId)
+
+    @traced("aiPlanningService._buildStaticPrompt")
     def _buildStaticPrompt(self, tournamentData: Dict[str, Any]) -> str:
         """Construit le prompt statique pour l'IA"""
         tournament = tournamentData["tournament"]
@@ -203,6 +753,7 @@ class AIPlanningService():
 
     def _deletePlanning(self, planningId: str) -> bool:
         """Supprime un planning et ses détails"""
+        self._invalidateCaches(planningId)
         try:
             # Supprimer d'abord les détails (tables liées)
             self.supabase.table("ai_generated_match").delete().eq("planning_id", planningId).execute()
@@ -0,0 +1,152 @@
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Dict, Optional, Sequence, Tuple
+
+import orjson
+
+from app.core.config import settings
+from app.core.metrics import planningCandidatesTotal
+from app.core.process_pool import processPool
+from app.core.tracing import traced
+from app.models.models import AIPlanningData, Tournament
+from app.services.openai_service import openai_service
+from app.services.planning_jobs import localPlanningJob, scorePlanningJob
+
+
+def rankKey(score: Dict[str, Any]) -> Tuple:
+    """Tri des candidats : réalisable d'abord, puis moins de violations, plus court, moins de terrains vides"""
+    violations = score["conflicts"] + score["lunch_violations"] + score["missing_teams"]
+    return not score["feasible"], violations, score["span_minutes"], score["idle_minutes"]
+
+
+class Candidate:
+    """Planning candidat et son évaluation"""
+
+    def __init__(self, source: str, planningData: Dict[str, Any], aiPlanningData: AIPlanningData):
+        self.source = source
+        self.planningData = planningData
+        self.aiPlanningData = aiPlanningData
+        self.score: Dict[str, Any] = {}
+
+
+class CandidateService():
+    """
+    Génération spéculative : plusieurs candidats en parallèle, le meilleur gagne
+
+    Les runs IA et les graines du moteur local sont lancés ensemble ; chaque
+    candidat est évalué dès qu'il arrive (moteur local et score dans le pool
+    de processus). À l'échéance, le meilleur candidat déjà évalué est retenu
+    et les runs IA encore en cours sont annulés.
+    """
+
+    def __init__(self):
+        self.openAIService = openai_service
+        self.processPool = processPool
+        self.deadlineSeconds = settings.PLANNING_CANDIDATES_DEADLINE_SECONDS
+        self.cancelPollSeconds = settings.PLANNING_CANCEL_POLL_SECONDS
+
+    @traced("candidateService.bestCandidate")
+    def bestCandidate(self,
+                      tournament: Tournament,
+                      teams: Sequence[str],
+                      prompt: str,
+                      aiRuns: int = 1,
+                      localSeeds: int = 0,
+                      deadlineSeconds: Optional[float] = None,
+                      cancelEvent: Optional[threading.Event] = None) -> Optional[Candidate]:
+        """
+        Lance les candidats et retourne le mieux noté
+
+        Args:
+            tournament: tournoi à planifier
+            teams: noms des équipes
+            prompt: prompt des runs IA
+            aiRuns: nombre de runs Assistants
+            localSeeds: nombre de graines du moteur local (0, 1, 2...)
+            deadlineSeconds: échéance, PLANNING_CANDIDATES_DEADLINE_SECONDS par défaut
+            cancelEvent: abandon de la génération (client déconnecté), tous les runs sont annulés
+
+        Returns:
+            Candidate: meilleur candidat ou None si aucun n'a abouti ou si la génération est abandonnée
+        """
+        tournamentJson = tournament.model_dump_json().encode()
+        teams = tuple(teams)
+        deadline = time.monotonic() + (deadlineSeconds or self.deadlineSeconds)
+        cancel = threading.Event()
+        executor = ThreadPoolExecutor(max_workers=max(1, aiRuns + localSeeds), thread_name_prefix="planning-candidate")
+
+        futures: Dict[Future, str] = {}
+        for run in range(aiRuns):
+            futures[executor.submit(self._aiCandidate, prompt, cancel, tournamentJson, teams)] = f"ai_{run + 1}"
+        for seed in range(localSeeds):
+            futures[executor.submit(self._localCandidate, tournamentJson, teams, seed)] = f"local_{seed}"
+
+        best: Optional[Candidate] = None
+        pending = set(futures)
+        try:
+            while pending:
+                if cancelEvent is not None and cancelEvent.is_set():
+                    break
+                remaining = deadline - time.monotonic()
+                if remaining <= 0 and best is not None:
+                    break
+                # Sans candidat à l'échéance, on attend le premier qui aboutit
+                timeout = remaining if best is not None else None
+                if cancelEvent is not None:
+                    timeout = min(timeout or self.cancelPollSeconds, self.cancelPollSeconds)
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    source = futures[future]
+                    engine = source.split("_", 1)[0]
+                    try:
+                        candidate = future.result()
+                    except Exception as e:
+                        print(f"Candidat {source} en erreur: {e}")
+                        candidate = None
+                    if candidate is None:
+                        planningCandidatesTotal.inc(engine=engine, outcome="failed")
+                        continue
+                    candidate.source = source
+                    planningCandidatesTotal.inc(engine=engine, outcome="scored")
+                    print(f"Candidat {source} : realisable={candidate.score['feasible']} "
+                          f"conflits={candidate.score['conflicts']} duree={candidate.score['span_minutes']}min")
+                    if best is None or rankKey(candidate.score) < rankKey(best.score):
+                        best = candidate
+        finally:
+            cancel.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        for future in pending:
+            planningCandidatesTotal.inc(engine=futures[future].split("_", 1)[0], outcome="cancelled")
+        if cancelEvent is not None and cancelEvent.is_set():
+            print("Generation abandonnee : candidats annules")
+            return None
+        if best is not None:
+            planningCandidatesTotal.inc(engine=best.source.split("_", 1)[0], outcome="selected")
+            print(f"Candidat retenu : {best.source} ({len(futures) - len(pending)}/{len(futures)} evalue(s))")
+        return best
+
+    def _aiCandidate(self,
+                     prompt: str,
+                     cancel: threading.Event,
+                     tournamentJson: bytes,
+                     teams: Sequence[str]) -> Optional[Candidate]:
+        aiResponse = self.openAIService.generate_planning(prompt, cancel_event=cancel)
+        if not aiResponse:
+            return None
+        candidate = Candidate("ai", aiResponse, AIPlanningData.model_validate(aiResponse))
+        candidate.score = self.processPool.run(
+            "score_planning", scorePlanningJob, tournamentJson, orjson.dumps(aiResponse), teams
+        )
+        return candidate
+
+    def _localCandidate(self, tournamentJson: bytes, teams: Sequence[str], seed: int) -> Candidate:
+        planningJson, score = self.processPool.run("local_planning", localPlanningJob, tournamentJson, teams, seed)
+        candidate = Candidate("local", orjson.loads(planningJson), AIPlanningData.model_validate_json(planningJson))
+        candidate.score = score
+        return candidate
+
+
+# Instance globale
+candidateService = CandidateService()
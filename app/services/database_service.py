@@ -1,22 +1,33 @@
+import base64
+import json
+import os
 import uuid
 from datetime import datetime
-from typing import List, Optional
+from typing import Iterable, List, Optional, Sequence, Tuple
 from app.core.database import getSupabase
+from app.core.metrics import databaseCallSeconds, timeCalls
+from app.core.tracing import traced
 from app.models.models import (
     AITournamentPlanning, 
     AIPlanningData, AIGeneratedMatch, AIGeneratedPoule,
-    Match
+    Match, construct_from_row
 )
 
+# Colonnes d'un match écrites par l'enregistrement des résultats
+RESULT_COLUMNS = ("status", "score_a", "score_b", "resolved_equipe_a_id", "resolved_equipe_b_id")
+
 class DatabaseService():
 
     def __init__(self):
         self.supabase = getSupabase()
     
+    @timeCalls(databaseCallSeconds)
+    @traced("databaseService.savePlanning")
     def savePlanning(self, 
                       tournamentId: str, 
                       planningData: dict, 
-                      typeTournoi:str) -> Optional[AITournamentPlanning]:
+                      typeTournoi:str,
+                      aiPlanningData: Optional[AIPlanningData] = None) -> Optional[AITournamentPlanning]:
         """
         Sauvegarde le planning principal en DB
         
@@ -24,6 +35,7 @@ class DatabaseService():
             tournament_id: ID du tournoi
             planning_data: JSON complet de l'IA
             type_tournoi: Type de tournoi
+            aiPlanningData: planning_data déjà validé (évite de revalider)
             
         Returns:
             AITournamentPlanning: Planning créé ou None si erreur
@@ -34,27 +46,25 @@ class DatabaseService():
             # Générer ID unique
             planning_id = str(uuid.uuid4())
             
-            # Valider les données avec Pydantic
-            ai_planning_data = AIPlanningData(**planningData)
+            # Valider les données avec Pydantic (une seule fois par génération)
+            ai_planning_data = aiPlanningData or AIPlanningData(**planningData)
             total_matches = ai_planning_data.calculate_total_matches()
             
-            # Créer l'objet Planning
-            planning_obj = AITournamentPlanning(
-                id=planning_id,
-                tournament_id=tournamentId,
-                type_tournoi=typeTournoi,
-                status="generated",
-                planning_data=planningData,
-                total_matches=total_matches,
-                ai_comments=ai_planning_data.commentaires,
-                created_at=datetime.now(),
-                updated_at=datetime.now()
-            )
-            
-            # Convertir en dict pour Supabase
-            planning_dict = planning_obj.model_dump()
-            planning_dict["created_at"] = planning_dict["created_at"].isoformat()
-            planning_dict["updated_at"] = planning_dict["updated_at"].isoformat()
+            # Ligne prête pour Supabase
+            now = datetime.now().isoformat()
+            planning_dict = {
+                "id": planning_id,
+                "tournament_id": tournamentId,
+                "type_tournoi": typeTournoi,
+                "status": "generated",
+                "planning_data": planningData,
+                "total_matches": total_matches,
+                "start_time": None,
+                "end_time": None,
+                "ai_comments": ai_planning_data.commentaires,
+                "created_at": now,
+                "updated_at": now
+            }
             
             # Sauvegarder
             result = self.supabase.table("ai_tournament_planning").insert(planning_dict).execute()
@@ -62,20 +72,27 @@ class DatabaseService():
             print(f"✅ Planning {planning_id} sauvegardé ({total_matches} matchs)")
             
             # Retourner l'objet Planning créé
-            return AITournamentPlanning(**result.data[0])
+            return construct_from_row(AITournamentPlanning, result.data[0])
         except Exception as e:
             print(f"Erreur lors de la sauvegarde : {e}")
             return None
         
+    @timeCalls(databaseCallSeconds)
+    @traced("databaseService.saveMatches")
     def saveMatches(self, 
                     planningId: str, 
-                    planningData: dict) -> Optional[List[AIGeneratedMatch]]:
+                    planningData: dict,
+                    aiPlanningData: Optional[AIPlanningData] = None,
+                    previousMatches: Optional[Iterable[AIGeneratedMatch]] = None) -> Optional[List[AIGeneratedMatch]]:
         """
         Sauvegarde tous les matchs en lot
         
         Args:
             planning_id: ID du planning
             planning_data: Données JSON de l'IA
+            aiPlanningData: planning_data déjà validé (évite de revalider)
+            previousMatches: matchs de la version précédente dont les résultats
+                             sont repris (voir _carryResults)
             
         Returns:
             List[AIGeneratedMatch]: Matchs sauvegardés ou None si erreur
@@ -84,32 +101,14 @@ class DatabaseService():
         try:
             print(f"Extraction et sauvegarde des matchs pour planning {planningId}")
 
-            allMatches = []
-            aiPlanningData = AIPlanningData(**planningData)
-
-            roundRobinMatches = self._extractRoundRobinMatches(planningId, aiPlanningData)
-            allMatches.extend(roundRobinMatches)
-
-            poulesMatches = self._extractPoulesMatches(planningId, aiPlanningData)
-            allMatches.extend(poulesMatches)
-
-            eliminationMatches = self._extractEliminationMatches(planningId, aiPlanningData)
-            allMatches.extend(eliminationMatches)
-
-            if allMatches:
-                matchesDicts = []
-                for match in allMatches:
-                    matchDict = match.model_dump()
-                    matchDict["created_at"] = matchDict["created_at"].isoformat()
-                    matchDict["debut_horaire"] = matchDict["debut_horaire"].isoformat()
-                    matchDict["fin_horaire"] = matchDict["fin_horaire"].isoformat()
-
-                    matchesDicts.append(matchDict)
+            matchesDicts = self._buildMatchRows(planningId, aiPlanningData or AIPlanningData(**planningData))
+            if previousMatches is not None:
+                _carryResults(matchesDicts, previousMatches)
 
+            if matchesDicts:
                 result = self.supabase.table("ai_generated_match").insert(matchesDicts).execute()
-                print(f"{len(allMatches)} matchs sauvegardes en lot")
-                print(f"result : {result.data}")
-                return [AIGeneratedMatch(**data) for data in result.data]
+                print(f"{len(matchesDicts)} matchs sauvegardes en lot")
+                return [construct_from_row(AIGeneratedMatch, data) for data in result.data]
 
             else:
                 print("Aucun match à sauvegarder")
@@ -119,22 +118,26 @@ class DatabaseService():
             print(f"Erreur lors de la sauvegarde des matchs: {e}")
             return None
 
+    @timeCalls(databaseCallSeconds)
+    @traced("databaseService.savePoules")
     def savePoules(self, 
                     planningId: str, 
-                    planningData: dict) -> Optional[List[AIGeneratedPoule]]:
+                    planningData: dict,
+                    aiPlanningData: Optional[AIPlanningData] = None) -> Optional[List[AIGeneratedPoule]]:
         """
         Sauvegarde les poules en lot
         
         Args:
             planning_id: ID du planning
             planning_data: Données JSON de l'IA
+            aiPlanningData: planning_data déjà validé (évite de revalider)
             
         Returns:
             List[AIGeneratedPoule]: Poules sauvegardées ou None si erreur
         """
 
         try:    
-            aiPlanningData = AIPlanningData(**planningData)
+            aiPlanningData = aiPlanningData or AIPlanningData(**planningData)
 
             if not aiPlanningData.poules:
                 print("Pas de poules à sauvegarder")
@@ -142,38 +145,31 @@ class DatabaseService():
             
             print(f"Sauvegarde de {len(aiPlanningData.poules)} poules")
 
-            allPoules = []
-
-            for poule in aiPlanningData.poules:
-                pouleObj = AIGeneratedPoule(
-                    id=str(uuid.uuid4()),
-                    planning_id=planningId,
-                    poule_id=poule.poule_id,
-                    nom_poule=poule.nom_poule,
-                    equipes=poule.equipes,
-                    nb_equipes=len(poule.equipes),
-                    nb_matches=len(poule.matchs),
-                    created_at=datetime.now()
-                )
-                allPoules.append(pouleObj)
-
-            if allPoules:
-                poulesDicts = []
-                for poule in allPoules:
-                    pouleDict = poule.model_dump()
-                    pouleDict["created_at"] = pouleDict["created_at"].isoformat()
-                    poulesDicts.append(pouleDict)
-                
-                result = self.supabase.table("ai_generated_poule").insert(poulesDicts).execute()
-                print(f"{len(allPoules)} poules sauvegardees")
-
-                return [AIGeneratedPoule(**data) for data in result.data]
-            else:
-                return []
+            createdAt = datetime.now().isoformat()
+            ids = _newIds(len(aiPlanningData.poules))
+            poulesDicts = [
+                {
+                    "id": pouleId,
+                    "planning_id": planningId,
+                    "poule_id": poule.poule_id,
+                    "nom_poule": poule.nom_poule,
+                    "equipes": poule.equipes,
+                    "nb_equipes": len(poule.equipes),
+                    "nb_matches": len(poule.matchs),
+                    "created_at": createdAt
+                }
+                for pouleId, poule in zip(ids, aiPlanningData.poules)
+            ]
+
+            result = self.supabase.table("ai_generated_poule").insert(poulesDicts).execute()
+            print(f"{len(poulesDicts)} poules sauvegardees")
+
+            return [construct_from_row(AIGeneratedPoule, data) for data in result.data]
 
         except Exception as e:
             print(f"Erreur lors de la sauvegarde des poules {e}")
 
+    @timeCalls(databaseCallSeconds)
     def getPlanningWithDetailsByPlanningId(self, planningId: str) -> Optional[dict]:
         """
         Récupère un planning avec tous ses détails
@@ -199,7 +195,7 @@ class DatabaseService():
             if not planningResult.data:
                 print("Planning non trouve")
                 return None
-            planningObj = AITournamentPlanning(**planningResult.data)
+            planningObj = construct_from_row(AITournamentPlanning, planningResult.data)
 
             # matchesResult = self.supabase.table("ai_generated_match")\
             #     .select("*")\
@@ -221,24 +217,34 @@ class DatabaseService():
             print(f"Erreur recuperation planning {e}")
             return None
 
+    @timeCalls(databaseCallSeconds)
     def getPlanningWithDetailsByTournamentId(self, tournamentId: str) -> Optional[dict]:
         """
-        Récupère un planning avec tous ses détails par l'ID du tournoi
+        Récupère le planning actif d'un tournoi
+
+        Lecture par le pointeur ai_planning_active (clé primaire tournament_id),
+        puis par l'id du planning ; les tournois sans pointeur (plannings
+        antérieurs aux versions) retombent sur la version la plus récente.
         """
         try:
             print(f"Recuperation planning par tournoi {tournamentId}")
 
+            activeId = self.getActivePlanningId(tournamentId)
+            if activeId:
+                return self.getPlanningWithDetailsByPlanningId(activeId)
+
             planningResult = self.supabase.table("ai_tournament_planning")\
                 .select("*")\
                 .eq("tournament_id", tournamentId)\
-                .single()\
+                .order("created_at", desc=True)\
+                .limit(1)\
                 .execute()
             
             if not planningResult.data:
                 print("Planning non trouve")
                 return None
             
-            planningObj = AITournamentPlanning(**planningResult.data)
+            planningObj = construct_from_row(AITournamentPlanning, planningResult.data[0])
             
             return planningObj
         
@@ -246,6 +252,241 @@ class DatabaseService():
             print(f"Erreur recuperation planning par tournoi {e}")
             return None
 
+    @timeCalls(databaseCallSeconds)
+    def getActivePlanningId(self, tournamentId: str) -> Optional[str]:
+        """
+        Récupère l'ID de la version active du planning d'un tournoi
+
+        Returns:
+            str: ID du planning actif ou None si aucun pointeur
+        """
+        try:
+            result = self.supabase.table("ai_planning_active")\
+                .select("planning_id")\
+                .eq("tournament_id", tournamentId)\
+                .limit(1)\
+                .execute()
+
+            return result.data[0]["planning_id"] if result.data else None
+
+        except Exception as e:
+            print(f"Erreur recuperation planning actif {e}")
+            return None
+
+    @timeCalls(databaseCallSeconds)
+    @traced("databaseService.setActivePlanning")
+    def setActivePlanning(self, tournamentId: str, planningId: str) -> bool:
+        """
+        Fait pointer un tournoi sur une version de planning (upsert d'une seule ligne)
+
+        Returns:
+            bool: Succès de l'opération
+        """
+        try:
+            self.supabase.table("ai_planning_active")\
+                .upsert({
+                    "tournament_id": tournamentId,
+                    "planning_id": planningId,
+                    "updated_at": datetime.now().isoformat()
+                }, on_conflict="tournament_id")\
+                .execute()
+            return True
+
+        except Exception as e:
+            print(f"Erreur activation planning {e}")
+            return False
+
+    @timeCalls(databaseCallSeconds)
+    def listPlanningVersions(self, tournamentId: str) -> Optional[List[AITournamentPlanning]]:
+        """
+        Liste les versions de planning d'un tournoi, de la plus récente à la plus ancienne
+        (sans planning_data)
+
+        Returns:
+            List[AITournamentPlanning]: Versions ou None si erreur
+        """
+        try:
+            result = self.supabase.table("ai_tournament_planning")\
+                .select("id,tournament_id,type_tournoi,status,total_matches,created_at,updated_at")\
+                .eq("tournament_id", tournamentId)\
+                .order("created_at", desc=True)\
+                .execute()
+
+            return [construct_from_row(AITournamentPlanning, row) for row in result.data or []]
+
+        except Exception as e:
+            print(f"Erreur recuperation versions planning {e}")
+            return None
+
+    @timeCalls(databaseCallSeconds)
+    def getMatches(self,
+                   planningId: str,
+                   terrain: Optional[int] = None,
+                   phase: Optional[str] = None,
+                   pouleId: Optional[str] = None,
+                   startFrom: Optional[datetime] = None,
+                   startBefore: Optional[datetime] = None,
+                   after: Optional[Tuple[str, str]] = None,
+                   limit: int = 50,
+                   columns: Optional[Sequence[str]] = None) -> Optional[dict]:
+        """
+        Récupère une page de matchs d'un planning, triés par (debut_horaire, id)
+
+        Pagination par clé (keyset) : la page suivante repart strictement après le
+        dernier (debut_horaire, id) renvoyé, sans OFFSET. Servi par un index
+        (planning_id, debut_horaire, id), ou (planning_id, terrain, debut_horaire, id)
+        pour un écran de terrain.
+
+        Args:
+            planningId: ID du planning
+            terrain, phase, pouleId: filtres d'égalité optionnels
+            startFrom, startBefore: fenêtre [startFrom, startBefore[ sur debut_horaire
+            after: curseur (debut_horaire, id) du dernier match de la page précédente
+            limit: taille de page
+            columns: colonnes à renvoyer (id et debut_horaire toujours inclus)
+
+        Returns:
+            dict: {"matches": List[dict], "next_cursor": Optional[str]} ou None si erreur
+        """
+        try:
+            selected = "*"
+            if columns:
+                selected = ",".join(dict.fromkeys(["id", "debut_horaire", *columns]))
+
+            query = self.supabase.table("ai_generated_match")\
+                .select(selected)\
+                .eq("planning_id", planningId)
+
+            if terrain is not None:
+                query = query.eq("terrain", terrain)
+            if phase:
+                query = query.eq("phase", phase)
+            if pouleId:
+                query = query.eq("poule_id", pouleId)
+            if startFrom:
+                query = query.gte("debut_horaire", startFrom.isoformat())
+            if startBefore:
+                query = query.lt("debut_horaire", startBefore.isoformat())
+            if after:
+                afterStart, afterId = after
+                query = query.or_(
+                    f'debut_horaire.gt."{afterStart}",'
+                    f'and(debut_horaire.eq."{afterStart}",id.gt."{afterId}")'
+                )
+
+            # Une ligne de plus que demandé pour savoir s'il reste une page
+            result = query\
+                .order("debut_horaire")\
+                .order("id")\
+                .limit(limit + 1)\
+                .execute()
+
+            rows = result.data or []
+            nextCursor = None
+            if len(rows) > limit:
+                rows = rows[:limit]
+                nextCursor = encodeMatchCursor(rows[-1]["debut_horaire"], rows[-1]["id"])
+
+            return {"matches": rows, "next_cursor": nextCursor}
+
+        except Exception as e:
+            print(f"Erreur recuperation matchs {e}")
+            return None
+
+    @timeCalls(databaseCallSeconds)
+    def getAllMatches(self, planningId: str) -> Optional[List[AIGeneratedMatch]]:
+        """
+        Récupère tous les matchs d'un planning, triés par horaire
+
+        Args:
+            planningId: ID du planning
+
+        Returns:
+            List[AIGeneratedMatch]: Matchs du planning ou None si erreur
+        """
+        try:
+            result = self.supabase.table("ai_generated_match")\
+                .select("*")\
+                .eq("planning_id", planningId)\
+                .order("debut_horaire")\
+                .order("id")\
+                .execute()
+
+            return [construct_from_row(AIGeneratedMatch, row) for row in result.data or []]
+
+        except Exception as e:
+            print(f"Erreur recuperation matchs {e}")
+            return None
+
+    @timeCalls(databaseCallSeconds)
+    @traced("databaseService.upsertMatches")
+    def upsertMatches(self,
+                      matches: List[AIGeneratedMatch],
+                      columns: Optional[Sequence[str]] = None) -> Optional[List[AIGeneratedMatch]]:
+        """
+        Réécrit des matchs existants (lignes complètes, une seule requête)
+
+        Avec `columns`, les lignes sont relues juste avant l'écriture et seules
+        ces colonnes viennent de `matches` : une modification faite entre-temps
+        sur les autres colonnes (retard sur un autre worker) n'est pas écrasée.
+
+        Args:
+            matches: matchs modifiés, avec leur id
+            columns: colonnes à écrire (toutes si None)
+
+        Returns:
+            List[AIGeneratedMatch]: Matchs écrits ou None si erreur
+        """
+        try:
+            rows = [match.model_dump(mode="json") for match in matches]
+            if columns is not None and rows:
+                current = self.supabase.table("ai_generated_match")\
+                    .select("*")\
+                    .in_("id", [row["id"] for row in rows])\
+                    .execute()
+                currentRows = {row["id"]: row for row in current.data or []}
+                # un match supprimé entre-temps (version purgée) n'est pas recréé
+                rows = [
+                    {**currentRows[row["id"]], **{column: row[column] for column in columns}}
+                    for row in rows if row["id"] in currentRows
+                ]
+                if not rows:
+                    return []
+            result = self.supabase.table("ai_generated_match")\
+                .upsert(rows, on_conflict="id")\
+                .execute()
+
+            return [construct_from_row(AIGeneratedMatch, row) for row in result.data or []]
+
+        except Exception as e:
+            print(f"Erreur mise a jour matchs {e}")
+            return None
+
+    @timeCalls(databaseCallSeconds)
+    def getPoules(self, planningId: str) -> Optional[List[AIGeneratedPoule]]:
+        """
+        Récupère les poules d'un planning
+
+        Args:
+            planningId: ID du planning
+
+        Returns:
+            List[AIGeneratedPoule]: Poules du planning ou None si erreur
+        """
+        try:
+            result = self.supabase.table("ai_generated_poule")\
+                .select("*")\
+                .eq("planning_id", planningId)\
+                .order("poule_id")\
+                .execute()
+
+            return [construct_from_row(AIGeneratedPoule, row) for row in result.data or []]
+
+        except Exception as e:
+            print(f"Erreur recuperation poules {e}")
+            return None
+
+    @timeCalls(databaseCallSeconds)
     def updatePlanningStatus(self, 
                              planningId: str, 
                              newStatus: str) -> bool:
@@ -276,145 +517,175 @@ class DatabaseService():
             print(f"Erreur mise à jour planning: {e}")
             return False
 
+    def _buildMatchRows(self, 
+                        planningId: str, 
+                        aiPlanningData: AIPlanningData) -> List[dict]:
+        """
+        Construit les lignes ai_generated_match prêtes pour l'insert Supabase
+
+        Les matchs viennent d'un AIPlanningData déjà validé : pas de revalidation
+        par match, un seul timestamp et un seul tirage d'UUID pour tout le lot.
+        """
+        createdAt = datetime.now().isoformat()
+
+        rows = self._extractRoundRobinMatches(planningId, aiPlanningData, createdAt)
+        rows.extend(self._extractPoulesMatches(planningId, aiPlanningData, createdAt))
+        rows.extend(self._extractEliminationMatches(planningId, aiPlanningData, createdAt))
+        rows.extend(self._extractEliminationDirecteMatches(planningId, aiPlanningData, createdAt))
+
+        for row, matchId in zip(rows, _newIds(len(rows))):
+            row["id"] = matchId
+        return rows
+
     def _extractRoundRobinMatches(self, 
                                   planningId: str, 
-                                  aiPlanningData: AIPlanningData) -> List[AIGeneratedMatch]:
+                                  aiPlanningData: AIPlanningData,
+                                  createdAt: Optional[str] = None) -> List[dict]:
         """
         Extrait les matchs round robin
         """
-        matches = []
-
-        for match in aiPlanningData.matchs_round_robin:
-            try:
-                matchObj = AIGeneratedMatch(
-                    id=str(uuid.uuid4()),
-                    planning_id=planningId,
-                    match_id_ai=match.match_id,
-                    equipe_a=match.equipe_a,
-                    equipe_b=match.equipe_b,
-                    terrain=match.terrain,
-                    debut_horaire=match.debut_horaire,
-                    fin_horaire=match.fin_horaire,
-                    phase="round_robin",
-                    journee=match.journee,
-                    status="scheduled",
-                    created_at=datetime.now()
-                )
-                matches.append(matchObj)
-            except Exception as e:
-                print(f"Match round robin invalide ignore: {e}")
-                continue
-        
-        return matches
+        createdAt = createdAt or datetime.now().isoformat()
+        return [
+            _matchRow(planningId, match, "round_robin", createdAt, journee=match.journee)
+            for match in aiPlanningData.matchs_round_robin
+        ]
 
     def _extractPoulesMatches(self, 
                               planningId: str, 
-                              aiPlanningData: AIPlanningData) -> List[AIGeneratedPoule]:
+                              aiPlanningData: AIPlanningData,
+                              createdAt: Optional[str] = None) -> List[dict]:
         """
         Extrait les matchs de poules
         """
-        matches = []
-
-        for poule in aiPlanningData.poules:
-            for match in poule.matchs:
-                try:
-                    matchObj = AIGeneratedMatch(
-                        id=str(uuid.uuid4()),
-                        planning_id=planningId,
-                        match_id_ai=match.match_id,
-                        equipe_a=match.equipe_a,
-                        equipe_b=match.equipe_b,
-                        terrain=match.terrain,
-                        debut_horaire=match.debut_horaire,
-                        fin_horaire=match.fin_horaire,
-                        phase="poules",
-                        poule_id=poule.poule_id,
-                        status="scheduled",
-                        created_at=datetime.now()
-                    )
-                    matches.append(matchObj)
-                except Exception as e:
-                    print(f"Match de poules invalide ignore: {e}")
-                    continue
-        return matches
+        createdAt = createdAt or datetime.now().isoformat()
+        return [
+            _matchRow(planningId, match, "poules", createdAt, pouleId=poule.poule_id)
+            for poule in aiPlanningData.poules
+            for match in poule.matchs
+        ]
     
     def _extractEliminationMatches(self,
                                    planningId: str, 
-                                   aiPlanningData: AIPlanningData) -> List[AIGeneratedMatch]:
+                                   aiPlanningData: AIPlanningData,
+                                   createdAt: Optional[str] = None) -> List[dict]:
         """
         Extrait les matchs d'élimination apres les poules
         """
 
-        matches = []
-
         if not aiPlanningData.phase_elimination_apres_poules:
-            return matches
+            return []
         
+        createdAt = createdAt or datetime.now().isoformat()
         elimination = aiPlanningData.phase_elimination_apres_poules
 
-        # Quarts de finale
-        for match in elimination.quarts:
-            matchObj = self._createEliminationMatchObject(
-                planningId,
-                match, 
-                "elimination"
-            )
-            if matchObj:
-                matches.append(matchObj)
-
-        # demi-finales
-        for match in elimination.demi_finales:
-            match_obj = self._createEliminationMatchObject(
-                planningId, 
-                match, 
-                "elimination"
-            )
-            if match_obj:
-                matches.append(match_obj)
+        # Quarts de finale puis demi-finales
+        rows = [
+            _matchRow(planningId, match, "elimination", createdAt)
+            for match in elimination.quarts + elimination.demi_finales
+        ]
 
         # Finale
         if elimination.finale:
-            match_obj = self._createEliminationMatchObject(
-                planningId, 
-                elimination.finale, 
-                "finale"
-            )
-            if match_obj:
-                matches.append(match_obj)
+            rows.append(_matchRow(planningId, elimination.finale, "finale", createdAt))
 
         # Match 3e place
         if elimination.match_troisieme_place:
-            match_obj = self._createEliminationMatchObject(
-                planningId, 
-                elimination.match_troisieme_place, 
-                "elimination"
-            )
-            if match_obj:
-                matches.append(match_obj)
-
-        return matches
-    
-    def _createEliminationMatchObject(self, 
-                                         planningId: str, 
-                                         match: Match, 
-                                         phase: str) -> Optional[AIGeneratedMatch]:
-        """Crée un objet AIGeneratedMatch pour un match d'élimination"""
-        try:
-            return AIGeneratedMatch(
-                id=str(uuid.uuid4()),
-                planning_id=planningId,
-                match_id_ai=match.match_id,
-                equipe_a=match.equipe_a,
-                equipe_b=match.equipe_b,
-                terrain=match.terrain,
-                debut_horaire=match.debut_horaire,
-                fin_horaire=match.fin_horaire,
-                phase=phase,
-                status="scheduled",
-                created_at=datetime.now()
-            )
-        except Exception as e:
-            print(f"⚠️ Match élimination invalide ignore: {e}")
-            return None
-    
+            rows.append(_matchRow(planningId, elimination.match_troisieme_place, "elimination", createdAt))
+
+        return rows
+
+    def _extractEliminationDirecteMatches(self,
+                                          planningId: str,
+                                          aiPlanningData: AIPlanningData,
+                                          createdAt: Optional[str] = None) -> List[dict]:
+        """
+        Extrait les matchs d'élimination directe (rounds_elimination)
+        """
+        createdAt = createdAt or datetime.now().isoformat()
+        return [
+            _matchRow(planningId, match, "finale" if roundName == "finale" else "elimination", createdAt)
+            for roundName, matches in aiPlanningData.elimination_rounds().items()
+            for match in matches
+        ]
+
+
+def encodeMatchCursor(debutHoraire: str, matchId: str) -> str:
+    """Curseur opaque (base64 url-safe) de la pagination des matchs"""
+    raw = json.dumps([debutHoraire, matchId], separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decodeMatchCursor(cursor: str) -> Tuple[str, str]:
+    """
+    Inverse de encodeMatchCursor, lève ValueError si le curseur est invalide
+
+    Les valeurs sont reprises dans le filtre or=(...) de PostgREST : seuls un
+    horaire ISO et un UUID sont acceptés, renvoyés sous forme normalisée.
+    """
+    try:
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4))
+        debutHoraire, matchId = json.loads(raw)
+        return datetime.fromisoformat(debutHoraire).isoformat(), str(uuid.UUID(matchId))
+    except Exception as e:
+        raise ValueError(f"Curseur invalide: {e}")
+
+
+def _carryResults(rows: List[dict], previousMatches: Iterable[AIGeneratedMatch]) -> None:
+    """
+    Reporte sur les nouvelles lignes les résultats de la version précédente
+
+    Statut et scores suivent le match (même match_id_ai et mêmes équipes) ;
+    une équipe résolue suit son placeholder, quel que soit le match qui le porte.
+    """
+    previous = {}
+    resolved = {}
+    for match in previousMatches:
+        previous[match.match_id_ai] = match
+        for side in ("a", "b"):
+            team = getattr(match, f"resolved_equipe_{side}_id")
+            if team:
+                resolved[getattr(match, f"equipe_{side}")] = team
+
+    for row in rows:
+        match = previous.get(row["match_id_ai"])
+        if match is not None and (match.equipe_a, match.equipe_b) == (row["equipe_a"], row["equipe_b"]):
+            row.update(status=match.status, score_a=match.score_a, score_b=match.score_b)
+        for side in ("a", "b"):
+            row[f"resolved_equipe_{side}_id"] = resolved.get(row[f"equipe_{side}"])
+
+
+def _newIds(count: int) -> List[str]:
+    """Génère `count` UUID v4 à partir d'un seul appel à os.urandom"""
+    raw = os.urandom(16 * count)
+    return [str(uuid.UUID(bytes=raw[i:i + 16], version=4)) for i in range(0, 16 * count, 16)]
+
+
+def _matchRow(planningId: str,
+              match: Match,
+              phase: str,
+              createdAt: str,
+              pouleId: Optional[str] = None,
+              journee: Optional[int] = None) -> dict:
+    """Ligne ai_generated_match (mêmes colonnes que AIGeneratedMatch.model_dump())"""
+    return {
+        "id": None,
+        "planning_id": planningId,
+        "match_id_ai": match.match_id,
+        "equipe_a": match.equipe_a,
+        "equipe_b": match.equipe_b,
+        "terrain": match.terrain,
+        "debut_horaire": match.debut_horaire.isoformat(),
+        "fin_horaire": match.fin_horaire.isoformat(),
+        "phase": phase,
+        "poule_id": pouleId,
+        "journee": journee,
+        "status": "scheduled",
+        "resolved_equipe_a_id": None,
+        "resolved_equipe_b_id": None,
+        "score_a": None,
+        "score_b": None,
+        "created_at": createdAt
+    }
+
+
 databaseService = DatabaseService()
\ No newline at end of file
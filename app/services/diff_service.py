@@ -0,0 +1,84 @@
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, Tuple
+from app.services.database_service import databaseService, decodeMatchCursor
+
+DIFF_COLUMNS = ("match_id_ai", "equipe_a", "equipe_b", "phase", "poule_id", "terrain", "debut_horaire", "fin_horaire")
+PAGE_SIZE = 500
+
+MatchKey = Tuple[str, Tuple[str, str]]
+
+
+def matchKey(row: Dict[str, Any]) -> MatchKey:
+    """Clé d'appariement entre versions : (phase, rencontre sans ordre A/B)"""
+    return row["phase"], tuple(sorted((row["equipe_a"], row["equipe_b"])))
+
+
+def classify(before: Dict[str, Any], after: Dict[str, Any]) -> str:
+    """moved (horaire et terrain), retimed, recourted ou unchanged"""
+    retimed = before["debut_horaire"] != after["debut_horaire"] or before["fin_horaire"] != after["fin_horaire"]
+    recourted = before["terrain"] != after["terrain"]
+    if retimed and recourted:
+        return "moved"
+    if retimed:
+        return "retimed"
+    return "recourted" if recourted else "unchanged"
+
+
+class PlanningDiffService():
+    """Différences entre deux versions de planning, produites au fil de l'eau"""
+
+    def __init__(self, pageSize: int = PAGE_SIZE):
+        self.databaseService = databaseService
+        self.pageSize = pageSize
+
+    def iterMatchRows(self, planningId: str) -> Iterator[Dict[str, Any]]:
+        """Matchs d'un planning page par page (keyset), colonnes utiles au diff uniquement"""
+        after = None
+        while True:
+            page = self.databaseService.getMatches(planningId, after=after, limit=self.pageSize, columns=DIFF_COLUMNS)
+            if page is None:
+                raise RuntimeError(f"Lecture des matchs du planning {planningId} impossible")
+            yield from page["matches"]
+            if not page["next_cursor"]:
+                return
+            after = decodeMatchCursor(page["next_cursor"])
+
+    def iterDiff(self, planningId: str, otherId: str) -> Iterator[Dict[str, Any]]:
+        """
+        Diff en temps linéaire de `planningId` (avant) vers `otherId` (après)
+
+        Seule la version "avant" est indexée en mémoire (colonnes réduites) ;
+        la version "après" est parcourue page par page et chaque différence est
+        émise dès qu'elle est connue. planning_data n'est jamais chargé.
+
+        Yields:
+            dict: {"type": moved|retimed|recourted|added|removed, "key", "before", "after"},
+            puis un dernier {"type": "summary", ...}
+        """
+        before: Dict[MatchKey, Deque[Dict[str, Any]]] = {}
+        for row in self.iterMatchRows(planningId):
+            before.setdefault(matchKey(row), deque()).append(row)
+
+        counts = {"moved": 0, "retimed": 0, "recourted": 0, "added": 0, "removed": 0, "unchanged": 0}
+        for row in self.iterMatchRows(otherId):
+            key = matchKey(row)
+            candidates = before.get(key)
+            if candidates:
+                previous = candidates.popleft()
+                change = classify(previous, row)
+            else:
+                previous, change = None, "added"
+            counts[change] += 1
+            if change != "unchanged":
+                yield {"type": change, "key": {"phase": key[0], "equipes": list(key[1])}, "before": previous, "after": row}
+
+        for key, remaining in before.items():
+            for previous in remaining:
+                counts["removed"] += 1
+                yield {"type": "removed", "key": {"phase": key[0], "equipes": list(key[1])}, "before": previous, "after": None}
+
+        yield {"type": "summary", "planning_id": planningId, "other_id": otherId, **counts}
+
+
+# Instance globale
+planningDiffService = PlanningDiffService()
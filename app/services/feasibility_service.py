@@ -0,0 +1,170 @@
+import math
+from datetime import datetime, time
+from typing import Any, Dict, Optional, Tuple
+from app.core.config import settings
+from app.core.scheduling import SchedulingRules, _parseTime
+from app.models.models import Tournament
+from app.services.local_scheduler_service import POULE_SIZE, localSchedulerService
+
+
+class InfeasibleTournamentError(ValueError):
+    """Configuration impossible à planifier dans la journée (terrains, durées, horaires)"""
+
+    def __init__(self, message: str, report: Dict[str, Any]):
+        super().__init__(message)
+        self.report = report
+
+
+def formatShape(tournamentType: str, teamCount: int) -> Optional[Tuple[int, int]]:
+    """
+    (nombre de matchs, nombre minimal de tours successifs) d'un format
+
+    Les poules suivent le découpage du moteur local (POULE_SIZE équipes, en
+    serpentin) ; None pour un format inconnu.
+    """
+    if tournamentType == "round_robin":
+        return teamCount * (teamCount - 1) // 2, teamCount - 1
+    if tournamentType == "elimination_directe":
+        return teamCount - 1, math.ceil(math.log2(teamCount))
+    if tournamentType == "poules_elimination":
+        count = max(1, teamCount // POULE_SIZE)
+        sizes = [teamCount // count + (1 if index < teamCount % count else 0) for index in range(count)]
+        qualifiers = len(localSchedulerService.eliminationQualifiers([str(index) for index in range(count)]))
+        matches = sum(size * (size - 1) // 2 for size in sizes) + qualifiers - 1 + (1 if qualifiers >= 4 else 0)
+        # la phase finale attend la fin des poules
+        return matches, max(sizes) - 1 + int(math.log2(qualifiers))
+    return None
+
+
+def minimumShape(tournamentType: str, teamCount: int) -> Optional[Tuple[int, int]]:
+    """
+    Borne inférieure de formatShape, quel que soit le découpage choisi
+
+    Le format des poules n'est fixé que pour le moteur local : l'IA peut faire
+    des poules de 2 (une de 3 si le nombre d'équipes est impair) suivies d'une
+    seule finale.
+    """
+    if tournamentType == "poules_elimination":
+        odd = teamCount % 2
+        return teamCount // 2 + 2 * odd + 1, 2 + odd
+    return formatShape(tournamentType, teamCount)
+
+
+def slotsEnd(start: datetime, slots: int, rules: SchedulingRules) -> datetime:
+    """Fin du dernier de `slots` créneaux enchaînés sur un terrain, pause déjeuner sautée"""
+    duration = rules.matchDuration
+    step = duration + rules.breakDuration
+    start = rules.earliestStart(start, duration)
+    lastEnd = start + (slots - 1) * step + duration
+    if rules.lunchStart is None or rules.lunchEnd is None:
+        return lastEnd
+    lunchStart = start.replace(hour=rules.lunchStart.hour, minute=rules.lunchStart.minute, second=0, microsecond=0)
+    lunchEnd = start.replace(hour=rules.lunchEnd.hour, minute=rules.lunchEnd.minute, second=0, microsecond=0)
+    if start >= lunchEnd or lastEnd <= lunchStart:
+        return lastEnd
+    # créneaux terminés avant le déjeuner, le reste reprend à la fin de la pause
+    before = (lunchStart - start - duration) // step + 1
+    return lunchEnd + (slots - before - 1) * step + duration
+
+
+class FeasibilityService():
+    """
+    Borne inférieure de l'heure de fin d'un tournoi, sans appel à l'IA
+
+    Un terrain enchaîne au mieux un match par (durée + pause) ; une équipe ne
+    joue qu'un match à la fois (au plus équipes/2 matchs simultanés) et une
+    équipe enchaîne au minimum autant de tours que le format en impose.
+
+    Pour les poules, l'estimation suit le découpage du moteur local : seul le
+    dépassement de la borne inférieure (minimumShape) est un rejet, le reste
+    n'est qu'un avertissement.
+    """
+
+    def __init__(self):
+        self.dayEnd = settings.PLANNING_DAY_END
+
+    def analyze(self, tournament: Tournament, teamCount: int) -> Optional[Dict[str, Any]]:
+        """
+        Estimation de la fin au plus tôt et des terrains nécessaires
+
+        Returns:
+            dict: feasible, matches, rounds, earliest_end, day_end, min_courts
+            (None si aucun nombre de terrains ne suffit), exact (False si
+            l'estimation dépend du découpage en poules) et lower_bound_end /
+            lower_bound_feasible ; None pour un format inconnu
+        """
+        shape = formatShape(tournament.tournament_type, teamCount)
+        if shape is None or teamCount < 2:
+            return None
+        matches, rounds = shape
+        bound = minimumShape(tournament.tournament_type, teamCount)
+        rules = SchedulingRules.fromTournament(tournament)
+        dayStart = datetime.combine(tournament.start_date, tournament.start_time or time(9, 0))
+        dayEnd = datetime.combine(
+            tournament.start_date,
+            _parseTime((tournament.constraints or {}).get("end_time"), self.dayEnd)
+        )
+        maxParallel = max(1, teamCount // 2)
+
+        def earliestEnd(courts: int, shape: Tuple[int, int] = shape) -> datetime:
+            slots = max(math.ceil(shape[0] / min(courts, maxParallel)), shape[1])
+            return slotsEnd(dayStart, slots, rules)
+
+        end = earliestEnd(tournament.courts_available)
+        boundEnd = earliestEnd(tournament.courts_available, bound)
+        minCourts = next((courts for courts in range(1, maxParallel + 1) if earliestEnd(courts) <= dayEnd), None)
+        return {
+            "feasible": end <= dayEnd,
+            "tournament_type": tournament.tournament_type,
+            "teams": teamCount,
+            "matches": matches,
+            "rounds": rounds,
+            "courts": tournament.courts_available,
+            "earliest_end": end.isoformat(),
+            "day_end": dayEnd.isoformat(),
+            "min_courts": minCourts,
+            "min_end_with_max_courts": earliestEnd(maxParallel).isoformat(),
+            "exact": bound == shape,
+            "lower_bound_end": boundEnd.isoformat(),
+            "lower_bound_feasible": boundEnd <= dayEnd,
+        }
+
+    def check(self, tournament: Tournament, teamCount: int) -> Optional[Dict[str, Any]]:
+        """
+        Vérifie que le tournoi peut tenir dans la journée
+
+        Une estimation non exacte (poules) qui dépasse la journée est signalée
+        dans le rapport (warning) sans rejet : l'IA peut choisir un autre découpage.
+
+        Raises:
+            InfeasibleTournamentError: avec le rapport (terrains ou heure de fin nécessaires)
+        """
+        report = self.analyze(tournament, teamCount)
+        if report is None or report["feasible"]:
+            return report
+        dayEnd = datetime.fromisoformat(report["day_end"])
+        if not report["exact"] and report["lower_bound_feasible"]:
+            report["warning"] = (f"Poules de {POULE_SIZE} : fin estimée {report['earliest_end']} "
+                                 f"après {report['day_end']}, planning tenté quand même")
+            print(f"⚠️ {report['warning']}")
+            return report
+
+        def label(value: str) -> str:
+            moment = datetime.fromisoformat(value)
+            return f"{moment:%H:%M}" if moment.date() == dayEnd.date() else f"{moment:%d/%m %H:%M}"
+
+        if not report["exact"]:
+            message = (f"Impossible de finir avant {label(report['day_end'])} quel que soit le découpage "
+                       f"en poules : fin au plus tôt {label(report['lower_bound_end'])}")
+        elif report["min_courts"]:
+            message = (f"Impossible de finir avant {label(report['day_end'])} : fin au plus tôt "
+                       f"{label(report['earliest_end'])}, {report['min_courts']} terrain(s) nécessaire(s)")
+        else:
+            message = (f"Impossible de finir avant {label(report['day_end'])} quel que soit le nombre de "
+                       f"terrains : fin au plus tôt {label(report['min_end_with_max_courts'])}")
+        print(f"❌ {message}")
+        raise InfeasibleTournamentError(message, report)
+
+
+# Instance globale
+feasibilityService = FeasibilityService()
@@ -0,0 +1,214 @@
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, Optional, Set
+from app.core.config import settings
+from app.core.database import getSupabase
+from app.core.metrics import cacheHitsTotal, cacheMissesTotal, idempotentRequestsTotal
+
+MAX_CACHED_KEYS = 1024
+IN_PROGRESS = "in_progress"
+COMPLETED = "completed"
+# Violation de clé primaire PostgreSQL : la clé est déjà réservée
+UNIQUE_VIOLATION = "23505"
+
+
+class IdempotencyRecord:
+    """État d'une clé Idempotency-Key ; `owner` n'est renseigné que pour la requête qui l'a réservée"""
+
+    def __init__(self,
+                 key: str,
+                 fingerprint: str,
+                 status: str,
+                 planningId: Optional[str] = None,
+                 owner: Optional[str] = None,
+                 expiresAt: float = 0.0):
+        self.key = key
+        self.fingerprint = fingerprint
+        self.status = status
+        self.planningId = planningId
+        self.owner = owner
+        self.expiresAt = expiresAt
+
+
+class IdempotencyKeyMismatchError(ValueError):
+    """Clé déjà utilisée pour une requête différente"""
+
+
+class IdempotencyService():
+    """
+    Clés Idempotency-Key des générations (table planning_idempotency)
+
+    La ligne est réservée par un INSERT (clé primaire = la clé) : entre
+    workers uvicorn, une seule requête exécute la génération, les répétitions
+    reçoivent son résultat ou son statut en cours. Les clés terminées sont
+    aussi gardées en mémoire jusqu'à leur expiration pour éviter la lecture DB.
+    Une réservation en cours plus vieille que IDEMPOTENCY_IN_PROGRESS_SECONDS
+    (worker arrêté en pleine génération) peut être reprise.
+    """
+
+    def __init__(self, maxEntries: int = MAX_CACHED_KEYS):
+        self.supabase = getSupabase()
+        self.maxEntries = maxEntries
+        self.ttlSeconds = settings.IDEMPOTENCY_TTL_SECONDS
+        self.inProgressSeconds = settings.IDEMPOTENCY_IN_PROGRESS_SECONDS
+        self._records: "OrderedDict[str, IdempotencyRecord]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def begin(self, key: str, fingerprint: str) -> IdempotencyRecord:
+        """
+        Réserve une clé ou retrouve la requête qui l'a déjà utilisée
+
+        Returns:
+            IdempotencyRecord: avec owner si la génération doit être lancée,
+            sinon statut completed (planningId) ou in_progress
+
+        Raises:
+            IdempotencyKeyMismatchError: clé déjà utilisée avec d'autres paramètres
+        """
+        record = self._cached(key)
+        if record is None:
+            record = self._claim(key, fingerprint)
+        if record.fingerprint != fingerprint:
+            idempotentRequestsTotal.inc(outcome="mismatch")
+            raise IdempotencyKeyMismatchError("Idempotency-Key déjà utilisée pour une autre requête")
+        idempotentRequestsTotal.inc(outcome="new" if record.owner else record.status)
+        return record
+
+    def complete(self, record: IdempotencyRecord, planningId: str) -> None:
+        """Enregistre le résultat : les répétitions recevront ce planning"""
+        try:
+            self.supabase.table("planning_idempotency")\
+                .update({
+                    "status": COMPLETED,
+                    "planning_id": planningId,
+                    "updated_at": datetime.now(timezone.utc).isoformat()
+                })\
+                .eq("id", record.key)\
+                .eq("owner", record.owner)\
+                .execute()
+        except Exception as e:
+            print(f"Erreur enregistrement cle idempotence {record.key}: {e}")
+        done = IdempotencyRecord(record.key, record.fingerprint, COMPLETED, planningId,
+                                 expiresAt=time.monotonic() + self.ttlSeconds)
+        self._remember(done)
+
+    def release(self, record: IdempotencyRecord) -> None:
+        """Libère une clé après un échec ou un abandon : une répétition relancera la génération"""
+        with self._lock:
+            self._records.pop(record.key, None)
+        try:
+            self.supabase.table("planning_idempotency")\
+                .delete()\
+                .eq("id", record.key)\
+                .eq("owner", record.owner)\
+                .execute()
+        except Exception as e:
+            print(f"Erreur liberation cle idempotence {record.key}: {e}")
+
+    def referencedPlannings(self, planningIds: Iterable[str]) -> Set[str]:
+        """
+        Plannings renvoyés par une clé non expirée : ils ne doivent pas être supprimés
+
+        En cas d'erreur de lecture, tous les plannings demandés sont considérés référencés.
+        """
+        planningIds = list(planningIds)
+        if not planningIds:
+            return set()
+        try:
+            result = self.supabase.table("planning_idempotency")\
+                .select("planning_id")\
+                .in_("planning_id", planningIds)\
+                .gt("expires_at", datetime.now(timezone.utc).isoformat())\
+                .execute()
+            return {row["planning_id"] for row in result.data or []}
+        except Exception as e:
+            print(f"Erreur lecture cles idempotence: {e}")
+            return set(planningIds)
+
+    def _claim(self, key: str, fingerprint: str) -> IdempotencyRecord:
+        owner = str(uuid.uuid4())
+        now = datetime.now(timezone.utc)
+        row = {
+            "id": key,
+            "fingerprint": fingerprint,
+            "status": IN_PROGRESS,
+            "planning_id": None,
+            "owner": owner,
+            "created_at": now.isoformat(),
+            "updated_at": now.isoformat(),
+            "expires_at": (now + timedelta(seconds=self.ttlSeconds)).isoformat(),
+        }
+        try:
+            self.supabase.table("planning_idempotency").insert(row).execute()
+            return self._remember(self._fromRow(row, owner))
+        except Exception as e:
+            if getattr(e, "code", None) != UNIQUE_VIOLATION:
+                # sans la table, la génération passe sans garantie inter-workers
+                print(f"Erreur reservation cle idempotence {key}: {e}")
+                return self._remember(self._fromRow(row, owner))
+
+        existing = self._read(key)
+        if existing is None:
+            # libérée entre-temps : nouvelle tentative
+            return self._claim(key, fingerprint)
+        if not self._abandoned(existing, now):
+            record = self._fromRow(existing)
+            return self._remember(record) if record.status == COMPLETED else record
+
+        # reprise d'une clé expirée ou d'une génération orpheline (comparaison sur updated_at)
+        taken = self.supabase.table("planning_idempotency")\
+            .update(row)\
+            .eq("id", key)\
+            .eq("updated_at", existing["updated_at"])\
+            .execute()
+        if taken.data:
+            return self._remember(self._fromRow(row, owner))
+        return self._claim(key, fingerprint)
+
+    def _read(self, key: str) -> Optional[Dict[str, Any]]:
+        result = self.supabase.table("planning_idempotency")\
+            .select("*")\
+            .eq("id", key)\
+            .execute()
+        return result.data[0] if result.data else None
+
+    def _abandoned(self, row: Dict[str, Any], now: datetime) -> bool:
+        if datetime.fromisoformat(row["expires_at"]) <= now:
+            return True
+        updatedAt = datetime.fromisoformat(row["updated_at"])
+        return row["status"] == IN_PROGRESS and now - updatedAt > timedelta(seconds=self.inProgressSeconds)
+
+    def _fromRow(self, row: Dict[str, Any], owner: Optional[str] = None) -> IdempotencyRecord:
+        remaining = (datetime.fromisoformat(row["expires_at"]) - datetime.now(timezone.utc)).total_seconds()
+        return IdempotencyRecord(row["id"], row["fingerprint"], row["status"], row.get("planning_id"),
+                                 owner=owner, expiresAt=time.monotonic() + remaining)
+
+    def _cached(self, key: str) -> Optional[IdempotencyRecord]:
+        with self._lock:
+            record = self._records.get(key)
+            if record is not None and record.expiresAt > time.monotonic():
+                self._records.move_to_end(key)
+                cacheHitsTotal.inc(cache="idempotency")
+                # réservation de ce worker : les répétitions attendent son résultat
+                if record.owner:
+                    return IdempotencyRecord(key, record.fingerprint, record.status, record.planningId,
+                                             expiresAt=record.expiresAt)
+                return record
+            self._records.pop(key, None)
+        cacheMissesTotal.inc(cache="idempotency")
+        return None
+
+    def _remember(self, record: IdempotencyRecord) -> IdempotencyRecord:
+        with self._lock:
+            self._records[record.key] = record
+            self._records.move_to_end(record.key)
+            while len(self._records) > self.maxEntries:
+                self._records.popitem(last=False)
+        return record
+
+
+# Instance globale
+idempotencyService = IdempotencyService()
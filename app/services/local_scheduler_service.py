@@ -0,0 +1,356 @@
+import bisect
+import heapq
+import random
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+from app.core.scheduling import SchedulingRules
+from app.models.models import (
+    RANK_LABELS, AIPlanningData, EliminationMatch, EliminationPhase, Poule, PouleMatch, RoundRobinMatch, Tournament,
+    placeholderKeys
+)
+
+# Tours de EliminationPhase, du plus grand au plus petit
+ELIMINATION_ROUNDS = ((8, "quarts"), (4, "demi_finales"), (2, "finale"))
+# Noms des tours de rounds_elimination (élimination directe), par nombre d'entrants
+BRACKET_ROUND_NAMES = {32: "seiziemes", 16: "huitiemes", 8: "quarts", 4: "demi_finales", 2: "finale"}
+POULE_SIZE = 4
+# Classements produits par une poule locale
+POULE_RANKS = RANK_LABELS[:POULE_SIZE]
+
+Interval = Tuple[datetime, datetime]
+
+
+def roundRobinPairings(teams: Sequence[str]) -> List[List[Tuple[str, str]]]:
+    """Journées d'un round robin (méthode du cercle), une équipe exempte si nombre impair"""
+    teams = list(teams)
+    if len(teams) % 2:
+        teams.append(None)
+    rounds = []
+    for _ in range(len(teams) - 1):
+        half = len(teams) // 2
+        pairs = [(teams[i], teams[-1 - i]) for i in range(half)]
+        rounds.append([pair for pair in pairs if None not in pair])
+        teams = [teams[0], teams[-1]] + teams[1:-1]
+    return rounds
+
+
+def pouleLabel(index: int) -> str:
+    """0 -> 'a', 25 -> 'z', 26 -> 'aa'"""
+    label = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        label = chr(ord("a") + remainder) + label
+    return label
+
+
+class SlotBook:
+    """
+    Occupation des terrains et des équipes, pour placer des matchs sans conflit
+
+    Les placeholders (winner_quarts_1, 1er_poule_a...) sont des "équipes"
+    disponibles à partir de la fin du match ou de la poule qui les détermine.
+    """
+
+    def __init__(self, rules: SchedulingRules, courts: int):
+        self.rules = rules
+        self.courts = courts
+        # intervalles triés par début, pour ne parcourir que le voisinage d'un créneau
+        self.courtIntervals: Dict[int, List[Interval]] = {court: [] for court in range(1, courts + 1)}
+        self.teamIntervals: Dict[str, List[Interval]] = {}
+        self.ready: Dict[str, datetime] = {}
+        self.longest = timedelta(0)
+
+    def book(self, court: int, teams: Iterable[str], start: datetime, end: datetime,
+             produces: Iterable[str] = ()) -> None:
+        bisect.insort(self.courtIntervals.setdefault(court, []), (start, end))
+        for team in teams:
+            bisect.insort(self.teamIntervals.setdefault(team, []), (start, end))
+        self.longest = max(self.longest, end - start)
+        available = self.rules.nextAvailable(end)
+        for key in produces:
+            self.ready[key] = max(available, self.ready.get(key, available))
+
+    def earliestFit(self, court: int, teams: Sequence[str], notBefore: datetime, duration: timedelta) -> datetime:
+        """Premier début >= notBefore sans chevauchement (pause comprise) sur le terrain et les équipes"""
+        gap = self.rules.breakDuration
+        start = max([notBefore] + [self.ready[team] for team in teams if team in self.ready])
+        lists = [self.courtIntervals.get(court, [])] + [self.teamIntervals.get(team, []) for team in teams]
+        while True:
+            start = self.rules.earliestStart(start, duration)
+            # Un intervalle commencé plus de (plus long match + pause) avant `start` ne peut pas le gêner
+            horizon = (start - self.longest - gap, start)
+            fitted = start
+            # Parcours par début croissant : `fitted` ne fait qu'avancer, un intervalle
+            # déjà dépassé ne peut plus entrer en conflit
+            for busyStart, busyEnd in heapq.merge(*(busy[bisect.bisect_left(busy, horizon):] for busy in lists)):
+                if busyStart >= fitted + duration + gap:
+                    break
+                if fitted < busyEnd + gap:
+                    fitted = busyEnd + gap
+            # La pause déjeuner n'est appliquée qu'une fois le premier trou trouvé
+            if self.rules.earliestStart(fitted, duration) == fitted:
+                return fitted
+            start = fitted
+
+    def place(self, teams: Sequence[str], notBefore: datetime, duration: timedelta,
+              produces: Iterable[str] = ()) -> Tuple[int, datetime, datetime]:
+        """Place un match au plus tôt, sur le terrain qui le permet le plus tôt"""
+        court, start = min(
+            ((court, self.earliestFit(court, teams, notBefore, duration)) for court in self.courtIntervals),
+            key=lambda item: (item[1], item[0])
+        )
+        end = start + duration
+        self.book(court, teams, start, end, produces)
+        return court, start, end
+
+
+class LocalSchedulerService():
+    """
+    Moteur de planification local (sans IA), fonctions pures sans I/O
+
+    Utilisé pour la régénération partielle : il place un sous-problème autour
+    des créneaux déjà occupés par le reste du planning. Il sait aussi produire
+    un planning complet, au même format que la réponse de l'IA.
+    """
+
+    def generatePlanning(self, tournament: Tournament, teams: Sequence[str], seed: int = 0) -> AIPlanningData:
+        """
+        Planning complet d'un tournoi, chaque match placé au plus tôt
+
+        Args:
+            tournament: tournoi (format, terrains, horaires)
+            teams: noms des équipes
+            seed: 0 garde l'ordre d'inscription, une autre graine mélange les
+                équipes (compositions des poules, ordre des rencontres)
+
+        Returns:
+            AIPlanningData: planning au format de la réponse de l'IA
+
+        Raises:
+            ValueError: format de tournoi non géré
+        """
+        teams = list(teams)
+        if seed:
+            random.Random(seed).shuffle(teams)
+        rules = SchedulingRules.fromTournament(tournament)
+        book = SlotBook(rules, tournament.courts_available)
+        dayStart = datetime.combine(tournament.start_date, tournament.start_time or time(9, 0))
+        data = AIPlanningData(
+            type_tournoi=tournament.tournament_type,
+            commentaires=f"Planning généré par le moteur local (graine {seed})"
+        )
+
+        if tournament.tournament_type == "round_robin":
+            for journee, day in enumerate(roundRobinPairings(teams), start=1):
+                for teamA, teamB in day:
+                    court, start, end = book.place((teamA, teamB), dayStart, rules.matchDuration)
+                    data.matchs_round_robin.append(RoundRobinMatch(
+                        match_id=f"rr_m{len(data.matchs_round_robin) + 1}",
+                        equipe_a=teamA, equipe_b=teamB,
+                        debut_horaire=start, fin_horaire=end, terrain=court, journee=journee
+                    ))
+
+        elif tournament.tournament_type == "poules_elimination":
+            data.poules = self.schedulePoules(book, teams, dayStart)
+            qualifiers = self.eliminationQualifiers([poule.poule_id for poule in data.poules])
+            data.phase_elimination_apres_poules = self.scheduleElimination(book, qualifiers, dayStart)
+
+        elif tournament.tournament_type == "elimination_directe":
+            data.rounds_elimination = self.scheduleBracket(book, teams, dayStart)
+
+        else:
+            raise ValueError(f"Format de tournoi non géré par le moteur local: {tournament.tournament_type}")
+        return data
+
+    def schedulePoules(self, book: SlotBook, teams: Sequence[str], notBefore: datetime) -> List[Poule]:
+        """
+        Poules de POULE_SIZE équipes (réparties en serpentin), jouées en
+        parallèle journée par journée
+        """
+        count = max(1, len(teams) // POULE_SIZE)
+        members: List[List[str]] = [[] for _ in range(count)]
+        for index, team in enumerate(teams):
+            row, column = divmod(index, count)
+            members[column if row % 2 == 0 else count - 1 - column].append(team)
+        poules = [
+            Poule(poule_id=f"poule_{pouleLabel(index)}", nom_poule=f"Poule {pouleLabel(index).upper()}", equipes=equipes)
+            for index, equipes in enumerate(members)
+        ]
+
+        schedules = [roundRobinPairings(poule.equipes) for poule in poules]
+        for journee in range(max(len(schedule) for schedule in schedules)):
+            for poule, schedule in zip(poules, schedules):
+                for teamA, teamB in schedule[journee] if journee < len(schedule) else []:
+                    court, start, end = book.place(
+                        (teamA, teamB), notBefore, book.rules.matchDuration,
+                        produces=[f"{label}_{poule.poule_id}" for label in POULE_RANKS]
+                    )
+                    poule.matchs.append(PouleMatch(
+                        match_id=f"{poule.poule_id}_m{len(poule.matchs) + 1}",
+                        equipe_a=teamA, equipe_b=teamB,
+                        debut_horaire=start, fin_horaire=end, terrain=court
+                    ))
+        return poules
+
+    def scheduleBracket(self, book: SlotBook, teams: Sequence[str], notBefore: datetime) -> Dict[str, Any]:
+        """
+        Tours de rounds_elimination (élimination directe), exempts pour les
+        meilleures têtes de série si le nombre d'équipes n'est pas une puissance de 2
+        """
+        size = 1
+        while size < len(teams):
+            size *= 2
+        current: List[Optional[str]] = list(teams) + [None] * (size - len(teams))
+        rounds: Dict[str, Any] = {}
+        while len(current) > 1:
+            roundName = BRACKET_ROUND_NAMES.get(len(current), f"tour_{len(current)}")
+            roundMatches, nextRound = [], []
+            for index in range(len(current) // 2):
+                teamA, teamB = current[index], current[len(current) - 1 - index]
+                if teamA is None or teamB is None:
+                    nextRound.append(teamA or teamB)
+                    continue
+                matchId = f"{roundName}_{len(roundMatches) + 1}"
+                court, start, end = book.place(
+                    (teamA, teamB), notBefore, book.rules.matchDuration,
+                    produces=(f"winner_{matchId}", f"loser_{matchId}")
+                )
+                roundMatches.append(EliminationMatch(
+                    match_id=matchId, equipe_a=teamA, equipe_b=teamB,
+                    debut_horaire=start, fin_horaire=end, terrain=court
+                ).model_dump(mode="json"))
+                nextRound.append(f"winner_{matchId}")
+            rounds[roundName] = roundMatches
+            current = nextRound
+        return rounds
+
+    def schedulePoule(self,
+                      book: SlotBook,
+                      pouleId: str,
+                      teams: Sequence[str],
+                      notBefore: datetime,
+                      played: Iterable[Tuple[str, str]] = (),
+                      order: Optional[List[Tuple[str, str]]] = None,
+                      reservedIds: Iterable[str] = ()) -> List[PouleMatch]:
+        """
+        Matchs d'une poule, chacun placé au plus tôt
+
+        Args:
+            book: créneaux déjà occupés (mis à jour)
+            pouleId: identifiant de la poule
+            teams: équipes de la poule
+            notBefore: horaire minimum
+            played: paires déjà jouées, à ne pas reprogrammer
+            order: ordre des rencontres proposé, complété par les journées du round robin
+            reservedIds: match_id déjà utilisés (matchs joués conservés)
+        """
+        done = {frozenset(pair) for pair in played}
+        usedIds = set(reservedIds)
+        number = 0
+        members = set(teams)
+        pairings = [pair for pair in order or [] if set(pair) <= members and pair[0] != pair[1]]
+        pairings += [pair for day in roundRobinPairings(teams) for pair in day]
+        matches = []
+        for teamA, teamB in pairings:
+            if frozenset((teamA, teamB)) in done:
+                continue
+            done.add(frozenset((teamA, teamB)))
+            court, start, end = book.place(
+                (teamA, teamB), notBefore, book.rules.matchDuration,
+                produces=[f"{label}_{pouleId}" for label in POULE_RANKS]
+            )
+            number += 1
+            while f"{pouleId}_m{number}" in usedIds:
+                number += 1
+            matches.append(PouleMatch(
+                match_id=f"{pouleId}_m{number}",
+                equipe_a=teamA,
+                equipe_b=teamB,
+                debut_horaire=start,
+                fin_horaire=end,
+                terrain=court
+            ))
+        return matches
+
+    def eliminationQualifiers(self, pouleIds: Sequence[str]) -> List[str]:
+        """Qualifiés (placeholders) par ordre de tête de série, complétés jusqu'à une puissance de 2 (max 8)"""
+        seeds = [f"{label}_{pouleId}" for label in POULE_RANKS for pouleId in pouleIds]
+        size = next((size for size, _ in reversed(ELIMINATION_ROUNDS) if size >= 2 * len(pouleIds)), 8)
+        return seeds[:size]
+
+    def scheduleElimination(self,
+                            book: SlotBook,
+                            qualifiers: Sequence[str],
+                            notBefore: datetime,
+                            thirdPlace: bool = True) -> EliminationPhase:
+        """
+        Tableau à élimination directe (quarts, demies, finale, 3e place)
+
+        Tête de série i contre tête de série n-1-i, chaque tour attend les
+        vainqueurs du précédent.
+        """
+        duration = book.rules.matchDuration
+        entrants = list(qualifiers)
+        pairs = [(entrants[i], entrants[-1 - i]) for i in range(len(entrants) // 2)]
+        # ordre du tableau : le 1er et le 2e tête de série ne se croisent qu'en finale
+        pairs = pairs[0::2] + pairs[1::2][::-1] if len(pairs) > 2 else pairs
+        phase = EliminationPhase()
+
+        for size, roundName in ELIMINATION_ROUNDS:
+            if len(pairs) * 2 != size:
+                continue
+            roundMatches = []
+            for number, (teamA, teamB) in enumerate(pairs, start=1):
+                matchId = "finale_1" if roundName == "finale" else f"{roundName}_{number}"
+                court, start, end = book.place(
+                    (teamA, teamB), notBefore, duration,
+                    produces=(f"winner_{matchId}", f"loser_{matchId}")
+                )
+                roundMatches.append(EliminationMatch(
+                    match_id=matchId, equipe_a=teamA, equipe_b=teamB,
+                    debut_horaire=start, fin_horaire=end, terrain=court
+                ))
+
+            if roundName == "finale":
+                phase.finale = roundMatches[0]
+            else:
+                setattr(phase, roundName, roundMatches)
+                if roundName == "demi_finales" and thirdPlace:
+                    losers = [f"loser_{match.match_id}" for match in roundMatches]
+                    court, start, end = book.place(losers, notBefore, duration)
+                    phase.match_troisieme_place = EliminationMatch(
+                        match_id="petite_finale", equipe_a=losers[0], equipe_b=losers[1],
+                        debut_horaire=start, fin_horaire=end, terrain=court
+                    )
+                winners = [f"winner_{match.match_id}" for match in roundMatches]
+                pairs = [(winners[i], winners[i + 1]) for i in range(0, len(winners), 2)]
+        return phase
+
+    def reslotElimination(self,
+                          book: SlotBook,
+                          phase: EliminationPhase,
+                          notBefore: datetime) -> EliminationPhase:
+        """
+        Garde les rencontres d'un tableau proposé (par l'IA) mais recalcule les
+        créneaux pour garantir l'absence de conflit avec le reste du planning
+        """
+        duration = book.rules.matchDuration
+
+        def reslot(match: EliminationMatch) -> EliminationMatch:
+            court, start, end = book.place(
+                (match.equipe_a, match.equipe_b), notBefore, duration,
+                produces=placeholderKeys(match.match_id)
+            )
+            return match.model_copy(update={"terrain": court, "debut_horaire": start, "fin_horaire": end})
+
+        return EliminationPhase(
+            quarts=[reslot(match) for match in phase.quarts],
+            demi_finales=[reslot(match) for match in phase.demi_finales],
+            match_troisieme_place=reslot(phase.match_troisieme_place) if phase.match_troisieme_place else None,
+            finale=reslot(phase.finale) if phase.finale else None
+        )
+
+
+# Instance globale
+localSchedulerService = LocalSchedulerService()
@@ -1,61 +1,219 @@
 from openai import OpenAI
+from app.core.circuit_breaker import CircuitBreaker
 from app.core.config import settings
+from app.core.metrics import openaiHedgesTotal, openaiRunStatusTotal, openaiParseFailuresTotal, planningStageSeconds
+from app.core.tracing import span, traced
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import List, Optional
+import threading
 import time
 import json
 
+class _AnyEvent:
+    """
+    Vu comme un threading.Event positionné dès qu'un de ses événements l'est
+
+    wait() se réveille sur le dernier événement (celui du run) ; les autres
+    sont vus à la fin de l'attente, au plus un intervalle de polling plus tard.
+    """
+
+    def __init__(self, *events: Optional[threading.Event]):
+        self.events = [event for event in events if event is not None]
+
+    def is_set(self) -> bool:
+        return any(event.is_set() for event in self.events)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        self.events[-1].wait(timeout)
+        return self.is_set()
+
+
 class OpenAIClientService:
 
     def __init__(self):
         self.client = OpenAI(api_key=settings.OPENAI_API_KEY)
         self.assistant_id = settings.OPENAI_ASSISTANT_ID
+        self.poll_interval = settings.OPENAI_POLL_INTERVAL_SECONDS
+        self.max_wait = settings.OPENAI_MAX_WAIT_SECONDS
+        self.breaker = CircuitBreaker(
+            "openai",
+            window=settings.OPENAI_BREAKER_WINDOW,
+            minCalls=settings.OPENAI_BREAKER_MIN_CALLS,
+            failureRate=settings.OPENAI_BREAKER_FAILURE_RATE,
+            slowSeconds=settings.OPENAI_BREAKER_SLOW_SECONDS,
+            openSeconds=settings.OPENAI_BREAKER_OPEN_SECONDS
+        )
+        # durées des derniers runs aboutis, pour le délai de relance (hedging)
+        self.hedge_percentile = settings.OPENAI_HEDGE_PERCENTILE
+        self.hedge_min_samples = settings.OPENAI_HEDGE_MIN_SAMPLES
+        self._run_durations = deque(maxlen=settings.OPENAI_HEDGE_WINDOW)
+        self._durations_lock = threading.Lock()
+        # seuls les seconds runs passent par ce pool, le run principal reste dans le thread appelant
+        self._hedge_executor = ThreadPoolExecutor(
+            max_workers=settings.OPENAI_HEDGE_MAX_RUNS, thread_name_prefix="openai-hedge"
+        )
+        self._hedge_slots = threading.BoundedSemaphore(settings.OPENAI_HEDGE_MAX_RUNS)
 
-    def generate_planning(self, prompt:str) -> dict:
+    @traced("openai_service.generate_planning")
+    def generate_planning(self, prompt:str, cancel_event: Optional[threading.Event] = None) -> dict:
         """
         Génère un planning en appelant ton assistant
         
         Args:
             prompt: Le prompt avec les données du tournoi
+            cancel_event: si positionné pendant l'attente, le run est annulé côté OpenAI
             
         Returns:
-            dict: Planning généré par l'IA
+            dict: Planning généré par l'IA (None en cas d'échec ou si le circuit est ouvert)
         """
+        if not self.breaker.allowRequest():
+            print("Circuit OpenAI ouvert : appel refuse")
+            return None
+        started = time.monotonic()
         try:
-            thread = self.client.beta.threads.create()
-            self.client.beta.threads.messages.create(
-                thread_id=thread.id,
-                role="user",
-                content=prompt
-            )
-            run = self.client.beta.threads.runs.create(
-                thread_id=thread.id,
-                assistant_id=self.assistant_id
-            )
-            planning_response = self._wait_for_completion(thread.id, run.id)
-            
-            # 5. Parser la réponse JSON
-            planning_data = self._parse_response(planning_response)
+            if cancel_event is not None and cancel_event.is_set():
+                raise Exception("Génération annulée avant l'appel")
+            hedge_after = self._hedge_delay()
+            if hedge_after is None:
+                planning_data = self._run_once(prompt, cancel_event)
+            else:
+                planning_data = self._run_hedged(prompt, cancel_event, hedge_after)
             
+            self.breaker.recordSuccess(time.monotonic() - started)
             print("✅ Planning généré avec succès")
             return planning_data
         except Exception as e:
+            # une annulation ne dit rien de la santé d'OpenAI
+            if cancel_event is not None and cancel_event.is_set():
+                self.breaker.release()
+            else:
+                self.breaker.recordFailure(time.monotonic() - started)
             print(f"Erreur generation {e}")
 
-    def _wait_for_completion(self, thread_id: str, run_id: str) -> str:
+    def _run_once(self, prompt: str, cancel_event: Optional[threading.Event] = None) -> dict:
+        """Un run complet : thread, message, run, attente puis parsing JSON"""
+        thread = self.client.beta.threads.create()
+        self.client.beta.threads.messages.create(
+            thread_id=thread.id,
+            role="user",
+            content=prompt
+        )
+        run = self.client.beta.threads.runs.create(
+            thread_id=thread.id,
+            assistant_id=self.assistant_id
+        )
+        started = time.monotonic()
+        with planningStageSeconds.time(stage="openai_run"):
+            planning_response = self._wait_for_completion(thread.id, run.id, cancel_event)
+        with self._durations_lock:
+            self._run_durations.append(time.monotonic() - started)
+        
+        # 5. Parser la réponse JSON
+        with planningStageSeconds.time(stage="parse_response"):
+            return self._parse_response(planning_response)
+
+    def _hedge_delay(self) -> Optional[float]:
+        """
+        Délai après lequel un second run est lancé : percentile
+        OPENAI_HEDGE_PERCENTILE des durées de runs récentes (None si désactivé
+        ou pas encore assez de mesures)
+        """
+        if not self.hedge_percentile:
+            return None
+        with self._durations_lock:
+            durations = sorted(self._run_durations)
+        if len(durations) < self.hedge_min_samples:
+            return None
+        return durations[min(len(durations) - 1, int(self.hedge_percentile * len(durations)))]
+
+    def _run_hedged(self, prompt: str, cancel_event: Optional[threading.Event], hedge_after: float) -> dict:
+        """
+        Run principal dans le thread appelant, doublé par un run identique s'il dépasse hedge_after
+
+        Le second run part sur _hedge_executor ; si OPENAI_HEDGE_MAX_RUNS seconds
+        runs sont déjà en cours, il n'est pas lancé (une relance en file
+        arriverait trop tard). La première réponse JSON valide gagne, l'autre
+        run est annulé.
+        """
+        cancels = [threading.Event(), threading.Event()]
+        hedges: List[Future] = []
+        # positionné quand le run principal s'arrête : plus de relance après
+        primary_done = threading.Event()
+        lock = threading.Lock()
+
+        def start_hedge() -> None:
+            with lock:
+                if primary_done.is_set():
+                    return
+                if not self._hedge_slots.acquire(blocking=False):
+                    openaiHedgesTotal.inc(outcome="skipped")
+                    return
+                print(f"⏳ Run au-delà de {hedge_after:.1f}s : second run lancé")
+                openaiHedgesTotal.inc(outcome="started")
+                hedge = self._hedge_executor.submit(self._run_hedge, prompt, _AnyEvent(cancel_event, cancels[1]))
+                hedge.add_done_callback(hedge_done)
+                hedges.append(hedge)
+
+        def hedge_done(hedge: Future) -> None:
+            # le second run gagne : le principal est annulé et rend sa réponse
+            if hedge.exception() is None:
+                cancels[0].set()
+
+        timer = threading.Timer(hedge_after, start_hedge)
+        timer.daemon = True
+        timer.start()
+        try:
+            try:
+                planning_data = self._run_once(prompt, _AnyEvent(cancel_event, cancels[0]))
+            except Exception:
+                with lock:
+                    primary_done.set()
+                if not hedges or (cancel_event is not None and cancel_event.is_set()):
+                    raise
+                planning_data = hedges[0].result()
+                openaiHedgesTotal.inc(outcome="hedge_won")
+                return planning_data
+            if hedges:
+                openaiHedgesTotal.inc(outcome="primary_won")
+            return planning_data
+        finally:
+            # le run perdant (ou les deux si abandon) est annulé côté OpenAI
+            timer.cancel()
+            with lock:
+                primary_done.set()
+                for event in cancels:
+                    event.set()
+
+    def _run_hedge(self, prompt: str, cancel_event: _AnyEvent) -> dict:
+        try:
+            return self._run_once(prompt, cancel_event)
+        finally:
+            self._hedge_slots.release()
+    
+    def _wait_for_completion(self, thread_id: str, run_id: str, cancel_event: Optional[threading.Event] = None) -> str:
         """Attend que l'assistant termine et récupère la réponse"""
         
-        max_wait = 120  # 2 minutes max
         waited = 0
         
-        while waited < max_wait:
+        while waited < self.max_wait:
+            if cancel_event is not None and cancel_event.is_set():
+                self._cancel_run(thread_id, run_id)
+                openaiRunStatusTotal.inc(status="cancelled")
+                raise Exception("Run annulé")
+
             # Vérifier le statut
-            run = self.client.beta.threads.runs.retrieve(
-                thread_id=thread_id,
-                run_id=run_id
-            )
+            with span("openai_service._wait_for_completion.poll", run_id=run_id, waited_s=waited) as pollSpan:
+                run = self.client.beta.threads.runs.retrieve(
+                    thread_id=thread_id,
+                    run_id=run_id
+                )
+                pollSpan.setAttribute("status", run.status)
             
             print(f"⏳ Statut assistant: {run.status}")
             
             if run.status == "completed":
+                openaiRunStatusTotal.inc(status=run.status)
                 # Récupérer la réponse
                 messages = self.client.beta.threads.messages.list(
                     thread_id=thread_id,
@@ -69,14 +227,30 @@ class OpenAIClientService:
                     raise Exception("Aucune réponse de l'assistant")
             
             elif run.status in ["failed", "cancelled", "expired"]:
+                openaiRunStatusTotal.inc(status=run.status)
                 raise Exception(f"Assistant échoué: {run.status}")
             
-            # Attendre un peu
-            time.sleep(3)
-            waited += 3
+            # Attendre un peu (réveillé tout de suite en cas d'annulation)
+            if cancel_event is not None:
+                cancel_event.wait(self.poll_interval)
+            else:
+                time.sleep(self.poll_interval)
+            waited += self.poll_interval
         
+        # Le run continuerait côté OpenAI et consommerait le quota pour rien
+        self._cancel_run(thread_id, run_id)
+        openaiRunStatusTotal.inc(status="timeout")
         raise Exception("Timeout: Assistant trop lent")
     
+    def _cancel_run(self, thread_id: str, run_id: str) -> None:
+        """Annule un run en cours pour libérer le quota (best effort)"""
+        try:
+            self.client.beta.threads.runs.cancel(thread_id=thread_id, run_id=run_id)
+            print(f"🛑 Run {run_id} annulé")
+        except Exception as e:
+            print(f"Erreur annulation run {run_id}: {e}")
+
+    @traced("openai_service._parse_response")
     def _parse_response(self, response_text: str) -> dict:
         """Parse la réponse texte en JSON"""
         
@@ -105,10 +279,12 @@ class OpenAIClientService:
             return planning_data
             
         except json.JSONDecodeError as e:
+            openaiParseFailuresTotal.inc()
             print(f"❌ Erreur parsing JSON: {e}")
             print(f"Réponse reçue: {response_text[:200]}...")
             raise Exception(f"JSON invalide: {e}")
         except Exception as e:
+            openaiParseFailuresTotal.inc()
             print(f"❌ Erreur traitement réponse: {e}")
             raise
 
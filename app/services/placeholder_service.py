@@ -0,0 +1,226 @@
+import threading
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+from app.core.tracing import traced
+from app.models.models import INACTIVE_STATUSES, RANK_LABELS, AIGeneratedMatch, isPlaceholder, placeholderMatchIds
+from app.services.database_service import RESULT_COLUMNS, databaseService
+from app.services.schedule_index_service import scheduleIndexService
+from app.services.standings_service import rankPoule, standingsService
+
+MAX_CACHED_GRAPHS = 128
+
+def concreteTeam(match: AIGeneratedMatch, side: str) -> Optional[str]:
+    """Équipe réelle d'un côté du match ("a" ou "b"), None si encore inconnue"""
+    resolved = getattr(match, f"resolved_equipe_{side}_id")
+    if resolved:
+        return resolved
+    raw = getattr(match, f"equipe_{side}")
+    return None if isPlaceholder(raw) else raw
+
+
+class ResultRejectedError(ValueError):
+    """Résultat impossible à enregistrer (match inconnu, équipes non déterminées)"""
+
+
+class MatchNotFoundError(ResultRejectedError):
+    """Match absent du planning"""
+
+
+class TeamsNotDeterminedError(ResultRejectedError):
+    """Score sur un match dont un placeholder n'est pas encore résolu"""
+
+
+class PlaceholderGraph:
+    """
+    Graphe de dépendances des placeholders d'un planning
+
+    Construit une fois : placeholder -> [(match dépendant, côté)]. Un résultat ne
+    parcourt ensuite que les matchs qui en dépendent, de proche en proche.
+    """
+
+    def __init__(self, matches: Iterable[AIGeneratedMatch]):
+        self.dependents: Dict[str, List[Tuple[str, str]]] = {}
+        self.pouleMatches: Dict[str, List[str]] = {}
+        for match in matches:
+            for side in ("a", "b"):
+                team = getattr(match, f"equipe_{side}")
+                if isPlaceholder(team):
+                    self.dependents.setdefault(team, []).append((match.id, side))
+            if match.poule_id:
+                self.pouleMatches.setdefault(match.poule_id, []).append(match.id)
+
+    def outcomes(self,
+                 match: AIGeneratedMatch,
+                 lookup: Callable[[str], AIGeneratedMatch]) -> Dict[str, str]:
+        """Placeholders déterminés par le résultat d'un match"""
+        resolved: Dict[str, str] = {}
+        teamA, teamB = concreteTeam(match, "a"), concreteTeam(match, "b")
+        if match.status == "completed" and teamA and teamB \
+                and match.score_a is not None and match.score_b is not None \
+                and match.score_a != match.score_b:
+            winner, loser = (teamA, teamB) if match.score_a > match.score_b else (teamB, teamA)
+            for matchId in placeholderMatchIds(match.match_id_ai):
+                resolved[f"winner_{matchId}"] = winner
+                resolved[f"loser_{matchId}"] = loser
+
+        if match.poule_id:
+            pouleMatches = [lookup(matchId) for matchId in self.pouleMatches.get(match.poule_id, [])]
+            if all(m.status == "completed" or m.status in INACTIVE_STATUSES for m in pouleMatches):
+                for label, team in zip(RANK_LABELS, rankPoule(pouleMatches)):
+                    resolved[f"{label}_{match.poule_id}"] = team
+        return resolved
+
+    def propagate(self,
+                  matches: Dict[str, AIGeneratedMatch],
+                  sources: Iterable[str]) -> Dict[str, AIGeneratedMatch]:
+        """
+        Propage les résultats des matchs `sources` aux matchs qui en dépendent
+
+        Returns:
+            Dict[str, AIGeneratedMatch]: copies des matchs dont une équipe a été résolue
+        """
+        changed: Dict[str, AIGeneratedMatch] = {}
+
+        def lookup(matchId: str) -> AIGeneratedMatch:
+            return changed.get(matchId) or matches[matchId]
+
+        queue = deque(sources)
+        while queue:
+            for placeholder, team in self.outcomes(lookup(queue.popleft()), lookup).items():
+                for matchId, side in self.dependents.get(placeholder, ()):
+                    dependent = lookup(matchId)
+                    field = f"resolved_equipe_{side}_id"
+                    if getattr(dependent, field) == team:
+                        continue
+                    changed[matchId] = dependent.model_copy(update={field: team})
+                    # Un match déjà joué dont une équipe change propage à son tour
+                    if dependent.status == "completed":
+                        queue.append(matchId)
+        return changed
+
+
+class _Overlay(dict):
+    """Lecture de `updates` puis de `base`, sans copier `base`"""
+
+    def __init__(self, base: Dict[str, AIGeneratedMatch], updates: Dict[str, AIGeneratedMatch]):
+        super().__init__(updates)
+        self.base = base
+
+    def __missing__(self, key: str) -> AIGeneratedMatch:
+        return self.base[key]
+
+
+class PlaceholderService():
+    """Enregistrement des résultats et résolution des placeholders"""
+
+    def __init__(self, maxEntries: int = MAX_CACHED_GRAPHS):
+        self.databaseService = databaseService
+        self.scheduleIndexService = scheduleIndexService
+        self.standingsService = standingsService
+        self.maxEntries = maxEntries
+        self._graphs: "OrderedDict[str, PlaceholderGraph]" = OrderedDict()
+        # planning -> [verrou, nombre d'utilisateurs], retiré quand plus personne ne l'attend
+        self._planningLocks: Dict[str, List[Any]] = {}
+        self._lock = threading.Lock()
+
+    @contextmanager
+    def _planningLock(self, planningId: str) -> Iterator[None]:
+        """Sérialise les lots d'un même planning dans ce processus"""
+        with self._lock:
+            entry = self._planningLocks.setdefault(planningId, [threading.Lock(), 0])
+            entry[1] += 1
+        try:
+            with entry[0]:
+                yield
+        finally:
+            with self._lock:
+                entry[1] -= 1
+                if entry[1] == 0:
+                    del self._planningLocks[planningId]
+
+    def getGraph(self, planningId: str, matches: Iterable[AIGeneratedMatch]) -> PlaceholderGraph:
+        """Graphe du planning, construit au premier résultat (les placeholders ne changent pas)"""
+        with self._lock:
+            graph = self._graphs.get(planningId)
+            if graph is not None:
+                self._graphs.move_to_end(planningId)
+                return graph
+        graph = PlaceholderGraph(matches)
+        with self._lock:
+            self._graphs[planningId] = graph
+            while len(self._graphs) > self.maxEntries:
+                self._graphs.popitem(last=False)
+        return graph
+
+    @traced("placeholderService.recordResults")
+    def recordResults(self,
+                      planningId: str,
+                      updates: Dict[str, Dict[str, Any]]) -> Optional[List[AIGeneratedMatch]]:
+        """
+        Applique un lot de scores/statuts et résout les placeholders qui en dépendent
+
+        Une seule écriture en base et une seule propagation (placeholders,
+        index, classements) pour tout le lot. Les lots d'un planning passent
+        un par un et propagent depuis les lignes relues en base : l'index en
+        cache peut ignorer un résultat enregistré par un autre worker.
+
+        Args:
+            planningId: ID du planning
+            updates: id du match -> champs modifiés (score_a, score_b, status)
+
+        Returns:
+            List[AIGeneratedMatch]: matchs modifiés (lot et équipes résolues) ou None si erreur
+
+        Raises:
+            MatchNotFoundError: match introuvable
+            TeamsNotDeterminedError: score sur un match sans ses deux équipes
+        """
+        with self._planningLock(planningId):
+            return self._recordResults(planningId, updates)
+
+    def _recordResults(self,
+                       planningId: str,
+                       updates: Dict[str, Dict[str, Any]]) -> Optional[List[AIGeneratedMatch]]:
+        # propagation depuis les lignes en base ; l'index et les classements en cache
+        # (qui peuvent dater de SCHEDULE_INDEX_TTL_SECONDS) ne reçoivent que les lignes écrites
+        rows = self.databaseService.getAllMatches(planningId)
+        if rows is None:
+            return None
+        matches = {match.id: match for match in rows if match.id}
+
+        batch: Dict[str, AIGeneratedMatch] = {}
+        for matchId, fields in updates.items():
+            match = matches.get(matchId)
+            if match is None:
+                raise MatchNotFoundError(f"Match {matchId} introuvable")
+            if fields.get("score_a") is not None and "status" not in fields:
+                fields = {**fields, "status": "completed"}
+            batch[matchId] = match.model_copy(update=fields)
+
+        # Les résultats du lot sont vus par la propagation via une vue superposée aux matchs relus
+        graph = self.getGraph(planningId, matches.values())
+        changed = {**batch, **graph.propagate(_Overlay(matches, batch), batch.keys())}
+
+        # Vérifié après propagation : un lot peut contenir un quart et la demie qui en dépend
+        for matchId in batch:
+            match = changed[matchId]
+            if match.score_a is not None and (concreteTeam(match, "a") is None or concreteTeam(match, "b") is None):
+                raise TeamsNotDeterminedError(f"Match {matchId} : équipes pas encore déterminées")
+
+        # seules les colonnes de résultat sont écrites : un retard peut arriver entre la lecture et l'écriture
+        written = self.databaseService.upsertMatches(list(changed.values()), columns=RESULT_COLUMNS)
+        if written is None:
+            return None
+        self.scheduleIndexService.applyUpdates(planningId, written)
+        self.standingsService.applyResults(planningId, written)
+        print(f"Resultats {planningId} : {len(batch)} match(s) du lot, {len(changed) - len(batch)} equipe(s) resolue(s)")
+        return written
+
+    def invalidate(self, planningId: str) -> None:
+        with self._lock:
+            self._graphs.pop(planningId, None)
+
+
+# Instance globale
+placeholderService = PlaceholderService()
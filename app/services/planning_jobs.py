@@ -0,0 +1,75 @@
+# Jobs CPU exécutés dans le pool de processus (app.core.process_pool) : fonctions
+# de module (picklables) aux entrées compactes, tournoi et planning en bytes JSON
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import orjson
+
+from app.core.scheduling import SchedulingRules
+from app.models.models import AIPlanningData, EliminationPhase, Tournament
+from app.services.local_scheduler_service import SlotBook, localSchedulerService
+from app.services.quality_service import ScheduleArrays, scoreSchedule
+
+# Créneau déjà occupé : (terrain, équipes, début, fin, placeholders produits)
+Booking = Tuple[int, List[str], datetime, datetime, List[str]]
+
+
+def _score(tournament: Tournament, data: AIPlanningData, teams: Sequence[str]) -> Dict[str, Any]:
+    return scoreSchedule(
+        ScheduleArrays.fromPlanningData(data),
+        SchedulingRules.fromTournament(tournament),
+        courts=tournament.courts_available,
+        teams=teams
+    )
+
+
+def localPlanningJob(tournamentJson: bytes, teams: Sequence[str], seed: int) -> Tuple[bytes, Dict[str, Any]]:
+    """Planning du moteur local pour une graine, et son score"""
+    tournament = Tournament.model_validate_json(tournamentJson)
+    data = localSchedulerService.generatePlanning(tournament, teams, seed)
+    return orjson.dumps(data.model_dump(mode="json")), _score(tournament, data, teams)
+
+
+def scorePlanningJob(tournamentJson: bytes, planningJson: bytes, teams: Sequence[str]) -> Dict[str, Any]:
+    """Score d'un planning (réponse de l'IA)"""
+    tournament = Tournament.model_validate_json(tournamentJson)
+    return _score(tournament, AIPlanningData.model_validate_json(planningJson), teams)
+
+
+def _slotBook(tournament: Tournament, bookings: Sequence[Booking]) -> SlotBook:
+    book = SlotBook(SchedulingRules.fromTournament(tournament), tournament.courts_available)
+    for court, teams, start, end, produces in bookings:
+        book.book(court, teams, start, end, produces)
+    return book
+
+
+def schedulePouleJob(tournamentJson: bytes,
+                     bookings: Sequence[Booking],
+                     pouleId: str,
+                     teams: Sequence[str],
+                     notBefore: datetime,
+                     played: Sequence[Tuple[str, str]],
+                     order: Optional[List[Tuple[str, str]]],
+                     reservedIds: Sequence[str]) -> bytes:
+    """Matchs d'une poule placés autour des créneaux déjà occupés (régénération partielle)"""
+    tournament = Tournament.model_validate_json(tournamentJson)
+    matches = localSchedulerService.schedulePoule(
+        _slotBook(tournament, bookings), pouleId, teams, notBefore,
+        played=played, order=order, reservedIds=reservedIds
+    )
+    return orjson.dumps([match.model_dump(mode="json") for match in matches])
+
+
+def scheduleEliminationJob(tournamentJson: bytes,
+                           bookings: Sequence[Booking],
+                           qualifiers: Sequence[str],
+                           notBefore: datetime,
+                           proposalJson: Optional[bytes] = None) -> bytes:
+    """Phase finale placée autour des créneaux déjà occupés : tableau proposé (IA) replacé, ou tableau local"""
+    tournament = Tournament.model_validate_json(tournamentJson)
+    book = _slotBook(tournament, bookings)
+    if proposalJson:
+        phase = localSchedulerService.reslotElimination(book, EliminationPhase.model_validate_json(proposalJson), notBefore)
+    else:
+        phase = localSchedulerService.scheduleElimination(book, qualifiers, notBefore)
+    return orjson.dumps(phase.model_dump(mode="json"))
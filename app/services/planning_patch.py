@@ -0,0 +1,142 @@
+# Régénération par delta : planning précédent en forme compacte pour le prompt,
+# et application locale des modifications renvoyées par l'IA.
+from datetime import date, datetime
+from typing import Any, Collection, Dict, Iterable, Iterator, List, Sequence, Tuple
+
+import orjson
+
+from app.models.models import AIGeneratedMatch
+from app.services.quality_service import MatchTuple
+
+# Champs qu'une modification peut changer ; la structure du tournoi est conservée
+PATCH_FIELDS = ("equipe_a", "equipe_b", "terrain", "debut_horaire", "fin_horaire")
+
+
+class PlanningPatchError(ValueError):
+    """Modification inapplicable (match inconnu, champ interdit, horaire invalide)"""
+
+
+def _clock(moment: datetime, day: date) -> str:
+    return f"{moment:%H:%M}" if moment.date() == day else f"{moment:%d/%m %H:%M}"
+
+
+def compactPlanning(matches: Sequence[MatchTuple], day: date) -> str:
+    """
+    Une ligne par match : id|poule|équipe A|équipe B|terrain|début|fin
+
+    Horaires en HH:MM (préfixés de jj/mm hors du premier jour), matchs triés
+    par horaire : quelques dizaines d'octets par match au lieu du JSON complet.
+    """
+    return "\n".join(
+        f"{matchId}|{pouleId or '-'}|{teamA}|{teamB}|{court}|{_clock(start, day)}|{_clock(end, day)}"
+        for matchId, pouleId, teamA, teamB, court, start, end in sorted(matches, key=lambda match: (match[5], match[4]))
+    )
+
+
+def _matchDicts(planningData: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    """Tous les matchs (dict) de planning_data, modifiables en place"""
+    yield from planningData.get("matchs_round_robin") or []
+    for poule in planningData.get("poules") or []:
+        yield from poule.get("matchs") or []
+    phase = planningData.get("phase_elimination_apres_poules") or {}
+    yield from phase.get("quarts") or []
+    yield from phase.get("demi_finales") or []
+    for key in ("match_troisieme_place", "finale"):
+        if phase.get(key):
+            yield phase[key]
+    for matches in (planningData.get("rounds_elimination") or {}).values():
+        if isinstance(matches, list):
+            yield from matches
+
+
+def syncPlanningData(planningData: Dict[str, Any],
+                     matches: Iterable[AIGeneratedMatch]) -> Dict[str, Any]:
+    """
+    Copie de planning_data alignée sur les lignes ai_generated_match
+
+    planning_data n'est écrit qu'à la génération : les retards et retraits
+    (terrain, horaires) ne sont portés que par les lignes de match.
+    """
+    synced = orjson.loads(orjson.dumps(planningData))
+    byId = {match.match_id_ai: match for match in matches}
+    for match in _matchDicts(synced):
+        row = byId.get(match.get("match_id"))
+        if row is None:
+            continue
+        match["terrain"] = row.terrain
+        match["debut_horaire"] = row.debut_horaire.isoformat()
+        match["fin_horaire"] = row.fin_horaire.isoformat()
+    return synced
+
+
+def _patchTime(value: Any, original: datetime) -> datetime:
+    """HH:MM (jour du match d'origine) ou date ISO complète"""
+    text = str(value).strip()
+    try:
+        if len(text) <= 5:
+            hour, minute = text.split(":")
+            return original.replace(hour=int(hour), minute=int(minute), second=0, microsecond=0)
+        moment = datetime.fromisoformat(text)
+    except ValueError:
+        raise PlanningPatchError(f"Horaire invalide: {value}")
+    return moment if moment.tzinfo or original.tzinfo is None else moment.replace(tzinfo=original.tzinfo)
+
+
+def applyPlanningPatch(planningData: Dict[str, Any],
+                       modifications: List[Dict[str, Any]],
+                       locked: Collection[str] = ()) -> Tuple[Dict[str, Any], int]:
+    """
+    Applique les modifications à une copie de planning_data
+
+    Args:
+        planningData: planning_data du planning précédent (non modifié)
+        modifications: [{"match_id": ..., "terrain"?, "debut_horaire"?, "fin_horaire"?,
+                         "equipe_a"?, "equipe_b"?}]
+        locked: match_id non modifiables (matchs commencés, joués ou annulés)
+
+    Returns:
+        (planning_data modifié, nombre de matchs modifiés)
+
+    Raises:
+        PlanningPatchError: match inconnu ou verrouillé, champ hors PATCH_FIELDS ou fin avant début
+    """
+    patched = orjson.loads(orjson.dumps(planningData))
+    matches = {match.get("match_id"): match for match in _matchDicts(patched)}
+    changed = set()
+    for modification in modifications:
+        if not isinstance(modification, dict):
+            raise PlanningPatchError(f"Modification invalide: {modification}")
+        matchId = modification.get("match_id")
+        match = matches.get(matchId)
+        if match is None:
+            raise PlanningPatchError(f"Match inconnu: {matchId}")
+        if matchId in locked:
+            raise PlanningPatchError(f"Match deja joue ou annule: {matchId}")
+        unknown = set(modification) - set(PATCH_FIELDS) - {"match_id"}
+        if unknown:
+            raise PlanningPatchError(f"Champs non modifiables pour {matchId}: {', '.join(sorted(unknown))}")
+
+        start = datetime.fromisoformat(str(match["debut_horaire"]))
+        end = datetime.fromisoformat(str(match["fin_horaire"]))
+        if "debut_horaire" in modification:
+            newStart = _patchTime(modification["debut_horaire"], start)
+            # sans fin explicite, le match garde sa durée
+            end = newStart + (end - start) if "fin_horaire" not in modification else end
+            start = newStart
+        if "fin_horaire" in modification:
+            end = _patchTime(modification["fin_horaire"], end)
+        if end <= start:
+            raise PlanningPatchError(f"Fin avant le début pour {matchId}")
+        if "terrain" in modification:
+            try:
+                match["terrain"] = int(modification["terrain"])
+            except (TypeError, ValueError):
+                raise PlanningPatchError(f"Terrain invalide pour {matchId}: {modification['terrain']}")
+
+        match["debut_horaire"] = start.isoformat()
+        match["fin_horaire"] = end.isoformat()
+        for field in ("equipe_a", "equipe_b"):
+            if field in modification:
+                match[field] = str(modification[field])
+        changed.add(matchId)
+    return patched, len(changed)
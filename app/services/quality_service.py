@@ -0,0 +1,316 @@
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+from starlette.concurrency import run_in_threadpool
+
+from app.core.process_pool import processPool
+from app.core.scheduling import SchedulingRules
+from app.core.tracing import traced
+from app.models.models import (
+    INACTIVE_STATUSES, MATCH_PREFIXES, RANK_LABELS, AIGeneratedMatch, AIPlanningData, Tournament, placeholderKeys
+)
+from app.services.database_service import databaseService
+from app.services.schedule_index_service import scheduleIndexService
+from app.services.tournament_service import tournamentService
+
+MINUTES_PER_DAY = 24 * 60
+
+# (match_id, poule_id, équipe A, équipe B, terrain, début, fin)
+MatchTuple = Tuple[str, Optional[str], str, str, int, datetime, datetime]
+
+
+def planningTuples(data: AIPlanningData) -> List[MatchTuple]:
+    """Tous les matchs d'un AIPlanningData, à plat"""
+    matches = [(match, None) for match in data.matchs_round_robin]
+    for poule in data.poules:
+        matches.extend((match, poule.poule_id) for match in poule.matchs)
+    phase = data.phase_elimination_apres_poules
+    if phase:
+        matches.extend((match, None) for match in phase.quarts + phase.demi_finales)
+        matches.extend((match, None) for match in (phase.match_troisieme_place, phase.finale) if match)
+    for roundMatches in data.elimination_rounds().values():
+        matches.extend((match, None) for match in roundMatches)
+    return [
+        (match.match_id, pouleId, match.equipe_a, match.equipe_b, match.terrain, match.debut_horaire, match.fin_horaire)
+        for match, pouleId in matches
+    ]
+
+
+def matchTuples(matches: Iterable[AIGeneratedMatch]) -> List[MatchTuple]:
+    """Lignes ai_generated_match actives, équipes résolues quand elles sont connues"""
+    return [
+        (match.match_id_ai, match.poule_id,
+         match.resolved_equipe_a_id or match.equipe_a, match.resolved_equipe_b_id or match.equipe_b,
+         match.terrain, match.debut_horaire, match.fin_horaire)
+        for match in matches
+        if match.status not in INACTIVE_STATUSES
+    ]
+
+
+class ScheduleArrays:
+    """
+    Matchs d'un planning en tableaux NumPy
+
+    Horaires en minutes depuis minuit du premier jour, équipes et poules en
+    indices. Les placeholders (winner_x, 1er_poule_a...) sont des équipes dont
+    on connaît le match ou la poule qui les détermine.
+    """
+
+    def __init__(self, matches: Sequence[MatchTuple]):
+        self.matchIds = [match[0] for match in matches]
+        self.teams: Dict[str, int] = {}
+        poules: Dict[str, int] = {}
+        producers: Dict[str, int] = {}
+        count = len(matches)
+        self.court = np.empty(count, dtype=np.int32)
+        self.start = np.empty(count, dtype=np.float64)
+        self.end = np.empty(count, dtype=np.float64)
+        self.teamA = np.empty(count, dtype=np.int32)
+        self.teamB = np.empty(count, dtype=np.int32)
+        self.poule = np.full(count, -1, dtype=np.int32)
+
+        origin = min((match[5] for match in matches), default=None)
+        if origin is not None:
+            origin = origin.replace(hour=0, minute=0, second=0, microsecond=0)
+        for row, (matchId, pouleId, teamA, teamB, court, start, end) in enumerate(matches):
+            producers.update((key, row) for key in placeholderKeys(matchId))
+            self.court[row] = court
+            self.start[row] = (start - origin).total_seconds() / 60
+            self.end[row] = (end - origin).total_seconds() / 60
+            self.teamA[row] = self.teams.setdefault(teamA, len(self.teams))
+            self.teamB[row] = self.teams.setdefault(teamB, len(self.teams))
+            if pouleId:
+                self.poule[row] = poules.setdefault(pouleId, len(poules))
+        self.pouleCount = len(poules)
+
+        # Match (ou poule) qui détermine chaque placeholder, -1 pour une vraie équipe
+        self.producerRow = np.full(len(self.teams), -1, dtype=np.int32)
+        self.producerPoule = np.full(len(self.teams), -1, dtype=np.int32)
+        for team, index in self.teams.items():
+            if team.startswith(MATCH_PREFIXES):
+                self.producerRow[index] = producers.get(team, -1)
+            else:
+                label, _, pouleId = team.partition("_")
+                if label in RANK_LABELS:
+                    self.producerPoule[index] = poules.get(pouleId, -1)
+
+    def __len__(self) -> int:
+        return len(self.start)
+
+    @classmethod
+    def fromPlanningData(cls, data: AIPlanningData) -> "ScheduleArrays":
+        return cls(planningTuples(data))
+
+    @classmethod
+    def fromMatches(cls, matches: Iterable[AIGeneratedMatch]) -> "ScheduleArrays":
+        return cls(matchTuples(matches))
+
+
+def _stats(values: np.ndarray) -> Dict[str, float]:
+    if not values.size:
+        return {"min": 0.0, "mean": 0.0, "p50": 0.0, "p90": 0.0, "max": 0.0}
+    p50, p90 = np.percentile(values, (50, 90))
+    return {
+        "min": round(float(values.min()), 1),
+        "mean": round(float(values.mean()), 1),
+        "p50": round(float(p50), 1),
+        "p90": round(float(p90), 1),
+        "max": round(float(values.max()), 1),
+    }
+
+
+def _readyAt(arrays: ScheduleArrays, gap: float) -> np.ndarray:
+    """Placeholders : pas avant la fin (+ pause) du match ou de la poule qui les détermine"""
+    readyAt = np.full(len(arrays.teams), -np.inf)
+    fromMatch = arrays.producerRow >= 0
+    readyAt[fromMatch] = arrays.end[arrays.producerRow[fromMatch]] + gap
+    if arrays.pouleCount:
+        pouleEnd = np.full(arrays.pouleCount, -np.inf)
+        inPoule = arrays.poule >= 0
+        np.maximum.at(pouleEnd, arrays.poule[inPoule], arrays.end[inPoule])
+        fromPoule = arrays.producerPoule >= 0
+        readyAt[fromPoule] = pouleEnd[arrays.producerPoule[fromPoule]] + gap
+    return readyAt
+
+
+def _duringLunch(arrays: ScheduleArrays, rules: SchedulingRules) -> np.ndarray:
+    """Matchs qui chevauchent la pause déjeuner"""
+    if rules.lunchStart is None or rules.lunchEnd is None:
+        return np.zeros(len(arrays), dtype=bool)
+    lunchStart = rules.lunchStart.hour * 60 + rules.lunchStart.minute
+    lunchEnd = rules.lunchEnd.hour * 60 + rules.lunchEnd.minute
+    minuteOfDay = arrays.start % MINUTES_PER_DAY
+    return (minuteOfDay < lunchEnd) & (minuteOfDay + arrays.end - arrays.start > lunchStart)
+
+
+def scoreSchedule(arrays: ScheduleArrays,
+                  rules: SchedulingRules,
+                  courts: Optional[int] = None,
+                  teams: Sequence[str] = ()) -> Dict[str, Any]:
+    """
+    Indicateurs de qualité d'un planning, calculés sans boucle Python par match
+
+    Args:
+        arrays: matchs du planning
+        rules: règles horaires (pause, déjeuner)
+        courts: terrains disponibles (par défaut, terrains utilisés)
+        teams: équipes attendues, pour compter celles absentes du planning
+
+    Returns:
+        dict: feasible, conflits (terrain, équipe, placeholder joué trop tôt),
+        lunch_violations, missing_teams, span_minutes, court_utilization,
+        idle_minutes (terrains), team_idle_minutes et rest_minutes (attente
+        entre deux matchs d'une équipe)
+    """
+    missing = sum(1 for team in teams if team not in arrays.teams)
+    if not len(arrays):
+        return {"feasible": False, "matches": 0, "conflicts": 0, "court_conflicts": 0, "team_conflicts": 0,
+                "placeholder_conflicts": 0, "lunch_violations": 0, "missing_teams": missing,
+                "span_minutes": 0.0, "courts": courts or 0, "court_utilization": 0.0, "idle_minutes": 0.0,
+                "team_idle_minutes": _stats(np.empty(0)), "rest_minutes": _stats(np.empty(0))}
+
+    gap = rules.breakDuration.total_seconds() / 60
+    start, end, court = arrays.start, arrays.end, arrays.court
+    duration = end - start
+    span = float(end.max() - start.min())
+
+    # Terrains : occupation, puis match suivant du même terrain trop tôt
+    courtIds = np.unique(court)
+    courtCount = max(courts or 0, len(courtIds))
+    busy = float(duration.sum())
+    order = np.lexsort((start, court))
+    sortedCourt, sortedStart, sortedEnd = court[order], start[order], end[order]
+    courtConflicts = int(np.count_nonzero(
+        (sortedCourt[1:] == sortedCourt[:-1]) & (sortedStart[1:] < sortedEnd[:-1] + gap)
+    ))
+
+    # Équipes : une entrée par (match, équipe), triée par équipe puis horaire
+    team = np.concatenate((arrays.teamA, arrays.teamB))
+    teamStart = np.concatenate((start, start))
+    teamEnd = np.concatenate((end, end))
+    order = np.lexsort((teamStart, team))
+    team, teamStart, teamEnd = team[order], teamStart[order], teamEnd[order]
+    sameTeam = team[1:] == team[:-1]
+    rests = (teamStart[1:] - teamEnd[:-1])[sameTeam]
+    teamConflicts = int(np.count_nonzero(rests < gap))
+    idleByTeam = np.bincount(team[1:][sameTeam], weights=rests, minlength=len(arrays.teams))
+    realTeams = (arrays.producerRow < 0) & (arrays.producerPoule < 0)
+
+    readyAt = _readyAt(arrays, gap)
+    placeholderConflicts = int(np.count_nonzero(start < readyAt[arrays.teamA])
+                               + np.count_nonzero(start < readyAt[arrays.teamB]))
+    lunchViolations = int(np.count_nonzero(_duringLunch(arrays, rules)))
+
+    conflicts = courtConflicts + teamConflicts + placeholderConflicts
+    return {
+        "feasible": conflicts == 0 and lunchViolations == 0 and missing == 0,
+        "matches": len(arrays),
+        "conflicts": conflicts,
+        "court_conflicts": courtConflicts,
+        "team_conflicts": teamConflicts,
+        "placeholder_conflicts": placeholderConflicts,
+        "lunch_violations": lunchViolations,
+        "missing_teams": missing,
+        "span_minutes": round(span, 1),
+        "courts": courtCount,
+        "court_utilization": round(busy / (span * courtCount), 4) if span else 0.0,
+        "idle_minutes": round(span * courtCount - busy, 1),
+        "team_idle_minutes": _stats(idleByTeam[realTeams]),
+        "rest_minutes": _stats(rests),
+    }
+
+
+def listViolations(arrays: ScheduleArrays, rules: SchedulingRules, limit: int = 50) -> List[str]:
+    """
+    Violations match par match (terrain, équipe, placeholder, déjeuner), lisibles
+
+    Mêmes règles que scoreSchedule ; au plus `limit` lignes.
+    """
+    if not len(arrays):
+        return []
+    gap = rules.breakDuration.total_seconds() / 60
+    ids = arrays.matchIds
+    teams = list(arrays.teams)
+    lines: List[str] = []
+
+    order = np.lexsort((arrays.start, arrays.court))
+    court, start, end = arrays.court[order], arrays.start[order], arrays.end[order]
+    for row in np.flatnonzero((court[1:] == court[:-1]) & (start[1:] < end[:-1] + gap)):
+        lines.append(f"terrain {court[row]} : {ids[order[row + 1]]} commence avant la fin (+ pause) de {ids[order[row]]}")
+
+    team = np.concatenate((arrays.teamA, arrays.teamB))
+    rows = np.concatenate((np.arange(len(arrays)), np.arange(len(arrays))))
+    order = np.lexsort((np.concatenate((arrays.start, arrays.start)), team))
+    team, rows = team[order], rows[order]
+    teamEnd = arrays.end[rows]
+    for entry in np.flatnonzero((team[1:] == team[:-1]) & (arrays.start[rows[1:]] < teamEnd[:-1] + gap)):
+        lines.append(f"{teams[team[entry]]} : {ids[rows[entry + 1]]} trop proche de {ids[rows[entry]]}")
+
+    readyAt = _readyAt(arrays, gap)
+    for side in (arrays.teamA, arrays.teamB):
+        for row in np.flatnonzero(arrays.start < readyAt[side]):
+            lines.append(f"{ids[row]} : {teams[side[row]]} n'est pas encore connu au début du match")
+
+    for row in np.flatnonzero(_duringLunch(arrays, rules)):
+        lines.append(f"{ids[row]} : pendant la pause déjeuner")
+    return lines[:limit]
+
+
+def scoreMatchesJob(tournamentJson: bytes, matches: List[MatchTuple]) -> Dict[str, Any]:
+    """Job du pool de processus : score d'un planning enregistré (matchs à plat, voir matchTuples)"""
+    tournament = Tournament.model_validate_json(tournamentJson)
+    return scoreSchedule(
+        ScheduleArrays(matches),
+        SchedulingRules.fromTournament(tournament),
+        courts=tournament.courts_available
+    )
+
+
+class QualityService():
+    """
+    Qualité d'un planning enregistré, calculée sur les matchs de l'index en mémoire
+
+    Lectures dans le pool de threads, calcul NumPy dans le pool de processus :
+    la boucle d'événements ne fait qu'attendre.
+    """
+
+    def __init__(self):
+        self.databaseService = databaseService
+        self.tournamentService = tournamentService
+        self.scheduleIndexService = scheduleIndexService
+        self.processPool = processPool
+
+    def _load(self, planningId: str) -> Optional[Tuple[Tournament, List[MatchTuple]]]:
+        """Tournoi du planning et ses matchs actifs, à plat"""
+        planning = self.databaseService.getPlanningWithDetailsByPlanningId(planningId)
+        if not planning:
+            return None
+        tournament = self.tournamentService.getTournamentById(planning.tournament_id)
+        index = self.scheduleIndexService.getIndex(planningId)
+        if not tournament or index is None:
+            return None
+        return tournament, matchTuples(index.matches.values())
+
+    @traced("qualityService.getQuality")
+    async def getQuality(self, planningId: str) -> Optional[Dict[str, Any]]:
+        """
+        Indicateurs de qualité d'un planning
+
+        Returns:
+            dict: voir scoreSchedule, ou None si planning introuvable/erreur
+
+        Raises:
+            TimeoutError: calcul au-delà de PROCESS_POOL_JOB_TIMEOUT_SECONDS
+        """
+        loaded = await run_in_threadpool(self._load, planningId)
+        if loaded is None:
+            return None
+        tournament, matches = loaded
+        return await self.processPool.runAsync(
+            "quality", scoreMatchesJob, tournament.model_dump_json().encode(), matches
+        )
+
+
+# Instance globale
+qualityService = QualityService()
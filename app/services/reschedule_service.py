@@ -0,0 +1,202 @@
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from app.core.scheduling import SchedulingRules
+from app.core.tracing import traced
+from app.models.models import INACTIVE_STATUSES, AIGeneratedMatch, placeholderKeys, teamKey
+from app.services.database_service import databaseService
+from app.services.tournament_service import tournamentService
+from app.services.schedule_index_service import scheduleIndexService
+
+# Matchs qui ne bougent plus (ils occupent toujours leur terrain et leurs équipes)
+FIXED_STATUSES = {"in_progress", "completed"}
+
+
+def teamKeys(match: AIGeneratedMatch) -> Set[str]:
+    """Équipes d'un match : noms bruts (placeholders compris) et équipes résolues"""
+    keys = {match.equipe_a, match.equipe_b, match.resolved_equipe_a_id, match.resolved_equipe_b_id}
+    keys.discard(None)
+    return keys
+
+
+def producedKeys(match: AIGeneratedMatch) -> Set[str]:
+    """Placeholders qui dépendent de la fin de ce match (winner_x, 1er_poule_a...)"""
+    return set(placeholderKeys(match.match_id_ai, match.poule_id))
+
+
+def propagateSchedule(matches: Iterable[AIGeneratedMatch],
+                      rules: SchedulingRules,
+                      moved: Optional[Dict[str, Tuple[datetime, datetime]]] = None,
+                      cancelled: Optional[Set[str]] = None,
+                      compact: bool = False,
+                      notBefore: Optional[datetime] = None,
+                      touchedTeams: Optional[Set[str]] = None) -> List[AIGeneratedMatch]:
+    """
+    Recalcule les horaires en aval d'un changement, sans appel à l'IA
+
+    Les matchs sont parcourus dans l'ordre chronologique initial. Seuls ceux dont
+    le terrain ou une équipe a été touché par un changement sont recalculés :
+    ils démarrent au plus tôt après la pause du terrain, de leurs équipes et des
+    matchs dont ils attendent le résultat, hors pause déjeuner.
+
+    Args:
+        matches: tous les matchs du planning
+        rules: règles horaires du tournoi
+        moved: id -> (début, fin) imposés (match retardé)
+        cancelled: ids des matchs à passer en forfait
+        compact: autorise les matchs touchés à avancer dans les créneaux libérés
+        notBefore: horaire minimum des matchs avancés (mode compact)
+        touchedTeams: équipes/placeholders à considérer comme touchés dès le départ
+
+    Returns:
+        List[AIGeneratedMatch]: copies des matchs modifiés uniquement
+    """
+    moved = moved or {}
+    cancelled = cancelled or set()
+    courtFree: Dict[int, datetime] = {}
+    teamFree: Dict[str, datetime] = {}
+    dirtyCourts: Set[int] = set()
+    dirtyTeams: Set[str] = set(touchedTeams or ())
+    changed: List[AIGeneratedMatch] = []
+
+    for match in sorted(matches, key=lambda m: (m.debut_horaire, m.id or "")):
+        keys = teamKeys(match)
+
+        if match.id in cancelled:
+            if match.status not in INACTIVE_STATUSES:
+                changed.append(match.model_copy(update={"status": "forfeit"}))
+            # Le créneau libéré rend le terrain et les équipes "touchés"
+            dirtyCourts.add(match.terrain)
+            dirtyTeams.update(keys)
+            continue
+        if match.status in INACTIVE_STATUSES:
+            continue
+
+        start, end = moved.get(match.id, (match.debut_horaire, match.fin_horaire))
+        affected = match.id in moved or match.terrain in dirtyCourts or not keys.isdisjoint(dirtyTeams)
+
+        if affected and match.status not in FIXED_STATUSES:
+            duration = end - start
+            floor = notBefore if compact and match.id not in moved and notBefore else start
+            candidates = [floor, courtFree.get(match.terrain)] + [teamFree.get(key) for key in keys]
+            start = rules.earliestStart(max(c for c in candidates if c is not None), duration)
+            end = start + duration
+
+        if (start, end) != (match.debut_horaire, match.fin_horaire):
+            changed.append(match.model_copy(update={"debut_horaire": start, "fin_horaire": end}))
+            dirtyCourts.add(match.terrain)
+            dirtyTeams.update(keys)
+            dirtyTeams.update(producedKeys(match))
+
+        available = rules.nextAvailable(end)
+        courtFree[match.terrain] = max(available, courtFree.get(match.terrain, available))
+        for key in keys | producedKeys(match):
+            teamFree[key] = max(available, teamFree.get(key, available))
+
+    return changed
+
+
+class RescheduleService():
+    """Replanification incrémentale le jour du tournoi (retards, forfaits)"""
+
+    def __init__(self):
+        self.databaseService = databaseService
+        self.tournamentService = tournamentService
+        self.scheduleIndexService = scheduleIndexService
+
+    @traced("rescheduleService.delayMatch")
+    def delayMatch(self, planningId: str, matchId: str, delayMinutes: int) -> Optional[List[AIGeneratedMatch]]:
+        """
+        Retarde un match et décale les matchs en aval sur ses terrains/équipes
+
+        Un match non commencé est décalé en entier, un match en cours voit
+        seulement sa fin repoussée.
+
+        Args:
+            planningId: ID du planning
+            matchId: ID du match (ai_generated_match.id)
+            delayMinutes: retard en minutes
+
+        Returns:
+            List[AIGeneratedMatch]: matchs modifiés ou None si match introuvable/erreur
+        """
+        loaded = self._load(planningId)
+        if loaded is None:
+            return None
+        matches, rules = loaded
+
+        target = next((match for match in matches if match.id == matchId), None)
+        if target is None or target.status in INACTIVE_STATUSES or target.status == "completed":
+            print(f"Match {matchId} introuvable ou deja termine")
+            return None
+
+        delay = timedelta(minutes=delayMinutes)
+        start = target.debut_horaire if target.status == "in_progress" else target.debut_horaire + delay
+        changed = propagateSchedule(matches, rules, moved={matchId: (start, target.fin_horaire + delay)})
+        return self._save(planningId, matches, changed)
+
+    @traced("rescheduleService.withdrawTeam")
+    def withdrawTeam(self, planningId: str, team: str, compact: bool = False) -> Optional[List[AIGeneratedMatch]]:
+        """
+        Retire une équipe : ses matchs restants passent en forfait
+
+        Args:
+            planningId: ID du planning
+            team: nom de l'équipe
+            compact: avance les matchs touchés dans les créneaux libérés
+
+        Returns:
+            List[AIGeneratedMatch]: matchs modifiés ou None si équipe introuvable/erreur
+        """
+        loaded = self._load(planningId)
+        if loaded is None:
+            return None
+        matches, rules = loaded
+
+        key = teamKey(team)
+        doomed = [
+            match for match in matches
+            if key in {teamKey(name) for name in teamKeys(match)}
+            and match.status not in FIXED_STATUSES | INACTIVE_STATUSES
+        ]
+        if not doomed:
+            print(f"Aucun match a venir pour l'equipe {team}")
+            return None
+
+        changed = propagateSchedule(
+            matches,
+            rules,
+            cancelled={match.id for match in doomed},
+            compact=compact,
+            notBefore=min(match.debut_horaire for match in doomed)
+        )
+        return self._save(planningId, matches, changed)
+
+    def _load(self, planningId: str) -> Optional[Tuple[List[AIGeneratedMatch], SchedulingRules]]:
+        """Matchs du planning et règles horaires de son tournoi"""
+        planning = self.databaseService.getPlanningWithDetailsByPlanningId(planningId)
+        if not planning:
+            return None
+        tournament = self.tournamentService.getTournamentById(planning.tournament_id)
+        if not tournament:
+            return None
+        matches = self.databaseService.getAllMatches(planningId)
+        if matches is None:
+            return None
+        return matches, SchedulingRules.fromTournament(tournament)
+
+    def _save(self,
+              planningId: str,
+              matches: List[AIGeneratedMatch],
+              changed: List[AIGeneratedMatch]) -> Optional[List[AIGeneratedMatch]]:
+        """Écrit uniquement les lignes modifiées et met à jour l'index du planning"""
+        if changed:
+            if self.databaseService.upsertMatches(changed) is None:
+                return None
+            updates = {match.id: match for match in changed}
+            self.scheduleIndexService.buildIndex(planningId, [updates.get(match.id, match) for match in matches])
+        print(f"Replanification {planningId} : {len(changed)} match(s) modifie(s)")
+        return changed
+
+
+# Instance globale
+rescheduleService = RescheduleService()
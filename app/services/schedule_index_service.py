@@ -0,0 +1,189 @@
+import threading
+import time
+from bisect import bisect_left
+from collections import OrderedDict
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+from app.core.config import settings
+from app.core.metrics import cacheHitsTotal, cacheMissesTotal
+from app.models.models import AIGeneratedMatch, teamKey
+from app.services.database_service import databaseService
+
+MAX_CACHED_INDEXES = 128
+
+
+def _timeKey(value: datetime) -> datetime:
+    """Horaire comparable : les datetimes avec fuseau sont ramenés en UTC naïf"""
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _matchKey(match: AIGeneratedMatch) -> Tuple[datetime, str]:
+    return _timeKey(match.debut_horaire), match.id or ""
+
+
+def _indexedTeams(match: AIGeneratedMatch) -> set:
+    """Noms bruts et équipes résolues des placeholders"""
+    teams = {match.equipe_a, match.equipe_b, match.resolved_equipe_a_id, match.resolved_equipe_b_id}
+    return {teamKey(team) for team in teams if team}
+
+
+class _SortedMatches:
+    """Matchs triés par horaire, avec les clés de tri à part pour bisect"""
+
+    __slots__ = ("starts", "matches")
+
+    def __init__(self):
+        self.starts: List[Tuple[datetime, str]] = []
+        self.matches: List[AIGeneratedMatch] = []
+
+    def after(self, start: Optional[datetime], limit: int) -> List[AIGeneratedMatch]:
+        index = bisect_left(self.starts, (_timeKey(start), "")) if start else 0
+        return self.matches[index:index + limit]
+
+    def insert(self, match: AIGeneratedMatch) -> None:
+        key = _matchKey(match)
+        index = bisect_left(self.starts, key)
+        self.starts.insert(index, key)
+        self.matches.insert(index, match)
+
+    def remove(self, match: AIGeneratedMatch) -> None:
+        index = bisect_left(self.starts, _matchKey(match))
+        if index < len(self.starts) and self.starts[index] == _matchKey(match):
+            del self.starts[index]
+            del self.matches[index]
+
+    def replace(self, match: AIGeneratedMatch) -> None:
+        index = bisect_left(self.starts, _matchKey(match))
+        if index < len(self.starts) and self.starts[index] == _matchKey(match):
+            self.matches[index] = match
+
+
+class ScheduleIndex:
+    """
+    Index d'un planning : équipe -> matchs et terrain -> matchs, triés par horaire
+
+    Construit une fois en O(n log n), chaque lecture "prochains matchs" est
+    ensuite un bisect en O(log n).
+    """
+
+    def __init__(self, planningId: str, matches: List[AIGeneratedMatch]):
+        self.planningId = planningId
+        self.builtAt = time.monotonic()
+        self.matches: Dict[str, AIGeneratedMatch] = {match.id: match for match in matches if match.id}
+        self.byTeam: Dict[str, _SortedMatches] = {}
+        self.byCourt: Dict[int, _SortedMatches] = {}
+
+        for match in sorted(matches, key=_matchKey):
+            key = _matchKey(match)
+            for team in _indexedTeams(match):
+                bucket = self.byTeam.setdefault(team, _SortedMatches())
+                bucket.starts.append(key)
+                bucket.matches.append(match)
+            bucket = self.byCourt.setdefault(match.terrain, _SortedMatches())
+            bucket.starts.append(key)
+            bucket.matches.append(match)
+
+    def replace(self, match: AIGeneratedMatch) -> None:
+        """Remplace un match dont l'horaire n'a pas changé (résultat, équipe résolue)"""
+        previous = self.matches.get(match.id)
+        if previous is None:
+            return
+        self.matches[match.id] = match
+        oldTeams, newTeams = _indexedTeams(previous), _indexedTeams(match)
+        for team in oldTeams - newTeams:
+            self.byTeam[team].remove(previous)
+        for team in newTeams - oldTeams:
+            self.byTeam.setdefault(team, _SortedMatches()).insert(match)
+        for team in oldTeams & newTeams:
+            self.byTeam[team].replace(match)
+        self.byCourt[match.terrain].replace(match)
+
+    def nextForTeam(self, team: str, after: Optional[datetime] = None, limit: int = 5) -> List[AIGeneratedMatch]:
+        bucket = self.byTeam.get(teamKey(team))
+        return bucket.after(after, limit) if bucket else []
+
+    def nextForCourt(self, terrain: int, after: Optional[datetime] = None, limit: int = 5) -> List[AIGeneratedMatch]:
+        bucket = self.byCourt.get(terrain)
+        return bucket.after(after, limit) if bucket else []
+
+
+class ScheduleIndexService:
+    """
+    Cache des index par planning
+
+    Construit à la sauvegarde ou au premier chargement, invalidé quand les
+    matchs du planning changent. Le TTL borne le décalage entre workers uvicorn,
+    qui ont chacun leur cache.
+    """
+
+    def __init__(self, maxEntries: int = MAX_CACHED_INDEXES):
+        self.maxEntries = maxEntries
+        self.ttlSeconds = settings.SCHEDULE_INDEX_TTL_SECONDS
+        self.databaseService = databaseService
+        self._indexes: "OrderedDict[str, ScheduleIndex]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def buildIndex(self, planningId: str, matches: List[AIGeneratedMatch]) -> ScheduleIndex:
+        """Construit et met en cache l'index d'un planning"""
+        index = ScheduleIndex(planningId, matches)
+        with self._lock:
+            self._indexes[planningId] = index
+            self._indexes.move_to_end(planningId)
+            while len(self._indexes) > self.maxEntries:
+                self._indexes.popitem(last=False)
+        return index
+
+    def getIndex(self, planningId: str) -> Optional[ScheduleIndex]:
+        """
+        Récupère l'index d'un planning, le charge depuis la DB si besoin
+
+        Returns:
+            ScheduleIndex ou None si les matchs n'ont pas pu être chargés
+        """
+        with self._lock:
+            index = self._indexes.get(planningId)
+            if index and time.monotonic() - index.builtAt < self.ttlSeconds:
+                self._indexes.move_to_end(planningId)
+                cacheHitsTotal.inc(cache="schedule_index")
+                return index
+
+        cacheMissesTotal.inc(cache="schedule_index")
+        matches = self.databaseService.getAllMatches(planningId)
+        if matches is None:
+            return None
+        return self.buildIndex(planningId, matches)
+
+    def applyUpdates(self, planningId: str, changed: List[AIGeneratedMatch]) -> None:
+        """
+        Reporte des matchs modifiés dans l'index en cache
+
+        Sans changement d'horaire ni de terrain, les matchs sont remplacés sur
+        place (O(log n) chacun), sinon l'index est reconstruit.
+        """
+        with self._lock:
+            index = self._indexes.get(planningId)
+            if index is None:
+                return
+            inPlace = all(
+                match.id in index.matches
+                and _matchKey(index.matches[match.id]) == _matchKey(match)
+                and index.matches[match.id].terrain == match.terrain
+                for match in changed
+            )
+            if inPlace:
+                for match in changed:
+                    index.replace(match)
+                return
+
+        updates = {match.id: match for match in changed}
+        self.buildIndex(planningId, [updates.get(match.id, match) for match in index.matches.values()])
+
+    def invalidate(self, planningId: str) -> None:
+        with self._lock:
+            self._indexes.pop(planningId, None)
+
+
+# Instance globale
+scheduleIndexService = ScheduleIndexService()
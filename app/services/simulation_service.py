@@ -0,0 +1,117 @@
+import asyncio
+import itertools
+from datetime import date, datetime
+from typing import Any, Dict, List
+from app.core.config import settings
+from app.core.process_pool import processPool
+from app.core.scheduling import SchedulingRules
+from app.models.models import Tournament
+from app.services.feasibility_service import feasibilityService, formatShape
+from app.services.local_scheduler_service import localSchedulerService
+from app.services.quality_service import ScheduleArrays, planningTuples, scoreSchedule
+
+MAX_SCENARIOS = 256
+# Champs de la configuration que la grille peut faire varier
+GRID_FIELDS = ("tournament_type", "courts_available", "match_duration_minutes", "break_duration_minutes")
+
+
+def simulateScenario(scenario: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Planifie un scénario avec le moteur local et mesure le résultat
+
+    Exécuté dans un processus du pool : entrée et sortie sont des dict simples.
+    """
+    teamCount = scenario["teams"]
+    now = datetime.now()
+    tournament = Tournament.model_construct(
+        id="simulation", name="simulation", description=None,
+        tournament_type=scenario["tournament_type"],
+        max_teams=teamCount, registered_teams=teamCount,
+        courts_available=scenario["courts_available"],
+        start_date=scenario["start_date"], start_time=scenario["start_time"],
+        match_duration_minutes=scenario["match_duration_minutes"],
+        break_duration_minutes=scenario["break_duration_minutes"],
+        constraints=scenario["constraints"],
+        organizer_id="simulation", status="draft", created_at=now, updated_at=now
+    )
+    row = {field: scenario[field] for field in GRID_FIELDS}
+    teams = [f"Équipe {index + 1}" for index in range(teamCount)]
+    matches = planningTuples(localSchedulerService.generatePlanning(tournament, teams))
+    quality = scoreSchedule(ScheduleArrays(matches), SchedulingRules.fromTournament(tournament),
+                            courts=tournament.courts_available)
+    bound = feasibilityService.analyze(tournament, teamCount)
+    end = max((match[6] for match in matches), default=None)
+    row.update({
+        "matches": quality["matches"],
+        "end_time": end.isoformat() if end else None,
+        "fits_day": bool(end) and end.isoformat() <= bound["day_end"],
+        "span_minutes": quality["span_minutes"],
+        "court_utilization": quality["court_utilization"],
+        "team_idle_minutes": quality["team_idle_minutes"]["mean"],
+        "earliest_end_bound": bound["earliest_end"],
+        "min_courts": bound["min_courts"],
+    })
+    return row
+
+
+class SimulationService():
+    """
+    Simulation "what-if" de configurations de tournoi, sans IA ni écriture
+
+    Chaque combinaison de la grille est planifiée par le moteur local dans un
+    pool de processus : les scénarios tournent en parallèle sur tous les cœurs
+    sans bloquer la boucle d'événements.
+    """
+
+    def __init__(self):
+        self.processPool = processPool
+        self.maxMatches = settings.SIMULATION_MAX_MATCHES
+
+    def buildScenarios(self, config: Dict[str, Any], grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+        """
+        Produit cartésien de la grille appliqué à la configuration
+
+        Raises:
+            ValueError: plus de MAX_SCENARIOS combinaisons, ou un scénario au-delà
+            de SIMULATION_MAX_MATCHES matchs (refusé avant d'occuper le pool)
+        """
+        base = dict(config)
+        base["start_date"] = base.get("start_date") or date.today()
+        base["constraints"] = base.get("constraints") or {}
+        axes = [grid.get(field) or [base[field]] for field in GRID_FIELDS]
+        count = 1
+        for values in axes:
+            count *= len(values)
+        if count > MAX_SCENARIOS:
+            raise ValueError(f"Trop de scénarios ({count} > {MAX_SCENARIOS})")
+        scenarios = [{**base, **dict(zip(GRID_FIELDS, values))} for values in itertools.product(*axes)]
+        for scenario in scenarios:
+            shape = formatShape(scenario["tournament_type"], scenario["teams"])
+            if shape and shape[0] > self.maxMatches:
+                raise ValueError(
+                    f"Scénario trop grand ({scenario['tournament_type']}, {scenario['teams']} équipes : "
+                    f"{shape[0]} matchs > {self.maxMatches})"
+                )
+        return scenarios
+
+    async def simulate(self, config: Dict[str, Any], grid: Dict[str, List[Any]]) -> List[Dict[str, Any]]:
+        """
+        Évalue chaque scénario de la grille
+
+        Returns:
+            List[dict]: une ligne par scénario (fin, occupation des terrains,
+            borne inférieure et terrains nécessaires), dans l'ordre de la grille
+
+        Raises:
+            TimeoutError: un scénario a dépassé PROCESS_POOL_JOB_TIMEOUT_SECONDS
+        """
+        scenarios = self.buildScenarios(config, grid)
+        rows = await asyncio.gather(*(
+            self.processPool.runAsync("simulate", simulateScenario, scenario) for scenario in scenarios
+        ))
+        print(f"Simulation : {len(rows)} scenario(s)")
+        return list(rows)
+
+
+# Instance globale
+simulationService = SimulationService()
@@ -0,0 +1,233 @@
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+import orjson
+
+from app.core.metrics import cacheHitsTotal, cacheMissesTotal
+from app.models.models import INACTIVE_STATUSES, AIGeneratedMatch, AIGeneratedPoule
+from app.services.database_service import databaseService
+from app.services.schedule_index_service import ScheduleIndex, scheduleIndexService
+
+POINTS_WIN = 3
+POINTS_DRAW = 1
+POINTS_LOSS = 0
+MAX_CACHED_PLANNINGS = 128
+
+
+def _sides(match: AIGeneratedMatch) -> Optional[Tuple[str, str, int, int]]:
+    """(équipe A, équipe B, score A, score B) d'un match joué, None sinon"""
+    if match.status != "completed" or match.score_a is None or match.score_b is None:
+        return None
+    return (match.resolved_equipe_a_id or match.equipe_a,
+            match.resolved_equipe_b_id or match.equipe_b,
+            match.score_a,
+            match.score_b)
+
+
+def _points(scored: int, conceded: int) -> int:
+    if scored > conceded:
+        return POINTS_WIN
+    return POINTS_DRAW if scored == conceded else POINTS_LOSS
+
+
+class PouleStandings:
+    """
+    Classement d'une poule tenu à jour résultat par résultat
+
+    Chaque résultat ajuste les compteurs des deux équipes (une correction retire
+    d'abord l'ancien score). Le tri (points, ratio de sets, confrontations
+    directes) n'est refait qu'à la lecture suivante, puis mis en cache.
+    """
+
+    def __init__(self, pouleId: str, nomPoule: str, teams: Iterable[str], expectedMatches: int = 0):
+        self.pouleId = pouleId
+        self.nomPoule = nomPoule
+        self.expectedMatches = expectedMatches
+        self.rows: Dict[str, Dict[str, int]] = {team: self._emptyRow() for team in teams}
+        self.headToHead: Dict[Tuple[str, str], int] = {}
+        self._results: Dict[str, Tuple[str, str, int, int]] = {}
+        self._ranking: Optional[List[Dict[str, Any]]] = None
+        self._json: Optional[bytes] = None
+
+    @staticmethod
+    def _emptyRow() -> Dict[str, int]:
+        return {"matchs_joues": 0, "victoires": 0, "nuls": 0, "defaites": 0,
+                "points": 0, "sets_pour": 0, "sets_contre": 0}
+
+    def _account(self, result: Tuple[str, str, int, int], sign: int) -> None:
+        teamA, teamB, scoreA, scoreB = result
+        for team, opponent, scored, conceded in ((teamA, teamB, scoreA, scoreB), (teamB, teamA, scoreB, scoreA)):
+            row = self.rows.setdefault(team, self._emptyRow())
+            points = _points(scored, conceded)
+            row["matchs_joues"] += sign
+            row["victoires" if scored > conceded else "nuls" if scored == conceded else "defaites"] += sign
+            row["points"] += sign * points
+            row["sets_pour"] += sign * scored
+            row["sets_contre"] += sign * conceded
+            self.headToHead[(team, opponent)] = self.headToHead.get((team, opponent), 0) + sign * points
+
+    def apply(self, match: AIGeneratedMatch) -> bool:
+        """
+        Prend en compte l'état d'un match de la poule (score, correction, annulation)
+
+        Returns:
+            bool: True si le classement a changé
+        """
+        previous = self._results.get(match.id)
+        current = _sides(match)
+        if previous == current:
+            return False
+        if previous:
+            self._account(previous, -1)
+            del self._results[match.id]
+        if current:
+            self._account(current, 1)
+            self._results[match.id] = current
+        self._ranking = None
+        self._json = None
+        return True
+
+    def isComplete(self) -> bool:
+        return bool(self.expectedMatches) and len(self._results) >= self.expectedMatches
+
+    def _sortGroup(self, teams: List[str]) -> List[str]:
+        """Départage des équipes à égalité de points et de ratio : confrontations directes"""
+        if len(teams) == 1:
+            return teams
+        tied = set(teams)
+
+        def miniPoints(team: str) -> int:
+            return sum(self.headToHead.get((team, opponent), 0) for opponent in tied if opponent != team)
+
+        return sorted(teams, key=lambda team: (
+            -miniPoints(team),
+            -(self.rows[team]["sets_pour"] - self.rows[team]["sets_contre"]),
+            -self.rows[team]["sets_pour"],
+            team
+        ))
+
+    def ranking(self) -> List[Dict[str, Any]]:
+        """Lignes du classement, triées (calculées une fois par changement)"""
+        if self._ranking is None:
+            def primary(team: str) -> Tuple[int, float]:
+                row = self.rows[team]
+                ratio = row["sets_pour"] / row["sets_contre"] if row["sets_contre"] else float("inf") if row["sets_pour"] else 0.0
+                return -row["points"], -ratio
+
+            ordered: List[str] = []
+            teams = sorted(self.rows, key=primary)
+            start = 0
+            for end in range(1, len(teams) + 1):
+                if end == len(teams) or primary(teams[end]) != primary(teams[start]):
+                    ordered.extend(self._sortGroup(teams[start:end]))
+                    start = end
+
+            self._ranking = []
+            for position, team in enumerate(ordered, start=1):
+                row = self.rows[team]
+                self._ranking.append({
+                    "position": position,
+                    "equipe": team,
+                    **row,
+                    "ratio_sets": round(row["sets_pour"] / row["sets_contre"], 3) if row["sets_contre"] else None,
+                })
+        return self._ranking
+
+    def toJson(self) -> bytes:
+        """Classement sérialisé, mis en cache jusqu'au prochain résultat"""
+        if self._json is None:
+            self._json = orjson.dumps({
+                "poule_id": self.pouleId,
+                "nom_poule": self.nomPoule,
+                "complete": self.isComplete(),
+                "classement": self.ranking(),
+            })
+        return self._json
+
+
+def rankPoule(matches: Iterable[AIGeneratedMatch]) -> List[str]:
+    """Classement (noms d'équipes) d'une poule à partir de ses matchs"""
+    standings = PouleStandings("", "", [])
+    for match in matches:
+        standings.apply(match)
+    return [row["equipe"] for row in standings.ranking()]
+
+
+class StandingsService():
+    """Classements des poules par planning, construits une fois puis mis à jour à chaque résultat"""
+
+    def __init__(self, maxEntries: int = MAX_CACHED_PLANNINGS):
+        self.databaseService = databaseService
+        self.scheduleIndexService = scheduleIndexService
+        self.maxEntries = maxEntries
+        # planningId -> (index source, poule_id -> classement)
+        self._tables: "OrderedDict[str, Tuple[ScheduleIndex, Dict[str, PouleStandings]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def getStandingsJson(self, planningId: str, pouleId: str) -> Optional[bytes]:
+        """
+        Classement d'une poule, déjà sérialisé
+
+        Returns:
+            bytes: JSON du classement ou None si poule introuvable/erreur
+        """
+        index = self.scheduleIndexService.getIndex(planningId)
+        if index is None:
+            return None
+
+        with self._lock:
+            entry = self._tables.get(planningId)
+            # Index reconstruit (TTL, replanification) : on repart des matchs à jour
+            if entry and entry[0] is index:
+                self._tables.move_to_end(planningId)
+                cacheHitsTotal.inc(cache="standings")
+                standings = entry[1].get(pouleId)
+                return standings.toJson() if standings else None
+
+        cacheMissesTotal.inc(cache="standings")
+        poules = self.databaseService.getPoules(planningId)
+        if poules is None:
+            return None
+        tables = self._build(poules, index.matches.values())
+        with self._lock:
+            self._tables[planningId] = (index, tables)
+            self._tables.move_to_end(planningId)
+            while len(self._tables) > self.maxEntries:
+                self._tables.popitem(last=False)
+            standings = tables.get(pouleId)
+            return standings.toJson() if standings else None
+
+    @staticmethod
+    def _build(poules: List[AIGeneratedPoule], matches: Iterable[AIGeneratedMatch]) -> Dict[str, PouleStandings]:
+        tables = {
+            poule.poule_id: PouleStandings(poule.poule_id, poule.nom_poule, poule.equipes)
+            for poule in poules
+        }
+        for match in matches:
+            standings = tables.get(match.poule_id) if match.poule_id else None
+            if standings is None:
+                continue
+            if match.status not in INACTIVE_STATUSES:
+                standings.expectedMatches += 1
+            standings.apply(match)
+        return tables
+
+    def applyResults(self, planningId: str, matches: Iterable[AIGeneratedMatch]) -> None:
+        """Reporte des matchs modifiés dans les classements en cache (O(1) par match)"""
+        with self._lock:
+            entry = self._tables.get(planningId)
+            if entry is None:
+                return
+            for match in matches:
+                standings = entry[1].get(match.poule_id) if match.poule_id else None
+                if standings is not None:
+                    standings.apply(match)
+
+    def invalidate(self, planningId: str) -> None:
+        with self._lock:
+            self._tables.pop(planningId, None)
+
+
+# Instance globale
+standingsService = StandingsService()
@@ -1,6 +1,8 @@
 from typing import List, Optional, Dict, Any
 from app.core.database import getSupabase
+from pydantic import ValidationError
 from app.models.models import Tournament, Team
+from app.core.tracing import traced
 
 class TournamentService():
     """
@@ -63,14 +65,13 @@ class TournamentService():
                 .order("name")\
                 .execute()
             
+            # Lignes saisies par les organisateurs : validées, les équipes invalides sont ignorées
             teams = []
             for team_data in result.data or []:
                 try:
-                    team = Team(**team_data)
-                    teams.append(team)
-                except Exception as e:
+                    teams.append(Team.model_validate(team_data))
+                except ValidationError as e:
                     print(f"⚠️ Équipe invalide ignorée: {e}")
-                    continue
             
             print(f"✅ {len(teams)} équipes récupérées")
             return teams
@@ -79,6 +80,7 @@ class TournamentService():
             print(f"❌ Erreur récupération équipes: {e}")
             return []
 
+    @traced("tournamentService.getTournamentWithTeams")
     def getTournamentWithTeams(self, tournamentId: str) -> Optional[Dict[str, Any]]:
         """
         Récupère un tournoi avec ses équipes
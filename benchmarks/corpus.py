@@ -0,0 +1,246 @@
+"""
+Corpus synthétique de réponses de l'assistant
+
+Génère, pour chaque format supporté et de 4 à 512 équipes, un planning au
+format JSON attendu par AIPlanningData, puis le décline en variantes de
+réponse texte : brute, entourée d'un bloc ```json, tronquée et malformée.
+
+Usage:
+    python -m benchmarks.corpus --format poules_elimination --teams 64 --variant fenced
+"""
+import argparse
+import json
+import random
+import sys
+from datetime import datetime, time, timedelta
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+FORMATS = ("round_robin", "poules_elimination", "elimination_directe")
+VARIANTS = ("plain", "fenced", "truncated", "malformed")
+DEFAULT_SIZES = (4, 8, 16, 32, 64, 128, 256, 512)
+
+LUNCH_START = time(12, 0)
+LUNCH_END = time(13, 30)
+POULE_SIZE = 4
+
+ROUND_NAMES = {2: "finale", 4: "demi_finales", 8: "quarts", 16: "huitiemes", 32: "seiziemes"}
+
+
+class Slotter:
+    """Attribue des créneaux (terrain, début, fin) en évitant la pause déjeuner"""
+
+    def __init__(self, start: datetime, courts: int, matchMinutes: int, breakMinutes: int):
+        self.courts = courts
+        self.duration = timedelta(minutes=matchMinutes)
+        self.step = timedelta(minutes=matchMinutes + breakMinutes)
+        self.current = start
+        self.court = 0
+
+    def next(self) -> Tuple[int, datetime, datetime]:
+        self._skipLunch()
+        slot = (self.court + 1, self.current, self.current + self.duration)
+        self.court += 1
+        if self.court == self.courts:
+            self.barrier()
+        return slot
+
+    def barrier(self) -> None:
+        """Force le prochain match sur une nouvelle ligne de créneaux"""
+        if self.court:
+            self.court = 0
+            self.current += self.step
+
+    def _skipLunch(self) -> None:
+        lunchStart = datetime.combine(self.current.date(), LUNCH_START)
+        lunchEnd = datetime.combine(self.current.date(), LUNCH_END)
+        if self.court == 0 and self.current < lunchEnd and self.current + self.duration > lunchStart:
+            self.current = lunchEnd
+
+
+def _match(matchId: str, equipeA: str, equipeB: str, slot: Tuple[int, datetime, datetime], **extra: Any) -> Dict[str, Any]:
+    terrain, start, end = slot
+    return {
+        "match_id": matchId,
+        "equipe_a": equipeA,
+        "equipe_b": equipeB,
+        "debut_horaire": start.isoformat(),
+        "fin_horaire": end.isoformat(),
+        "terrain": terrain,
+        **extra,
+    }
+
+
+def roundRobinRounds(teams: List[str]) -> Iterator[List[Tuple[str, str]]]:
+    """Méthode du cercle : chaque équipe joue une fois par journée"""
+    players: List[Optional[str]] = list(teams)
+    if len(players) % 2:
+        players.append(None)
+    half = len(players) // 2
+    for _ in range(len(players) - 1):
+        pairs = [(players[i], players[-1 - i]) for i in range(half)]
+        yield [(a, b) for a, b in pairs if a is not None and b is not None]
+        players = [players[0], players[-1]] + players[1:-1]
+
+
+def pouleLabel(index: int) -> str:
+    """0 -> 'a', 25 -> 'z', 26 -> 'aa'"""
+    label = ""
+    index += 1
+    while index:
+        index, remainder = divmod(index - 1, 26)
+        label = chr(ord("a") + remainder) + label
+    return label
+
+
+def _bracketRounds(entrants: List[str], slotter: Slotter, prefix: str = "") -> Tuple[Dict[str, List[Dict[str, Any]]], List[str]]:
+    """Tableau à élimination directe (byes si le nombre n'est pas une puissance de 2)"""
+    size = 1
+    while size < len(entrants):
+        size *= 2
+    rounds: Dict[str, List[Dict[str, Any]]] = {}
+    current: List[Optional[str]] = list(entrants) + [None] * (size - len(entrants))
+    losers: List[str] = []
+    while len(current) > 1:
+        name = ROUND_NAMES.get(len(current), f"tour_{len(current)}")
+        matches, nextRound = [], []
+        for index in range(len(current) // 2):
+            a, b = current[index], current[len(current) - 1 - index]
+            if a is None or b is None:
+                nextRound.append(a or b)
+                continue
+            matchId = f"{prefix}{name}_{len(matches) + 1}"
+            matches.append(_match(matchId, a, b, slotter.next()))
+            nextRound.append(f"winner_{matchId}")
+            if len(current) == 4:
+                losers.append(f"loser_{matchId}")
+        slotter.barrier()
+        rounds[name] = matches
+        current = nextRound
+    return rounds, losers
+
+
+def generatePlanningData(teamsCount: int,
+                         tournamentType: str,
+                         courts: Optional[int] = None,
+                         teams: Optional[List[str]] = None,
+                         start: Optional[datetime] = None,
+                         matchMinutes: int = 15,
+                         breakMinutes: int = 5,
+                         seed: int = 0) -> Dict[str, Any]:
+    """Planning synthétique au format de la réponse de l'assistant"""
+    rng = random.Random(seed)
+    teams = list(teams) if teams else [f"Équipe {index + 1:03d}" for index in range(teamsCount)]
+    rng.shuffle(teams)
+    courts = courts or max(1, len(teams) // 4)
+    start = start or datetime(2025, 6, 14, 9, 0)
+    slotter = Slotter(start, courts, matchMinutes, breakMinutes)
+    data: Dict[str, Any] = {"type_tournoi": tournamentType}
+
+    if tournamentType == "round_robin":
+        matches = []
+        for journee, pairs in enumerate(roundRobinRounds(teams), start=1):
+            for a, b in pairs:
+                matches.append(_match(f"rr_m{len(matches) + 1}", a, b, slotter.next(), journee=journee))
+            slotter.barrier()
+        data["matchs_round_robin"] = matches
+
+    elif tournamentType == "poules_elimination":
+        poules = []
+        for index in range(0, len(teams), POULE_SIZE):
+            label = pouleLabel(index // POULE_SIZE)
+            members = teams[index:index + POULE_SIZE]
+            poules.append({"poule_id": f"poule_{label}", "nom_poule": f"Poule {label.upper()}", "equipes": members, "matchs": []})
+        # Les poules jouent en parallèle, journée par journée
+        schedules = [list(roundRobinRounds(poule["equipes"])) for poule in poules]
+        for journee in range(max(len(schedule) for schedule in schedules)):
+            for poule, schedule in zip(poules, schedules):
+                for a, b in schedule[journee] if journee < len(schedule) else []:
+                    matchId = f"{poule['poule_id']}_m{len(poule['matchs']) + 1}"
+                    poule["matchs"].append(_match(matchId, a, b, slotter.next()))
+            slotter.barrier()
+        data["poules"] = poules
+
+        qualifiers = [f"{rank}_{poule['poule_id']}" for poule in poules for rank in ("1er", "2e")][:8]
+        rounds, losers = _bracketRounds(qualifiers, slotter)
+        phase: Dict[str, Any] = {
+            "quarts": rounds.get("quarts", []),
+            "demi_finales": rounds.get("demi_finales", []),
+            "finale": (rounds.get("finale") or [None])[0],
+        }
+        if len(losers) == 2:
+            phase["match_troisieme_place"] = _match("petite_finale", losers[0], losers[1], slotter.next())
+        data["phase_elimination_apres_poules"] = phase
+
+    elif tournamentType == "elimination_directe":
+        rounds, _ = _bracketRounds(teams, slotter)
+        data["rounds_elimination"] = rounds
+
+    else:
+        raise ValueError(f"Format inconnu: {tournamentType}")
+
+    data["final_ranking"] = [{"position": 1, "equipe_id": "winner_finale_1"}]
+    data["commentaires"] = f"Planning synthétique {tournamentType} ({len(teams)} équipes, {courts} terrains)"
+    return data
+
+
+def renderResponse(planningData: Dict[str, Any], variant: str = "plain") -> str:
+    """Texte de réponse de l'assistant pour une variante donnée"""
+    text = json.dumps(planningData, ensure_ascii=False, indent=2)
+    if variant == "plain":
+        return text
+    if variant == "fenced":
+        return f"```json\n{text}\n```"
+    if variant == "truncated":
+        return text[: int(len(text) * 0.7)]
+    if variant == "malformed":
+        # Virgule finale et guillemets simples : erreurs typiques d'un LLM
+        return text[:-1].rstrip() + ",\n  'source': 'llm'\n}"
+    raise ValueError(f"Variante inconnue: {variant}")
+
+
+def generateResponse(teamsCount: int, tournamentType: str, variant: str = "plain", **kwargs: Any) -> str:
+    return renderResponse(generatePlanningData(teamsCount, tournamentType, **kwargs), variant)
+
+
+def iterCorpus(sizes=DEFAULT_SIZES, formats=FORMATS, variants=VARIANTS) -> Iterator[Tuple[str, int, str, str]]:
+    """Parcourt (format, nb équipes, variante, texte) pour toutes les combinaisons"""
+    for tournamentType in formats:
+        for size in sizes:
+            planningData = generatePlanningData(size, tournamentType)
+            for variant in variants:
+                yield tournamentType, size, variant, renderResponse(planningData, variant)
+
+
+def corpusResponder(variant: str = "plain"):
+    """Responder pour le faux serveur Assistants : planning du corpus pour les équipes du prompt"""
+    from benchmarks.fake_openai import parsePrompt
+
+    def respond(prompt: str) -> str:
+        config = parsePrompt(prompt)
+        planningData = generatePlanningData(
+            len(config["teams"]),
+            config["tournament_type"],
+            courts=config["courts"],
+            teams=config["teams"],
+            start=config["start"],
+            matchMinutes=config["match_minutes"],
+            breakMinutes=config["break_minutes"]
+        )
+        return renderResponse(planningData, variant)
+    return respond
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Génère une réponse synthétique de l'assistant")
+    parser.add_argument("--format", choices=FORMATS, default="round_robin")
+    parser.add_argument("--teams", type=int, default=8)
+    parser.add_argument("--courts", type=int)
+    parser.add_argument("--variant", choices=VARIANTS, default="plain")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args(argv)
+    sys.stdout.write(generateResponse(args.teams, args.format, args.variant, courts=args.courts, seed=args.seed) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
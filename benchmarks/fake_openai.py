@@ -0,0 +1,175 @@
+"""
+Faux serveur Assistants OpenAI pour les benchmarks
+
+Implémente threads, messages et runs (create/retrieve/cancel) avec une latence
+configurable par run ("queued" puis "in_progress" puis "completed"). La réponse
+de l'assistant est produite par un responder appelé avec le prompt reçu.
+Le client openai du service s'y connecte via OPENAI_BASE_URL.
+"""
+import json
+import random
+import re
+import threading
+import time
+import uuid
+from datetime import datetime
+from typing import Any, Callable, Dict
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+Responder = Callable[[str], str]
+
+
+def parsePrompt(prompt: str) -> Dict[str, Any]:
+    """Extrait la configuration du tournoi du prompt statique du service"""
+    def field(label: str, default: str = "") -> str:
+        match = re.search(rf"- {label}: (.*)", prompt)
+        return match.group(1).strip() if match else default
+
+    startTime = field("Heure de début", "09:00")[:5]
+    return {
+        "tournament_type": field("Type", "round_robin"),
+        "teams": [name.strip() for name in field("Équipes").split(",") if name.strip()],
+        "courts": int(field("Terrains disponibles", "1") or 1),
+        "start": datetime.fromisoformat(f"{field('Date de début', '2025-01-01')}T{startTime}"),
+        "match_minutes": int(field("Durée match", "15").split()[0]),
+        "break_minutes": int(field("Pause entre matchs", "5").split()[0]),
+    }
+
+
+class FakeAssistantsBackend:
+    """État des threads et runs du faux serveur"""
+
+    def __init__(self,
+                 responder: Responder,
+                 queuedSeconds: float = 0.1,
+                 runSeconds: float = 0.5,
+                 jitterSeconds: float = 0.0,
+                 failureRate: float = 0.0,
+                 seed: int = 0):
+        self.responder = responder
+        self.queuedSeconds = queuedSeconds
+        self.runSeconds = runSeconds
+        self.jitterSeconds = jitterSeconds
+        self.failureRate = failureRate
+        self.random = random.Random(seed)
+        self.threads: Dict[str, Dict[str, Any]] = {}
+        self.runs: Dict[str, Dict[str, Any]] = {}
+        self.lock = threading.Lock()
+
+    def createRun(self, threadId: str, assistantId: str) -> Dict[str, Any]:
+        with self.lock:
+            jitter = self.random.uniform(0, self.jitterSeconds) if self.jitterSeconds else 0.0
+            run = {
+                "id": f"run_{uuid.uuid4().hex}",
+                "thread_id": threadId,
+                "assistant_id": assistantId,
+                "created": time.monotonic(),
+                "duration": self.queuedSeconds + self.runSeconds + jitter,
+                "fails": self.random.random() < self.failureRate,
+                "cancelled": False,
+            }
+            self.runs[run["id"]] = run
+        return run
+
+    def runStatus(self, run: Dict[str, Any]) -> str:
+        if run["cancelled"]:
+            return "cancelled"
+        elapsed = time.monotonic() - run["created"]
+        if elapsed < self.queuedSeconds:
+            return "queued"
+        if elapsed < run["duration"]:
+            return "in_progress"
+        if run["fails"]:
+            return "failed"
+        thread = self.threads[run["thread_id"]]
+        if "answer" not in thread:
+            thread["answer"] = self.responder(thread["prompt"])
+        return "completed"
+
+
+def _runObject(run: Dict[str, Any], status: str) -> Dict[str, Any]:
+    return {
+        "id": run["id"],
+        "object": "thread.run",
+        "created_at": int(time.time()),
+        "thread_id": run["thread_id"],
+        "assistant_id": run["assistant_id"],
+        "status": status,
+        "instructions": "",
+        "model": "fake",
+        "tools": [],
+        "parallel_tool_calls": False,
+    }
+
+
+def _messageObject(threadId: str, role: str, text: str) -> Dict[str, Any]:
+    return {
+        "id": f"msg_{uuid.uuid4().hex}",
+        "object": "thread.message",
+        "created_at": int(time.time()),
+        "thread_id": threadId,
+        "role": role,
+        "status": "completed",
+        "content": [{"type": "text", "text": {"value": text, "annotations": []}}],
+        "attachments": [],
+        "metadata": {},
+    }
+
+
+def createFakeOpenAIApp(backend: FakeAssistantsBackend) -> Starlette:
+    """Application ASGI qui expose l'API Assistants sous /v1"""
+
+    async def createThread(request: Request) -> JSONResponse:
+        threadId = f"thread_{uuid.uuid4().hex}"
+        with backend.lock:
+            backend.threads[threadId] = {"prompt": ""}
+        return JSONResponse({"id": threadId, "object": "thread", "created_at": int(time.time()), "metadata": {}})
+
+    async def messages(request: Request) -> JSONResponse:
+        threadId = request.path_params["thread_id"]
+        thread = backend.threads.get(threadId)
+        if thread is None:
+            return JSONResponse({"error": {"message": "No thread found"}}, status_code=404)
+        if request.method == "POST":
+            body = await request.json()
+            content = body.get("content")
+            thread["prompt"] = content if isinstance(content, str) else json.dumps(content)
+            return JSONResponse(_messageObject(threadId, "user", thread["prompt"]))
+        data = [_messageObject(threadId, "assistant", thread["answer"])] if "answer" in thread else []
+        return JSONResponse({
+            "object": "list",
+            "data": data,
+            "first_id": data[0]["id"] if data else None,
+            "last_id": data[-1]["id"] if data else None,
+            "has_more": False,
+        })
+
+    async def createRun(request: Request) -> JSONResponse:
+        body = await request.json()
+        run = backend.createRun(request.path_params["thread_id"], body.get("assistant_id", ""))
+        return JSONResponse(_runObject(run, "queued"))
+
+    async def retrieveRun(request: Request) -> JSONResponse:
+        run = backend.runs.get(request.path_params["run_id"])
+        if run is None:
+            return JSONResponse({"error": {"message": "No run found"}}, status_code=404)
+        return JSONResponse(_runObject(run, backend.runStatus(run)))
+
+    async def cancelRun(request: Request) -> JSONResponse:
+        run = backend.runs.get(request.path_params["run_id"])
+        if run is None:
+            return JSONResponse({"error": {"message": "No run found"}}, status_code=404)
+        run["cancelled"] = True
+        return JSONResponse(_runObject(run, "cancelling"))
+
+    return Starlette(routes=[
+        Route("/v1/threads", createThread, methods=["POST"]),
+        Route("/v1/threads/{thread_id}/messages", messages, methods=["GET", "POST"]),
+        Route("/v1/threads/{thread_id}/runs", createRun, methods=["POST"]),
+        Route("/v1/threads/{thread_id}/runs/{run_id}", retrieveRun, methods=["GET"]),
+        Route("/v1/threads/{thread_id}/runs/{run_id}/cancel", cancelRun, methods=["POST"]),
+    ])
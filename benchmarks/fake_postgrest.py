@@ -0,0 +1,255 @@
+"""
+Faux PostgREST en mémoire pour les benchmarks
+
+Implémente le sous-ensemble de l'API REST de Supabase utilisé par le service
+(select/insert/upsert/update/delete, filtres eq/neq/gt/gte/lt/lte/in/is, or=(...),
+order, limit/offset, projection de colonnes, réponse objet pour .single()).
+Le client supabase-py du service lui parle en HTTP comme à un vrai projet.
+"""
+import asyncio
+import json
+import threading
+import uuid
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response
+from starlette.routing import Route
+
+TABLES = ("tournament", "team", "ai_tournament_planning", "ai_generated_match", "ai_generated_poule",
+          "ai_planning_active", "planning_idempotency")
+RESERVED_PARAMS = {"select", "order", "limit", "offset", "columns", "on_conflict"}
+SINGLE_OBJECT = "application/vnd.pgrst.object+json"
+
+
+def _splitTopLevel(text: str) -> List[str]:
+    """Découpe "a.eq.1,and(b.gt.2,c.lt.3)" sur les virgules hors parenthèses"""
+    parts, depth, current = [], 0, []
+    for char in text:
+        if char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+        if char == "," and depth == 0:
+            parts.append("".join(current))
+            current = []
+        else:
+            current.append(char)
+    if current:
+        parts.append("".join(current))
+    return parts
+
+
+def _coerce(rowValue: Any, raw: str) -> Tuple[Any, Any]:
+    """Convertit la valeur brute de l'URL dans le type de la colonne"""
+    if isinstance(rowValue, bool):
+        return rowValue, raw.lower() == "true"
+    if isinstance(rowValue, int):
+        return rowValue, int(raw)
+    if isinstance(rowValue, float):
+        return rowValue, float(raw)
+    if isinstance(rowValue, str):
+        try:
+            left = datetime.fromisoformat(rowValue)
+            right = datetime.fromisoformat(raw)
+            if (left.tzinfo is None) != (right.tzinfo is None):
+                left, right = left.replace(tzinfo=None), right.replace(tzinfo=None)
+            return left, right
+        except ValueError:
+            pass
+    return rowValue, raw
+
+
+def _matchCondition(row: Dict[str, Any], column: str, expression: str) -> bool:
+    negate = False
+    if expression.startswith("not."):
+        negate, expression = True, expression[4:]
+    operator, _, raw = expression.partition(".")
+    if len(raw) >= 2 and raw[0] == raw[-1] == '"':
+        raw = raw[1:-1]
+    value = row.get(column)
+
+    if operator == "is":
+        result = value is None if raw == "null" else value is (raw == "true")
+    elif operator == "in":
+        candidates = [item.strip('"') for item in raw.strip("()").split(",") if item]
+        result = value is not None and any(_equals(value, candidate) for candidate in candidates)
+    elif value is None:
+        result = False
+    else:
+        left, right = _coerce(value, raw)
+        result = {
+            "eq": lambda: left == right,
+            "neq": lambda: left != right,
+            "gt": lambda: left > right,
+            "gte": lambda: left >= right,
+            "lt": lambda: left < right,
+            "lte": lambda: left <= right,
+        }[operator]()
+    return not result if negate else result
+
+
+def _equals(value: Any, raw: str) -> bool:
+    left, right = _coerce(value, raw)
+    return left == right
+
+
+def _matchLogical(row: Dict[str, Any], operator: str, body: str) -> bool:
+    results = (_matchTerm(row, term) for term in _splitTopLevel(body))
+    return all(results) if operator == "and" else any(results)
+
+
+def _matchTerm(row: Dict[str, Any], term: str) -> bool:
+    for operator in ("and", "or"):
+        if term.startswith(f"{operator}(") and term.endswith(")"):
+            return _matchLogical(row, operator, term[len(operator) + 1:-1])
+    column, _, expression = term.partition(".")
+    return _matchCondition(row, column, expression)
+
+
+class FakePostgrestStore:
+    """Tables en mémoire partagées entre le faux serveur et le script de benchmark"""
+
+    def __init__(self, latencySeconds: float = 0.0):
+        self.latencySeconds = latencySeconds
+        self.tables: Dict[str, List[Dict[str, Any]]] = {name: [] for name in TABLES}
+        self.lock = threading.Lock()
+        self.requestCount = 0
+
+    def seed(self, table: str, rows: List[Dict[str, Any]]) -> None:
+        with self.lock:
+            self.tables.setdefault(table, []).extend(json.loads(json.dumps(rows, default=str)))
+
+    def _filter(self, table: str, params: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        rows = self.tables.setdefault(table, [])
+        for key, value in params:
+            if key in RESERVED_PARAMS:
+                continue
+            if key in ("or", "and"):
+                rows = [row for row in rows if _matchLogical(row, key, value[1:-1])]
+            else:
+                rows = [row for row in rows if _matchCondition(row, key, value)]
+        return rows
+
+    def select(self, table: str, params: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        with self.lock:
+            rows = list(self._filter(table, params))
+        query = dict(params)
+        for clause in reversed(query.get("order", "").split(",") if query.get("order") else []):
+            column, _, direction = clause.partition(".")
+            descending = direction.startswith("desc")
+            present = [row for row in rows if row.get(column) is not None]
+            missing = [row for row in rows if row.get(column) is None]
+            present.sort(key=lambda row: row[column], reverse=descending)
+            rows = present + missing
+        offset = int(query.get("offset", 0))
+        if "limit" in query:
+            rows = rows[offset:offset + int(query["limit"])]
+        elif offset:
+            rows = rows[offset:]
+        return self._project(rows, query.get("select", "*"))
+
+    @staticmethod
+    def _project(rows: List[Dict[str, Any]], select: str) -> List[Dict[str, Any]]:
+        if select in ("*", ""):
+            return [dict(row) for row in rows]
+        columns = select.split(",")
+        return [{column: row.get(column) for column in columns} for row in rows]
+
+    def insert(self, table: str, body: Any, upsert: bool, onConflict: str) -> List[Dict[str, Any]]:
+        rows = body if isinstance(body, list) else [body]
+        keys = onConflict.split(",") if onConflict else ["id"]
+        written = []
+        with self.lock:
+            stored = self.tables.setdefault(table, [])
+            index = {tuple(row.get(key) for key in keys): row for row in stored} if upsert else {}
+            storedIds = {item.get("id") for item in stored}
+            for row in rows:
+                row = dict(row)
+                row.setdefault("id", str(uuid.uuid4()))
+                existing = index.get(tuple(row.get(key) for key in keys))
+                if existing is not None:
+                    existing.update(row)
+                    written.append(dict(existing))
+                    continue
+                if not upsert and row["id"] in storedIds:
+                    raise ValueError(f"duplicate key value violates unique constraint \"{table}_pkey\"")
+                stored.append(row)
+                storedIds.add(row["id"])
+                if upsert:
+                    index[tuple(row.get(key) for key in keys)] = row
+                written.append(dict(row))
+        return written
+
+    def update(self, table: str, params: List[Tuple[str, str]], body: Dict[str, Any]) -> List[Dict[str, Any]]:
+        with self.lock:
+            rows = self._filter(table, params)
+            for row in rows:
+                row.update(body)
+            return [dict(row) for row in rows]
+
+    def delete(self, table: str, params: List[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        with self.lock:
+            doomed = self._filter(table, params)
+            doomedIds = {id(row) for row in doomed}
+            self.tables[table] = [row for row in self.tables[table] if id(row) not in doomedIds]
+            return [dict(row) for row in doomed]
+
+
+def _error(message: str, code: str, status: int) -> JSONResponse:
+    return JSONResponse({"message": message, "code": code, "details": None, "hint": None}, status_code=status)
+
+
+def createFakePostgrestApp(store: FakePostgrestStore) -> Starlette:
+    """Application ASGI qui expose le store sous /rest/v1/{table}"""
+
+    async def handle(request: Request) -> Response:
+        store.requestCount += 1
+        if store.latencySeconds:
+            await asyncio.sleep(store.latencySeconds)
+
+        table = request.path_params["table"]
+        params = list(request.query_params.multi_items())
+        prefer = request.headers.get("prefer", "")
+
+        try:
+            if request.method == "GET":
+                rows = store.select(table, params)
+            elif request.method == "POST":
+                body = await request.json()
+                rows = store.insert(
+                    table,
+                    body,
+                    upsert="resolution=merge-duplicates" in prefer,
+                    onConflict=request.query_params.get("on_conflict", "")
+                )
+            elif request.method == "PATCH":
+                rows = store.update(table, params, await request.json())
+            else:
+                rows = store.delete(table, params)
+        except ValueError as e:
+            return _error(str(e), "23505", 409)
+        except Exception as e:
+            return _error(str(e), "PGRST100", 400)
+
+        if request.method != "GET" and "return=representation" not in prefer:
+            return Response(status_code=204)
+
+        if request.headers.get("accept") == SINGLE_OBJECT:
+            if len(rows) != 1:
+                return _error(
+                    "JSON object requested, multiple (or no) rows returned",
+                    "PGRST116",
+                    406
+                )
+            return JSONResponse(rows[0], headers={"Content-Range": "0-0/*"})
+
+        contentRange = f"0-{len(rows) - 1}/*" if rows else "*/0"
+        return JSONResponse(rows, status_code=201 if request.method == "POST" else 200,
+                            headers={"Content-Range": contentRange})
+
+    return Starlette(routes=[
+        Route("/rest/v1/{table}", handle, methods=["GET", "POST", "PATCH", "DELETE"]),
+    ])
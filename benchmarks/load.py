@@ -0,0 +1,310 @@
+"""
+Benchmark de charge hors ligne du service
+
+Lance l'application FastAPI face à un faux PostgREST et un faux serveur
+Assistants (aucun appel réseau externe), puis mesure p50/p95/p99 et le débit
+de chaque endpoint à des niveaux de concurrence fixes.
+
+Usage:
+    python -m benchmarks.load --concurrency 1 8 32 --requests 64
+    python -m benchmarks.load --output bench.json --baseline previous.json --threshold 1.25
+"""
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+import uuid
+from datetime import date, datetime
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import uvicorn
+
+from benchmarks.corpus import VARIANTS, corpusResponder
+from benchmarks.fake_openai import FakeAssistantsBackend, createFakeOpenAIApp
+from benchmarks.fake_postgrest import FakePostgrestStore, createFakePostgrestApp
+
+# Clé au format JWT attendu par supabase-py (jamais vérifiée par le faux serveur)
+FAKE_KEY = "bench.bench.bench"
+
+
+def _freePort() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def serveInThread(app: Any, port: int) -> uvicorn.Server:
+    """Démarre une app ASGI dans son propre thread (et sa propre boucle)"""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    thread = threading.Thread(target=server.run, daemon=True)
+    thread.start()
+    while not server.started:
+        time.sleep(0.01)
+    return server
+
+
+def seedTournament(store: FakePostgrestStore, teamsCount: int, courts: int, tournamentType: str) -> str:
+    """Insère un tournoi et ses équipes, retourne l'ID du tournoi"""
+    tournamentId = str(uuid.uuid4())
+    now = datetime.now().isoformat()
+    store.seed("tournament", [{
+        "id": tournamentId,
+        "name": f"Tournoi bench {tournamentId[:8]}",
+        "description": None,
+        "tournament_type": tournamentType,
+        "max_teams": teamsCount,
+        "courts_available": courts,
+        "start_date": date.today().isoformat(),
+        "start_time": "09:00:00",
+        "match_duration_minutes": 15,
+        "break_duration_minutes": 5,
+        "constraints": {},
+        "organizer_id": str(uuid.uuid4()),
+        "status": "ready",
+        "created_at": now,
+        "updated_at": now,
+    }])
+    store.seed("team", [{
+        "id": str(uuid.uuid4()),
+        "name": f"Équipe {index + 1:03d}",
+        "description": "",
+        "tournament_id": tournamentId,
+        "captain_id": None,
+        "status": "registered",
+        "contact_email": f"equipe{index + 1}@bench.local",
+        "contact_phone": "",
+        "skill_level": "intermediate",
+        "notes": "",
+        "created_at": now,
+        "updated_at": now,
+    } for index in range(teamsCount)])
+    return tournamentId
+
+
+def percentile(sortedValues: List[float], fraction: float) -> float:
+    """Percentile au rang le plus proche"""
+    if not sortedValues:
+        return 0.0
+    rank = max(0, min(len(sortedValues) - 1, int(round(fraction * len(sortedValues) + 0.5)) - 1))
+    return sortedValues[rank]
+
+
+async def runScenario(client: httpx.AsyncClient,
+                      makeRequest: Callable[[int], Any],
+                      requests: int,
+                      concurrency: int) -> Dict[str, Any]:
+    """Envoie `requests` requêtes avec au plus `concurrency` en vol"""
+    latencies: List[float] = []
+    errors = 0
+    counter = iter(range(requests))
+    lock = asyncio.Lock()
+
+    async def worker() -> None:
+        nonlocal errors
+        while True:
+            async with lock:
+                index = next(counter, None)
+            if index is None:
+                return
+            start = time.perf_counter()
+            try:
+                response = await makeRequest(index)
+                if response.status_code >= 400:
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+
+    latencies.sort()
+    return {
+        "requests": requests,
+        "errors": errors,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 2),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 2),
+        "p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "rps": round(requests / elapsed, 2) if elapsed else 0.0,
+    }
+
+
+async def runBenchmarks(args: argparse.Namespace, store: FakePostgrestStore, baseUrl: str) -> Dict[str, Dict[str, Any]]:
+    results: Dict[str, Dict[str, Any]] = {}
+    timeout = httpx.Timeout(args.client_timeout)
+    limits = httpx.Limits(max_connections=max(args.concurrency) * 2)
+
+    async with httpx.AsyncClient(base_url=baseUrl, timeout=timeout, limits=limits) as client:
+        generatePool = [
+            seedTournament(store, args.teams, args.courts, args.tournament_type)
+            for _ in range(args.tournaments)
+        ]
+
+        # Plannings de lecture : un seul planning par tournoi
+        readPlannings: List[Dict[str, str]] = []
+        for _ in range(args.read_plannings):
+            tournamentId = seedTournament(store, args.teams, args.courts, args.tournament_type)
+            response = await client.post("/api/planning/generate", json={"tournament_id": tournamentId})
+            response.raise_for_status()
+            readPlannings.append({"tournament_id": tournamentId, "planning_id": response.json()["data"]["id"]})
+
+        async def generate(index: int) -> httpx.Response:
+            return await client.post(
+                "/api/planning/generate",
+                json={"tournament_id": generatePool[index % len(generatePool)]}
+            )
+
+        scenarios: Dict[str, Callable[[int], Any]] = {
+            "GET /api/planning/{id}": lambda i: client.get(
+                f"/api/planning/{readPlannings[i % len(readPlannings)]['planning_id']}"),
+            "GET /api/planning/{id}/status": lambda i: client.get(
+                f"/api/planning/{readPlannings[i % len(readPlannings)]['planning_id']}/status"),
+            "GET /api/planning/tournament/{id}": lambda i: client.get(
+                f"/api/planning/tournament/{readPlannings[i % len(readPlannings)]['tournament_id']}"),
+            "GET /api/planning/{id}/matches?terrain&limit=5": lambda i: client.get(
+                f"/api/planning/{readPlannings[i % len(readPlannings)]['planning_id']}/matches",
+                params={"terrain": i % args.courts + 1, "limit": 5, "fields": "equipe_a,equipe_b,terrain"}),
+            "POST /api/planning/generate": generate,
+        }
+
+        for name, makeRequest in scenarios.items():
+            if args.endpoints and not any(pattern in name for pattern in args.endpoints):
+                continue
+            for concurrency in args.concurrency:
+                key = f"{name} @c{concurrency}"
+                results[key] = await runScenario(client, makeRequest, args.requests, concurrency)
+                _print(f"{key:<48} {_formatRow(results[key])}")
+
+        # La régénération repart de la version active de chaque tournoi du scénario generate :
+        # les versions précédentes sont purgées au fil des régénérations
+        from app.services.database_service import databaseService
+
+        async def regenerate(index: int) -> httpx.Response:
+            tournamentId = regeneratePool[index % len(regeneratePool)]
+            planningId = await asyncio.to_thread(databaseService.getActivePlanningId, tournamentId)
+            return await client.post(f"/api/planning/{planningId}/regenerate")
+
+        name = "POST /api/planning/{id}/regenerate"
+        if not args.endpoints or any(pattern in name for pattern in args.endpoints):
+            regeneratePool = [
+                tournamentId for tournamentId in generatePool
+                if databaseService.getActivePlanningId(tournamentId)
+            ]
+            for concurrency in (args.concurrency if regeneratePool else []):
+                key = f"{name} @c{concurrency}"
+                results[key] = await runScenario(client, regenerate, args.requests, concurrency)
+                _print(f"{key:<48} {_formatRow(results[key])}")
+
+    return results
+
+
+def _formatRow(result: Dict[str, Any]) -> str:
+    return (f"n={result['requests']:<4} err={result['errors']:<3} "
+            f"p50={result['p50_ms']:>9.2f}ms p95={result['p95_ms']:>9.2f}ms "
+            f"p99={result['p99_ms']:>9.2f}ms rps={result['rps']:>8.2f}")
+
+
+def _print(line: str) -> None:
+    # Les print() du service sont redirigés, le rapport va sur la vraie sortie
+    sys.__stdout__.write(line + "\n")
+    sys.__stdout__.flush()
+
+
+def compareWithBaseline(results: Dict[str, Dict[str, Any]],
+                        baseline: Dict[str, Dict[str, Any]],
+                        threshold: float) -> List[str]:
+    """Liste les scénarios dont p95 ou le débit régressent au-delà du seuil"""
+    regressions = []
+    for key, result in results.items():
+        previous = baseline.get(key)
+        if not previous:
+            continue
+        if previous["p95_ms"] and result["p95_ms"] > previous["p95_ms"] * threshold:
+            regressions.append(f"{key}: p95 {previous['p95_ms']}ms -> {result['p95_ms']}ms")
+        if result["rps"] and result["rps"] < previous["rps"] / threshold:
+            regressions.append(f"{key}: rps {previous['rps']} -> {result['rps']}")
+    return regressions
+
+
+def parseArgs(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmark hors ligne de l'AI Planning Service")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 8, 32])
+    parser.add_argument("--requests", type=int, default=64, help="requêtes par scénario et par niveau")
+    parser.add_argument("--endpoints", nargs="*", help="ne garder que les scénarios contenant ces motifs")
+    parser.add_argument("--teams", type=int, default=8)
+    parser.add_argument("--courts", type=int, default=2)
+    parser.add_argument("--tournament-type", default="round_robin")
+    parser.add_argument("--tournaments", type=int, default=16, help="tournois utilisés par generate")
+    parser.add_argument("--read-plannings", type=int, default=8)
+    parser.add_argument("--db-latency-ms", type=float, default=2.0, help="latence simulée par requête PostgREST")
+    parser.add_argument("--ai-queued", type=float, default=0.1, help="secondes en 'queued' par run")
+    parser.add_argument("--ai-latency", type=float, default=0.5, help="secondes en 'in_progress' par run")
+    parser.add_argument("--ai-jitter", type=float, default=0.0, help="latence aléatoire supplémentaire max")
+    parser.add_argument("--ai-failure-rate", type=float, default=0.0)
+    parser.add_argument("--ai-variant", choices=VARIANTS, default="plain", help="forme des réponses de l'assistant")
+    parser.add_argument("--poll-interval", type=float, default=0.05, help="OPENAI_POLL_INTERVAL_SECONDS du service")
+    parser.add_argument("--client-timeout", type=float, default=300.0)
+    parser.add_argument("--output", help="fichier JSON où écrire les résultats")
+    parser.add_argument("--baseline", help="résultats JSON de référence à comparer")
+    parser.add_argument("--threshold", type=float, default=1.25, help="facteur de régression toléré")
+    parser.add_argument("--verbose", action="store_true", help="garder les logs du service")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = parseArgs(argv)
+
+    store = FakePostgrestStore(latencySeconds=args.db_latency_ms / 1000)
+    backend = FakeAssistantsBackend(
+        responder=corpusResponder(args.ai_variant),
+        queuedSeconds=args.ai_queued,
+        runSeconds=args.ai_latency,
+        jitterSeconds=args.ai_jitter,
+        failureRate=args.ai_failure_rate
+    )
+    postgrestPort, openaiPort, appPort = _freePort(), _freePort(), _freePort()
+    serveInThread(createFakePostgrestApp(store), postgrestPort)
+    serveInThread(createFakeOpenAIApp(backend), openaiPort)
+
+    # La configuration du service est lue à l'import : variables posées avant
+    os.environ.update({
+        "SUPABASE_URL": f"http://127.0.0.1:{postgrestPort}",
+        "SUPABASE_KEY": FAKE_KEY,
+        "SUPABASE_SERVICE_KEY": FAKE_KEY,
+        "OPENAI_API_KEY": "sk-bench",
+        "OPENAI_ASSISTANT_ID": "asst_bench",
+        "OPENAI_BASE_URL": f"http://127.0.0.1:{openaiPort}/v1",
+        "OPENAI_POLL_INTERVAL_SECONDS": str(args.poll_interval),
+    })
+    if not args.verbose:
+        sys.stdout = open(os.devnull, "w")
+
+    from main import app
+    serveInThread(app, appPort)
+
+    results = asyncio.run(runBenchmarks(args, store, f"http://127.0.0.1:{appPort}"))
+
+    if args.output:
+        with open(args.output, "w") as file:
+            json.dump(results, file, indent=2)
+        _print(f"Résultats écrits dans {args.output}")
+
+    if args.baseline:
+        with open(args.baseline) as file:
+            baseline = json.load(file)
+        regressions = compareWithBaseline(results, baseline, args.threshold)
+        for regression in regressions:
+            _print(f"REGRESSION {regression}")
+        if regressions:
+            return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,200 @@
+"""
+Micro-benchmarks CPU du pipeline parse -> validation -> extraction -> sérialisation
+
+Mesure, sur le corpus synthétique (benchmarks.corpus), le temps par appel de :
+_parse_response, la validation AIPlanningData, calculate_total_matches, les
+fonctions _extract*Matches, la construction des lignes de saveMatches et le
+score de qualité (quality_service.scoreSchedule).
+Chaque exécution est ajoutée à un historique JSONL et comparée à la précédente
+(ou à --baseline) : le script sort en erreur au-delà du seuil de régression.
+
+Usage:
+    python -m benchmarks.micro
+    python -m benchmarks.micro --sizes 4 64 512 --formats poules_elimination --threshold 1.2
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import time
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional
+
+from benchmarks.corpus import DEFAULT_SIZES, FORMATS, VARIANTS, generatePlanningData, renderResponse
+
+DEFAULT_HISTORY = os.path.join(os.path.dirname(__file__), "results", "micro_history.jsonl")
+
+# Fonctions d'extraction pertinentes pour chaque format
+FORMAT_EXTRACTORS = {
+    "round_robin": ["_extractRoundRobinMatches"],
+    "poules_elimination": ["_extractPoulesMatches", "_extractEliminationMatches"],
+    "elimination_directe": ["_extractEliminationDirecteMatches"],
+}
+
+
+def _setDummyEnvironment() -> None:
+    """Le service lit sa configuration à l'import ; aucun appel réseau n'est fait ici"""
+    os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:9")
+    os.environ.setdefault("SUPABASE_KEY", "bench.bench.bench")
+    os.environ.setdefault("SUPABASE_SERVICE_KEY", "bench.bench.bench")
+    os.environ.setdefault("OPENAI_API_KEY", "sk-bench")
+    os.environ.setdefault("OPENAI_ASSISTANT_ID", "asst_bench")
+
+
+def measure(func: Callable[[], Any], minTime: float = 0.05, repeat: int = 5) -> float:
+    """Meilleur temps par appel (secondes), nombre d'appels calibré sur minTime"""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        elapsed = time.perf_counter() - start
+        if elapsed >= minTime:
+            break
+        number *= 2 if elapsed == 0 else max(2, min(10, int(minTime / elapsed) + 1))
+    best = elapsed / number
+    for _ in range(repeat - 1):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, (time.perf_counter() - start) / number)
+    return best
+
+
+def _swallow(func: Callable[[], Any]) -> Callable[[], Any]:
+    """Les variantes tronquées/malformées mesurent le chemin d'erreur"""
+    def wrapper():
+        try:
+            func()
+        except Exception:
+            pass
+    return wrapper
+
+
+def buildCases(sizes: List[int], formats: List[str], maxRoundRobinTeams: int) -> Dict[str, Callable[[], Any]]:
+    from datetime import timedelta
+    from app.core.scheduling import SchedulingRules
+    from app.models.models import AIPlanningData
+    from app.services.database_service import databaseService
+    from app.services.openai_service import openai_service
+    from app.services.quality_service import ScheduleArrays, scoreSchedule
+
+    rules = SchedulingRules(timedelta(minutes=15), timedelta(minutes=5))
+
+    cases: Dict[str, Callable[[], Any]] = {}
+    for tournamentType in formats:
+        for size in sizes:
+            if tournamentType == "round_robin" and size > maxRoundRobinTeams:
+                continue
+            planningData = generatePlanningData(size, tournamentType)
+            prefix = f"{tournamentType}/{size}"
+
+            for variant in VARIANTS:
+                text = renderResponse(planningData, variant)
+                cases[f"parse_response/{prefix}/{variant}"] = _swallow(
+                    lambda text=text: openai_service._parse_response(text))
+
+            cases[f"validate/{prefix}"] = lambda data=planningData: AIPlanningData(**data)
+
+            aiPlanningData = AIPlanningData(**planningData)
+            cases[f"total_matches/{prefix}"] = aiPlanningData.calculate_total_matches
+
+            for extractor in FORMAT_EXTRACTORS[tournamentType]:
+                extract = getattr(databaseService, extractor)
+                cases[f"{extractor.lstrip('_')}/{prefix}"] = (
+                    lambda extract=extract, data=aiPlanningData: extract("bench-planning", data))
+
+            # Lignes prêtes pour l'insert de saveMatches (extraction + sérialisation + UUID)
+            cases[f"build_match_rows/{prefix}"] = (
+                lambda data=aiPlanningData: databaseService._buildMatchRows("bench-planning", data))
+
+            # Conversion en tableaux + indicateurs de qualité (sélection des candidats, /quality)
+            cases[f"quality/{prefix}"] = (
+                lambda data=aiPlanningData: scoreSchedule(ScheduleArrays.fromPlanningData(data), rules))
+    return cases
+
+
+def _gitCommit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+def loadBaseline(path: str) -> Optional[Dict[str, float]]:
+    """Résultats d'un fichier JSON, ou de la dernière ligne d'un historique JSONL"""
+    if not os.path.exists(path):
+        return None
+    with open(path) as file:
+        content = file.read().strip()
+    if not content:
+        return None
+    if path.endswith(".jsonl"):
+        content = content.splitlines()[-1]
+    entry = json.loads(content)
+    return entry.get("results", entry)
+
+
+def compare(results: Dict[str, float], baseline: Dict[str, float], threshold: float, noiseFloor: float) -> List[str]:
+    regressions = []
+    for case, seconds in results.items():
+        previous = baseline.get(case)
+        if previous and seconds > previous * threshold and seconds - previous > noiseFloor:
+            regressions.append(f"{case}: {previous * 1e6:.1f}µs -> {seconds * 1e6:.1f}µs (x{seconds / previous:.2f})")
+    return regressions
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Micro-benchmarks CPU du pipeline de planning")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES))
+    parser.add_argument("--formats", nargs="+", choices=FORMATS, default=list(FORMATS))
+    parser.add_argument("--max-round-robin-teams", type=int, default=128,
+                        help="au-delà, un round robin dépasse 30 000 matchs")
+    parser.add_argument("--filter", help="ne garder que les cas contenant ce motif")
+    parser.add_argument("--min-time", type=float, default=0.05)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--history", default=DEFAULT_HISTORY, help="historique JSONL des exécutions")
+    parser.add_argument("--baseline", help="référence (JSON ou JSONL), par défaut la dernière exécution de l'historique")
+    parser.add_argument("--threshold", type=float, default=1.3, help="facteur de régression toléré")
+    parser.add_argument("--noise-floor-us", type=float, default=2.0, help="écart absolu ignoré (µs)")
+    parser.add_argument("--no-record", action="store_true", help="ne pas ajouter l'exécution à l'historique")
+    args = parser.parse_args(argv)
+
+    _setDummyEnvironment()
+    out = sys.stdout
+    sys.stdout = open(os.devnull, "w")  # les print() du service faussent la mesure à l'écran
+
+    cases = buildCases(args.sizes, args.formats, args.max_round_robin_teams)
+    results: Dict[str, float] = {}
+    for case, func in cases.items():
+        if args.filter and args.filter not in case:
+            continue
+        results[case] = measure(func, args.min_time, args.repeat)
+        out.write(f"{case:<60} {results[case] * 1e6:>14.1f} µs\n")
+        out.flush()
+
+    baseline = loadBaseline(args.baseline or args.history)
+    regressions = compare(results, baseline, args.threshold, args.noise_floor_us / 1e6) if baseline else []
+
+    if not args.no_record:
+        os.makedirs(os.path.dirname(os.path.abspath(args.history)), exist_ok=True)
+        with open(args.history, "a") as file:
+            file.write(json.dumps({
+                "timestamp": datetime.now().isoformat(timespec="seconds"),
+                "commit": _gitCommit(),
+                "python": platform.python_version(),
+                "results": results,
+            }) + "\n")
+
+    for regression in regressions:
+        out.write(f"REGRESSION {regression}\n")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,16 +1,35 @@
-from fastapi import FastAPI
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
+from app.core.config import settings
+from app.core.tracing import startTrace
+from app.core.profiling import startProfiler, profileStore
+from app.core.process_pool import processPool
 
 # Import des routes
 from app.api.routes.planning import router as planning_router
+from app.api.routes.metrics import router as metrics_router
+from app.api.routes.debug import router as debug_router
 
 
+# Pool de processus pour le calcul CPU, démarré avec l'app et arrêté avec elle
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    processPool.start()
+    try:
+        yield
+    finally:
+        processPool.shutdown()
+
 # Création de l'app FastAPI
 app = FastAPI(
     title="AI Planning Service API",
     description="API pour la génération automatique de plannings de tournois de volley-ball",
     version="1.0.0",
-    docs_url="/docs"
+    docs_url="/docs",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan
 )
 
 # Middleware CORS
@@ -22,8 +41,33 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Trace chaque requête ; profil échantillonné si X-Profile: 1 et PROFILING_ENABLED
+# (le profil inclut le thread de la boucle d'événements, partagé avec les requêtes concurrentes)
+@app.middleware("http")
+async def tracing_middleware(request: Request, call_next):
+    profiler = None
+    if settings.PROFILING_ENABLED and request.headers.get("x-profile") == "1":
+        profiler = startProfiler(settings.PROFILING_INTERVAL_MS / 1000)
+
+    try:
+        with startTrace(f"{request.method} {request.url.path}", http_method=request.method) as trace:
+            response = await call_next(request)
+    finally:
+        if profiler:
+            profiler.stop()
+            profileStore.add(profiler)
+
+    response.headers["X-Trace-Id"] = trace.traceId
+    if profiler:
+        response.headers["X-Profile-Id"] = profiler.profileId
+    return response
+
 # Inclusion des routes avec préfixes
 app.include_router(planning_router)
+app.include_router(metrics_router)
+# Diagnostic (traces, profils) : uniquement avec un jeton configuré
+if settings.DEBUG_TOKEN:
+    app.include_router(debug_router)
 
 # Route racine
 @app.get("/", tags=["Root"])
@@ -0,0 +1,46 @@
+-- Schéma requis par le service à partir des versions de planning, des résultats
+-- de matchs et des en-têtes Idempotency-Key. Rejouable (IF NOT EXISTS).
+
+-- Résultats des matchs (enregistrés par /results, reportés d'une version à l'autre)
+alter table ai_generated_match add column if not exists score_a integer;
+alter table ai_generated_match add column if not exists score_b integer;
+-- Équipes résolues des placeholders : le NOM de l'équipe, comme equipe_a/equipe_b
+-- (le suffixe _id est historique, ce ne sont pas des clés de team)
+alter table ai_generated_match add column if not exists resolved_equipe_a_id text;
+alter table ai_generated_match add column if not exists resolved_equipe_b_id text;
+comment on column ai_generated_match.resolved_equipe_a_id is 'Nom de l''équipe qui remplace le placeholder equipe_a';
+comment on column ai_generated_match.resolved_equipe_b_id is 'Nom de l''équipe qui remplace le placeholder equipe_b';
+
+-- Pagination par clé des matchs : (debut_horaire, id), éventuellement par terrain
+create index if not exists ai_generated_match_planning_start_idx
+    on ai_generated_match (planning_id, debut_horaire, id);
+create index if not exists ai_generated_match_planning_court_start_idx
+    on ai_generated_match (planning_id, terrain, debut_horaire, id);
+
+-- Version active du planning de chaque tournoi : une ligne par tournoi,
+-- basculée par un upsert (on_conflict=tournament_id)
+create table if not exists ai_planning_active (
+    tournament_id uuid primary key,
+    planning_id uuid not null references ai_tournament_planning (id),
+    updated_at timestamptz not null default now()
+);
+
+-- Clés Idempotency-Key de /generate et /regenerate : l'INSERT sur la clé
+-- primaire réserve la clé entre workers (violation 23505 pour les suivants)
+create table if not exists planning_idempotency (
+    id text primary key,
+    fingerprint text not null,
+    status text not null check (status in ('in_progress', 'completed')),
+    planning_id uuid,
+    owner text,
+    created_at timestamptz not null default now(),
+    updated_at timestamptz not null default now(),
+    expires_at timestamptz not null
+);
+
+-- Plannings encore référencés par une clé (épargnés par la purge des versions)
+create index if not exists planning_idempotency_planning_idx
+    on planning_idempotency (planning_id) where planning_id is not null;
+-- Purge des clés expirées : delete from planning_idempotency where expires_at < now();
+create index if not exists planning_idempotency_expires_idx
+    on planning_idempotency (expires_at);
@@ -0,0 +1,11 @@
+import os
+import sys
+
+# Les services créent leurs clients à l'import : une configuration factice suffit
+# tant que les tests ne touchent qu'aux fonctions pures
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_KEY", "test.anon.key")
+os.environ.setdefault("SUPABASE_SERVICE_KEY", "test.service.key")
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("OPENAI_ASSISTANT_ID", "test")
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
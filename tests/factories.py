@@ -0,0 +1,45 @@
+from datetime import datetime, timedelta
+from typing import Optional
+
+from app.models.models import AIGeneratedMatch, Tournament
+
+START = datetime(2026, 10, 19, 9, 0)
+
+
+def makeMatch(matchIdAi: str,
+              equipeA: str,
+              equipeB: str,
+              slot: int = 0,
+              terrain: int = 1,
+              pouleId: Optional[str] = None,
+              status: str = "scheduled",
+              scoreA: Optional[int] = None,
+              scoreB: Optional[int] = None) -> AIGeneratedMatch:
+    """Ligne ai_generated_match minimale, créneaux de 20 minutes à partir de 9h"""
+    debut = START + timedelta(minutes=20 * slot)
+    return AIGeneratedMatch(
+        id=f"id-{matchIdAi}",
+        planning_id="planning-1",
+        match_id_ai=matchIdAi,
+        equipe_a=equipeA,
+        equipe_b=equipeB,
+        terrain=terrain,
+        debut_horaire=debut,
+        fin_horaire=debut + timedelta(minutes=15),
+        phase="poules" if pouleId else "elimination",
+        poule_id=pouleId,
+        status=status,
+        score_a=scoreA,
+        score_b=scoreB
+    )
+
+
+def makeTournament(tournamentType: str, teams: int, courts: int, **fields) -> Tournament:
+    """Tournoi d'une journée à partir de 9h, matchs de 15 minutes et 5 minutes de pause"""
+    return Tournament(
+        id="tournament-1", name="Tournoi", description=None,
+        tournament_type=tournamentType, max_teams=teams, registered_teams=teams,
+        courts_available=courts, start_date=START.date(), start_time=START.time(),
+        organizer_id="organizer-1", created_at=START, updated_at=START,
+        **fields
+    )
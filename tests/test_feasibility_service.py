@@ -0,0 +1,44 @@
+import pytest
+
+from app.services.feasibility_service import InfeasibleTournamentError, feasibilityService, minimumShape
+from tests.factories import makeTournament
+
+EARLY_END = {"end_time": "12:00", "lunch_break": False}
+
+
+def test_minimum_shape_is_below_local_engine_shape():
+    for teams in range(2, 40):
+        bound = minimumShape("poules_elimination", teams)
+        estimate = feasibilityService.analyze(makeTournament("poules_elimination", teams, 4), teams)
+        assert bound[0] <= estimate["matches"] and bound[1] <= estimate["rounds"]
+
+
+def test_poules_estimate_over_the_day_only_warns():
+    # poules de 4 : 24 matchs de poule + 8 de phase finale pour 21 créneaux (un terrain, 9h-16h) ;
+    # des poules de 2 et une finale (9 matchs) tiendraient
+    tournament = makeTournament("poules_elimination", 16, 1, constraints={"end_time": "16:00", "lunch_break": False})
+
+    report = feasibilityService.check(tournament, 16)
+
+    assert not report["feasible"] and not report["exact"]
+    assert report["lower_bound_feasible"]
+    assert "warning" in report
+
+
+def test_poules_below_the_lower_bound_are_rejected():
+    tournament = makeTournament("poules_elimination", 16, 1, constraints={"end_time": "10:00", "lunch_break": False})
+
+    with pytest.raises(InfeasibleTournamentError) as error:
+        feasibilityService.check(tournament, 16)
+
+    assert not error.value.report["lower_bound_feasible"]
+
+
+def test_round_robin_over_the_day_is_rejected():
+    tournament = makeTournament("round_robin", 16, 2, constraints=EARLY_END)
+
+    with pytest.raises(InfeasibleTournamentError) as error:
+        feasibilityService.check(tournament, 16)
+
+    assert error.value.report["exact"]
+    assert error.value.report["min_courts"] is None or error.value.report["min_courts"] > 2
@@ -0,0 +1,28 @@
+import pytest
+
+from app.services.database_service import decodeMatchCursor, encodeMatchCursor
+
+MATCH_ID = "3f2b8c1e-9a4d-4e7f-8b21-6c0d5e4a9f10"
+
+
+def test_cursor_round_trip():
+    cursor = encodeMatchCursor("2026-10-19T09:20:00+00:00", MATCH_ID)
+
+    assert "=" not in cursor
+    assert decodeMatchCursor(cursor) == ("2026-10-19T09:20:00+00:00", MATCH_ID)
+
+
+def test_cursor_values_are_normalised():
+    cursor = encodeMatchCursor("2026-10-19 09:20", MATCH_ID.upper())
+
+    assert decodeMatchCursor(cursor) == ("2026-10-19T09:20:00", MATCH_ID)
+
+
+@pytest.mark.parametrize("cursor", [
+    "pas-un-curseur",
+    encodeMatchCursor("2026-10-19T09:20:00", "1),id.neq.(x"),
+    encodeMatchCursor("hier", MATCH_ID),
+])
+def test_invalid_cursor_raises(cursor):
+    with pytest.raises(ValueError):
+        decodeMatchCursor(cursor)
@@ -0,0 +1,70 @@
+from app.services.placeholder_service import PlaceholderGraph
+from app.services.quality_service import ScheduleArrays
+from tests.factories import makeMatch
+
+
+def _play(match, scoreA, scoreB):
+    return match.model_copy(update={"status": "completed", "score_a": scoreA, "score_b": scoreB})
+
+
+def _aiBracket():
+    """Tableau tel que généré par l'IA : ids elim_*, placeholders sans le préfixe"""
+    return {match.id: match for match in [
+        makeMatch("elim_quart_1", "Équipe 1", "Équipe 8", slot=0),
+        makeMatch("elim_quart_2", "Équipe 4", "Équipe 5", slot=0, terrain=2),
+        makeMatch("elim_demi_1", "winner_quart_1", "winner_quart_2", slot=1),
+        makeMatch("elim_finale", "winner_demi_1", "Équipe 2", slot=2),
+    ]}
+
+
+def test_ai_bracket_resolves_winner_placeholders():
+    matches = _aiBracket()
+    graph = PlaceholderGraph(matches.values())
+    matches["id-elim_quart_1"] = _play(matches["id-elim_quart_1"], 2, 1)
+    matches["id-elim_quart_2"] = _play(matches["id-elim_quart_2"], 0, 2)
+
+    changed = graph.propagate(matches, ["id-elim_quart_1", "id-elim_quart_2"])
+
+    demi = changed["id-elim_demi_1"]
+    assert (demi.resolved_equipe_a_id, demi.resolved_equipe_b_id) == ("Équipe 1", "Équipe 5")
+    assert "id-elim_finale" not in changed
+
+
+def test_played_dependent_propagates_further():
+    matches = _aiBracket()
+    graph = PlaceholderGraph(matches.values())
+    matches["id-elim_quart_1"] = _play(matches["id-elim_quart_1"], 2, 1)
+    matches["id-elim_quart_2"] = _play(matches["id-elim_quart_2"], 0, 2)
+    matches.update(graph.propagate(matches, ["id-elim_quart_1", "id-elim_quart_2"]))
+    matches["id-elim_demi_1"] = _play(matches["id-elim_demi_1"], 1, 3)
+
+    changed = graph.propagate(matches, ["id-elim_demi_1"])
+
+    assert changed["id-elim_finale"].resolved_equipe_a_id == "Équipe 5"
+
+
+def test_poule_ranking_resolves_all_ranks():
+    poule = [
+        makeMatch("poule_a_m1", "A", "B", slot=0, pouleId="poule_a"),
+        makeMatch("poule_a_m2", "C", "A", slot=1, pouleId="poule_a"),
+        makeMatch("poule_a_m3", "B", "C", slot=2, pouleId="poule_a"),
+    ]
+    final = makeMatch("elim_petite_finale", "2e_poule_a", "3e_poule_a", slot=3)
+    matches = {match.id: match for match in poule + [final]}
+    graph = PlaceholderGraph(matches.values())
+    for match, (scoreA, scoreB) in zip(poule, [(2, 0), (0, 2), (2, 1)]):
+        matches[match.id] = _play(match, scoreA, scoreB)
+
+    changed = graph.propagate(matches, [match.id for match in poule])
+
+    petiteFinale = changed[final.id]
+    assert (petiteFinale.resolved_equipe_a_id, petiteFinale.resolved_equipe_b_id) == ("B", "C")
+
+
+def test_schedule_arrays_know_ai_bracket_producers():
+    arrays = ScheduleArrays.fromMatches(_aiBracket().values())
+
+    producer = arrays.producerRow[arrays.teams["winner_quart_1"]]
+
+    assert arrays.matchIds[producer] == "elim_quart_1"
+    assert arrays.producerRow[arrays.teams["Équipe 1"]] == -1
@@ -0,0 +1,53 @@
+from datetime import datetime
+
+import orjson
+
+from app.services.planning_jobs import scheduleEliminationJob, schedulePouleJob
+from tests.factories import START, makeTournament
+
+
+def _tournamentJson():
+    return makeTournament("poules_elimination", 8, 2).model_dump_json().encode()
+
+
+def _overlaps(first, second):
+    return first[0] < second[1] and second[0] < first[1]
+
+
+def test_poule_job_keeps_played_pairs_and_avoids_bookings():
+    # poule_a garde ses créneaux sur les deux terrains pendant la première demi-heure
+    bookings = [
+        (1, ["A1", "A2"], START, START.replace(minute=15), ["1er_poule_a"]),
+        (2, ["A3", "A4"], START, START.replace(minute=15), ["1er_poule_a"]),
+        (1, ["B1", "B2"], START.replace(minute=20), START.replace(minute=35), []),
+    ]
+
+    matches = orjson.loads(schedulePouleJob(
+        _tournamentJson(), bookings, "poule_b", ["B1", "B2", "B3"], START,
+        played=[("B1", "B2")], order=None, reservedIds=["poule_b_m1"]
+    ))
+
+    assert {frozenset((match["equipe_a"], match["equipe_b"])) for match in matches} == {
+        frozenset(("B1", "B3")), frozenset(("B2", "B3"))}
+    assert "poule_b_m1" not in {match["match_id"] for match in matches}
+    for match in matches:
+        slot = (datetime.fromisoformat(match["debut_horaire"]), datetime.fromisoformat(match["fin_horaire"]))
+        for court, teams, start, end, _ in bookings:
+            if court == match["terrain"] or {match["equipe_a"], match["equipe_b"]} & set(teams):
+                assert not _overlaps(slot, (start, end))
+
+
+def test_elimination_job_waits_for_poule_results():
+    pouleEnd = START.replace(hour=11)
+    bookings = [(1, ["A1", "A2"], START.replace(hour=10, minute=45), pouleEnd, ["1er_poule_a", "2e_poule_a"]),
+                (2, ["B1", "B2"], START.replace(hour=10, minute=45), pouleEnd, ["1er_poule_b", "2e_poule_b"])]
+
+    phase = orjson.loads(scheduleEliminationJob(
+        _tournamentJson(), bookings, ["1er_poule_a", "1er_poule_b", "2e_poule_a", "2e_poule_b"], START
+    ))
+
+    demis = phase["demi_finales"]
+    assert len(demis) == 2
+    assert all(datetime.fromisoformat(match["debut_horaire"]) >= pouleEnd for match in demis)
+    assert datetime.fromisoformat(phase["finale"]["debut_horaire"]) >= max(
+        datetime.fromisoformat(match["fin_horaire"]) for match in demis)
@@ -0,0 +1,54 @@
+import pytest
+
+from app.services.planning_patch import PlanningPatchError, applyPlanningPatch, syncPlanningData
+from tests.factories import makeMatch
+
+
+def _planningData():
+    return {
+        "type_tournoi": "poules_elimination",
+        "poules": [{"poule_id": "poule_1", "matchs": [
+            {"match_id": "poule_1_m1", "equipe_a": "Aigles", "equipe_b": "Castors", "terrain": 1,
+             "debut_horaire": "2026-10-19T09:00:00", "fin_horaire": "2026-10-19T09:15:00"},
+        ]}],
+        "phase_elimination_apres_poules": {"finale": {
+            "match_id": "elim_finale", "equipe_a": "1er_poule_1", "equipe_b": "2e_poule_1", "terrain": 1,
+            "debut_horaire": "2026-10-19T10:00:00", "fin_horaire": "2026-10-19T10:15:00"
+        }},
+    }
+
+
+def test_patch_moves_match_and_keeps_duration():
+    planningData = _planningData()
+
+    patched, changed = applyPlanningPatch(planningData, [
+        {"match_id": "elim_finale", "debut_horaire": "11:30", "terrain": "2"},
+    ])
+
+    finale = patched["phase_elimination_apres_poules"]["finale"]
+    assert changed == 1
+    assert (finale["terrain"], finale["debut_horaire"], finale["fin_horaire"]) == (
+        2, "2026-10-19T11:30:00", "2026-10-19T11:45:00")
+    assert planningData["phase_elimination_apres_poules"]["finale"]["terrain"] == 1
+
+
+@pytest.mark.parametrize("modification", [
+    {"match_id": "inconnu", "terrain": 2},
+    {"match_id": "poule_1_m1", "terrain": 2},
+    {"match_id": "elim_finale", "phase": "poules"},
+    {"match_id": "elim_finale", "fin_horaire": "09:30"},
+    {"match_id": "elim_finale", "debut_horaire": "midi"},
+])
+def test_invalid_patch_raises(modification):
+    with pytest.raises(PlanningPatchError):
+        applyPlanningPatch(_planningData(), [modification], locked={"poule_1_m1"})
+
+
+def test_sync_copies_live_rows():
+    delayed = makeMatch("poule_1_m1", "Aigles", "Castors", slot=2, terrain=3, pouleId="poule_1")
+
+    synced = syncPlanningData(_planningData(), [delayed])
+
+    match = synced["poules"][0]["matchs"][0]
+    assert (match["terrain"], match["debut_horaire"]) == (3, "2026-10-19T09:40:00")
+    assert synced["phase_elimination_apres_poules"]["finale"]["terrain"] == 1
@@ -0,0 +1,45 @@
+from app.services.standings_service import PouleStandings, rankPoule
+from tests.factories import makeMatch
+
+
+def _result(matchIdAi, teamA, teamB, scoreA, scoreB, slot=0):
+    return makeMatch(matchIdAi, teamA, teamB, slot=slot, pouleId="poule-1",
+                     status="completed", scoreA=scoreA, scoreB=scoreB)
+
+
+def _poule():
+    """Zèbres et Aigles à égalité de points et de ratio, Zèbres a gagné la confrontation directe"""
+    return [
+        _result("poule_1_m1", "Zèbres", "Aigles", 2, 1),
+        _result("poule_1_m2", "Zèbres", "Castors", 1, 2, slot=1),
+        _result("poule_1_m3", "Aigles", "Dauphins", 2, 1, slot=2),
+    ]
+
+
+def test_head_to_head_breaks_points_and_ratio_tie():
+    assert rankPoule(_poule()) == ["Castors", "Zèbres", "Aigles", "Dauphins"]
+
+
+def test_correction_replaces_previous_score():
+    standings = PouleStandings("poule-1", "Poule A", ["Zèbres", "Aigles", "Castors", "Dauphins"], expectedMatches=3)
+    matches = _poule()
+    for match in matches:
+        standings.apply(match)
+    assert standings.isComplete()
+
+    corrected = matches[0].model_copy(update={"score_a": 1, "score_b": 2})
+    assert standings.apply(corrected)
+    assert not standings.apply(corrected)
+
+    ranking = standings.ranking()
+    assert [row["equipe"] for row in ranking] == ["Aigles", "Castors", "Dauphins", "Zèbres"]
+    assert (ranking[0]["points"], ranking[0]["matchs_joues"]) == (6, 2)
+
+
+def test_cancelled_result_is_withdrawn():
+    standings = PouleStandings("poule-1", "Poule A", ["Zèbres", "Aigles"])
+    match = _result("poule_1_m1", "Zèbres", "Aigles", 2, 0)
+    standings.apply(match)
+
+    assert standings.apply(match.model_copy(update={"status": "cancelled"}))
+    assert all(row["matchs_joues"] == 0 for row in standings.ranking())